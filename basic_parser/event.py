@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from enum import Enum
+
+
+class EventType(Enum):
+    START_LIST = 1
+    ELEMENT = 2
+    ASSIGN_PAIR = 3
+    END_LIST = 4
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    """
+    name is the VAR of ELEMENT and the left VAR of ASSIGN_PAIR, value is the right VAR of ASSIGN_PAIR.
+    START_LIST and END_LIST events are shared instances.
+    """
+    type: EventType
+    name: str = ''
+    value: str = ''
+
+
+START_LIST_EVENT = Event(EventType.START_LIST)
+END_LIST_EVENT = Event(EventType.END_LIST)
@@ -0,0 +1,92 @@
+# Generated by parser_generator from list.grammar. Do not edit.
+from core.lexer import TokenType
+from .parser import ListParserException
+
+
+_COMMA = TokenType.COMMA
+_EOF = TokenType.EOF
+_EQUAL = TokenType.EQUAL
+_LBRACK = TokenType.LBRACK
+_RBRACK = TokenType.RBRACK
+_VAR = TokenType.VAR
+
+
+class GeneratedListParser:
+    def __init__(self, lexer):
+        self._lexer = lexer
+        self._next_token = lexer.next_token
+        self._t0 = self._next_token()
+        self._t1 = self._next_token()
+
+    def _mismatch(self, expected: str):
+        raise ListParserException(f'expecting {expected}; found {self._t0.type}')
+
+    def parse(self):
+        self._stat()
+
+    def _stat(self):
+        """
+        stat: list EOF
+        :return:
+        """
+        self._list()
+        if self._t0.type is not _EOF:
+            self._mismatch('TokenType.EOF')
+        self._t0 = self._t1
+        self._t1 = self._next_token()
+
+    def _list(self):
+        """
+        list: LBRACK elements? RBRACK
+        :return:
+        """
+        if self._t0.type is not _LBRACK:
+            self._mismatch('TokenType.LBRACK')
+        self._t0 = self._t1
+        self._t1 = self._next_token()
+        _type0 = self._t0.type
+        if not (_type0 is _RBRACK):
+            self._elements()
+        if self._t0.type is not _RBRACK:
+            self._mismatch('TokenType.RBRACK')
+        self._t0 = self._t1
+        self._t1 = self._next_token()
+
+    def _elements(self):
+        """
+        elements: element (COMMA element)*
+        :return:
+        """
+        self._element()
+        while True:
+            _type0 = self._t0.type
+            if _type0 is _COMMA:
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+                self._element()
+            else:
+                break
+
+    def _element(self):
+        """
+        element: VAR EQUAL VAR | VAR | list
+        :return:
+        """
+        _type0 = self._t0.type
+        _type1 = self._t1.type
+        if _type0 is _VAR and _type1 is _EQUAL:
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+            if self._t0.type is not _EQUAL:
+                self._mismatch('TokenType.EQUAL')
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+            if self._t0.type is not _VAR:
+                self._mismatch('TokenType.VAR')
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+        elif _type0 is _VAR:
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+        else:
+            self._list()
@@ -1,4 +1,10 @@
+from typing import Iterator, Optional
+
 from core.lexer import TokenType, Token, ListLexer
+from core.token_buffer import TokenBuffer
+from parser_generator.grammar import parse_grammar
+from parser_generator.prediction import NO_ALTERNATIVE, AdaptivePredictor
+from .event import Event, EventType, START_LIST_EVENT, END_LIST_EVENT
 
 
 class ListParserException(Exception):
@@ -20,37 +26,91 @@ class ListParser:
 
     def parse(self):
         self._list()
-        if self._lookahead_token(0).type != TokenType.EOF:
-            raise ListParserException(f'expecting {TokenType.EOF}; found {self._lookahead_token(0).type}')
+        if self._lookahead_type(0) != TokenType.EOF:
+            raise ListParserException(f'expecting {TokenType.EOF}; found {self._lookahead_type(0)}')
+
+    def events(self) -> Iterator[Event]:
+        """
+        Parse like parse(), yielding events while parsing instead of building the list.
+        Nested lists are handled in a loop, so only the nesting depth is kept
+        and large inputs (e.g. a memoryview of mmap with TableListLexer) are processed in constant memory.
+        Events before a syntax error are yielded before ListParserException is raised.
+        """
+        depth = 0
+        while True:
+            # '[' of the outermost list or of a list as an element
+            self._match(TokenType.LBRACK)
+            depth += 1
+            yield START_LIST_EVENT
+            if self._lookahead_type(0) != TokenType.RBRACK:
+                if (event := self._element_event()) is None:
+                    continue
+                yield event
+
+            # after an element of the innermost open list: (',' element)* ']'
+            while True:
+                if self._lookahead_type(0) == TokenType.COMMA:
+                    self._match(TokenType.COMMA)
+                    if (event := self._element_event()) is None:
+                        break
+                    yield event
+                    continue
+
+                self._match(TokenType.RBRACK)
+                depth -= 1
+                yield END_LIST_EVENT
+                if depth == 0:
+                    if self._lookahead_type(0) != TokenType.EOF:
+                        raise ListParserException(f'expecting {TokenType.EOF}; found {self._lookahead_type(0)}')
+                    return
+
+    def _element_event(self) -> Optional[Event]:
+        """
+        element: VAR '=' VAR | VAR | list
+        :return: None when the element is a list, without consuming its '['
+        """
+        if self._lookahead_type(0) == TokenType.VAR and self._lookahead_type(1) == TokenType.EQUAL:
+            # VAR=VAR case e.g. a=b
+            name = self._lookahead_token(0).text
+            self._match(TokenType.VAR)
+            self._match(TokenType.EQUAL)
+            value = self._lookahead_token(0).text
+            self._match(TokenType.VAR)
+            return Event(EventType.ASSIGN_PAIR, name, value)
+        elif self._lookahead_type(0) == TokenType.VAR:
+            name = self._lookahead_token(0).text
+            self._match(TokenType.VAR)
+            return Event(EventType.ELEMENT, name)
+        return None
 
     def _list(self):
         self._match(TokenType.LBRACK)
-        if self._lookahead_token(0).type != TokenType.RBRACK:
+        if self._lookahead_type(0) != TokenType.RBRACK:
             self._elements()
         self._match(TokenType.RBRACK)
 
     def _elements(self):
         self._element()
-        while self._lookahead_token(0).type == TokenType.COMMA:
+        while self._lookahead_type(0) == TokenType.COMMA:
             self._match(TokenType.COMMA)
             self._element()
 
     def _element(self):
-        if self._lookahead_token(0).type == TokenType.VAR and self._lookahead_token(1).type == TokenType.EQUAL:
+        if self._lookahead_type(0) == TokenType.VAR and self._lookahead_type(1) == TokenType.EQUAL:
             # VAR=VAR case e.g. a=b
             self._match(TokenType.VAR)
             self._match(TokenType.EQUAL)
             self._match(TokenType.VAR)
-        elif self._lookahead_token(0).type == TokenType.VAR:
+        elif self._lookahead_type(0) == TokenType.VAR:
             self._match(TokenType.VAR)
         else:
             self._list()
 
     def _match(self, token_type: TokenType):
-        if self._lookahead_token(0).type == token_type:
+        if self._lookahead_type(0) == token_type:
             self._consume()
         else:
-            raise ListParserException(f'expecting {token_type}; found {self._lookahead_token(0).type}')
+            raise ListParserException(f'expecting {token_type}; found {self._lookahead_type(0)}')
 
     def _consume(self):
         self._lookahead_buffer[self._p] = self._lexer.next_token()
@@ -58,3 +118,171 @@ class ListParser:
 
     def _lookahead_token(self, i: int) -> Token:
         return self._lookahead_buffer[(self._p + i) % self._k]
+
+    def _lookahead_type(self, i: int) -> TokenType:
+        return self._lookahead_buffer[(self._p + i) % self._k].type
+
+
+class IterativeListParser(ListParser):
+    """
+    ListParser parsing nested lists in a loop instead of recursion, so that nesting depth is not limited
+    by the recursion limit. Accepts and rejects the same inputs with the same errors as ListParser.
+    """
+    def _list(self):
+        """
+        list: '[' elements ']'
+        Every open list waits for ',' or ']' after its current element,
+        so the explicit stack is just the number of open lists.
+        :return:
+        """
+        depth = 0
+        while True:
+            # '[' of the outermost list or of a list as an element
+            self._match(TokenType.LBRACK)
+            depth += 1
+            if self._lookahead_type(0) != TokenType.RBRACK and not self._match_flat_element():
+                continue
+
+            # after an element of the innermost open list: (',' element)* ']'
+            while True:
+                if self._lookahead_type(0) == TokenType.COMMA:
+                    self._match(TokenType.COMMA)
+                    if not self._match_flat_element():
+                        break
+                    continue
+
+                self._match(TokenType.RBRACK)
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _match_flat_element(self) -> bool:
+        """
+        element: VAR '=' VAR | VAR | list
+        :return: False when the element is a list, without consuming its '['
+        """
+        if self._lookahead_type(0) == TokenType.VAR and self._lookahead_type(1) == TokenType.EQUAL:
+            # VAR=VAR case e.g. a=b
+            self._match(TokenType.VAR)
+            self._match(TokenType.EQUAL)
+            self._match(TokenType.VAR)
+        elif self._lookahead_type(0) == TokenType.VAR:
+            self._match(TokenType.VAR)
+        else:
+            return False
+        return True
+
+
+_GRAMMAR = parse_grammar('''
+    list: LBRACK elements? RBRACK ;
+    elements: element (COMMA element)* ;
+    element: VAR EQUAL VAR | VAR | list ;
+''')
+
+
+class AdaptiveListParser(ListParser):
+    """
+    ListParser without a fixed k: alternatives of element are predicted by adaptive LL(*) prediction,
+    which looks ahead only as far as needed, and lookahead tokens are buffered on demand.
+    The prediction is cached as a DFA shared by all instances, so a repeated decision is a few dict lookups,
+    about as fast as the fixed k=2 tests of ListParser.
+    A syntax error is reported at the token where no alternative of element matches any more.
+    """
+    _predictor = AdaptivePredictor(_GRAMMAR, TokenType)
+
+    def __init__(self, lexer: ListLexer):
+        self._lexer = lexer
+        self._lookahead_buffer = [lexer.next_token()]
+        self._p = 0
+
+    def _element_event(self) -> Optional[Event]:
+        """
+        element: VAR '=' VAR | VAR | list
+        :return: None when the element is a list, without consuming its '['
+        """
+        alternative = self._predict_element()
+        if alternative == 0:
+            name = self._lookahead_token(0).text
+            value = self._lookahead_token(2).text
+            self._match(TokenType.VAR)
+            self._match(TokenType.EQUAL)
+            self._match(TokenType.VAR)
+            return Event(EventType.ASSIGN_PAIR, name, value)
+        elif alternative == 1:
+            name = self._lookahead_token(0).text
+            self._match(TokenType.VAR)
+            return Event(EventType.ELEMENT, name)
+        return None
+
+    def _element(self):
+        alternative = self._predict_element()
+        if alternative == 0:
+            # VAR=VAR case e.g. a=b
+            self._match(TokenType.VAR)
+            self._match(TokenType.EQUAL)
+            self._match(TokenType.VAR)
+        elif alternative == 1:
+            self._match(TokenType.VAR)
+        else:
+            self._list()
+
+    def _predict_element(self) -> int:
+        if (alternative := self._predictor.predict('element', self._lookahead_type)) == NO_ALTERNATIVE:
+            index = self._predictor.error_index('element', self._lookahead_type)
+            raise ListParserException(f'no viable alternative of element at {self._lookahead_token(index)}')
+        return alternative
+
+    def _consume(self):
+        self._p += 1
+        if self._p == len(self._lookahead_buffer):
+            # nothing is looked ahead, so consumed tokens are released
+            self._lookahead_buffer.clear()
+            self._lookahead_buffer.append(self._lexer.next_token())
+            self._p = 0
+
+    def _lookahead_token(self, i: int) -> Token:
+        try:
+            return self._lookahead_buffer[self._p + i]
+        except IndexError:
+            return self._fill(i)
+
+    def _lookahead_type(self, i: int) -> TokenType:
+        try:
+            return self._lookahead_buffer[self._p + i].type
+        except IndexError:
+            return self._fill(i).type
+
+    def _fill(self, i: int) -> Token:
+        while self._p + i >= len(self._lookahead_buffer):
+            self._lookahead_buffer.append(self._lexer.next_token())
+        return self._lookahead_buffer[self._p + i]
+
+
+class TokenBufferListParser(ListParser):
+    """
+    ListParser reading tokens directly from a columnar TokenBuffer instead of a ring buffer of tokens.
+    As the whole input is already lexed, lookahead is not limited by k.
+    """
+    def __init__(self, tokens: TokenBuffer):
+        self._tokens = tokens
+        self._types = tokens.types
+        self._members = tokens.members
+        self._p = 0
+
+    def _match(self, token_type: TokenType):
+        if self._lookahead_type(0) == token_type:
+            self._p += 1
+        else:
+            raise ListParserException(f'expecting {token_type}; found {self._lookahead_type(0)}')
+
+    def _consume(self):
+        self._p += 1
+
+    def _lookahead_token(self, i: int) -> Token:
+        return self._tokens.token(self._p + i)
+
+    def _lookahead_type(self, i: int) -> TokenType:
+        try:
+            return self._members[self._types[self._p + i]]
+        except IndexError:
+            return TokenType.EOF
@@ -1,7 +1,11 @@
+import re
+
 import pytest
 
-from core.lexer import ListLexer
-from .parser import ListParser, ListParserException
+from core.lexer import ListLexer, TableListLexer, tokenize
+from .event import Event, EventType
+from .generated_parser import GeneratedListParser
+from .parser import AdaptiveListParser, IterativeListParser, ListParser, ListParserException, TokenBufferListParser
 
 
 class TestListParser:
@@ -25,6 +29,13 @@ class TestListParser:
             ('[a, [, c]',),
             ('[a, b, c][',),
             ('[a, b=, c]',),
+            ('[a, [b, [c]]',),
+            ('[a, [b] c]',),
+            ('[[], [[]]]]',),
+            ('[a',),
+            ('[a b]',),
+            ('[=]',),
+            ('[a=b=c]',),
         ]
 
     def test_constructor_fail(self):
@@ -50,3 +61,124 @@ class TestListParser:
                 parser = ListParser(lexer, 2)
                 with pytest.raises(ListParserException):
                     parser.parse()
+
+    @pytest.mark.parametrize('input_list', _parse_success_test_cases())
+    def test_token_buffer_parse_success(self, input_list):
+        for input_text in input_list:
+            TokenBufferListParser(tokenize(input_text)).parse()
+
+    @pytest.mark.parametrize('input_list', _parse_fail_test_cases())
+    def test_token_buffer_parse_fail(self, input_list):
+        for input_text in input_list:
+            parser = TokenBufferListParser(tokenize(input_text))
+            with pytest.raises(ListParserException):
+                parser.parse()
+
+    @pytest.mark.parametrize('input_list', _parse_success_test_cases())
+    def test_iterative_parse_success(self, input_list):
+        for input_text in input_list:
+            IterativeListParser(ListLexer(input_text), 2).parse()
+
+    @pytest.mark.parametrize('input_list', _parse_fail_test_cases())
+    def test_iterative_parse_fail_with_same_error(self, input_list):
+        for input_text in input_list:
+            with pytest.raises(ListParserException) as expected:
+                ListParser(ListLexer(input_text), 2).parse()
+            with pytest.raises(ListParserException, match=re.escape(str(expected.value))):
+                IterativeListParser(ListLexer(input_text), 2).parse()
+
+    @pytest.mark.parametrize('depth', [1, 100, 10000])
+    def test_iterative_parse_deep_list(self, depth):
+        input_text = '[a, ' * depth + 'b=c' + ']' * depth
+        IterativeListParser(ListLexer(input_text), 2).parse()
+
+        with pytest.raises(ListParserException):
+            IterativeListParser(ListLexer(input_text[:-1]), 2).parse()
+
+    @staticmethod
+    def _events_test_cases() -> list[tuple[str, list[Event]]]:
+        start, end = Event(EventType.START_LIST), Event(EventType.END_LIST)
+        return [
+            ('[]', [start, end]),
+            ('[a, b=c]', [start, Event(EventType.ELEMENT, 'a'), Event(EventType.ASSIGN_PAIR, 'b', 'c'), end]),
+            ('[[], [a, [b]], c]', [
+                start, start, end, start, Event(EventType.ELEMENT, 'a'), start, Event(EventType.ELEMENT, 'b'), end, end,
+                Event(EventType.ELEMENT, 'c'), end,
+            ]),
+        ]
+
+    @pytest.mark.parametrize('input_text, expected', _events_test_cases())
+    def test_events(self, input_text, expected):
+        assert list(ListParser(ListLexer(input_text), 2).events()) == expected
+        assert list(TokenBufferListParser(tokenize(input_text)).events()) == expected
+        assert list(AdaptiveListParser(ListLexer(input_text)).events()) == expected
+
+    @pytest.mark.parametrize('input_list', _parse_fail_test_cases())
+    def test_events_fail_with_same_error(self, input_list):
+        for input_text in input_list:
+            with pytest.raises(ListParserException) as expected:
+                ListParser(ListLexer(input_text), 2).parse()
+            with pytest.raises(ListParserException, match=re.escape(str(expected.value))):
+                list(ListParser(ListLexer(input_text), 2).events())
+
+    def test_events_before_error(self):
+        events = ListParser(ListLexer('[a, [b=c, ]]'), 2).events()
+        assert next(events) == Event(EventType.START_LIST)
+        assert next(events) == Event(EventType.ELEMENT, 'a')
+        assert next(events) == Event(EventType.START_LIST)
+        assert next(events) == Event(EventType.ASSIGN_PAIR, 'b', 'c')
+        with pytest.raises(ListParserException):
+            next(events)
+
+    def test_events_deep_list_from_bytes(self):
+        depth = 10000
+        input_bytes = b'[a, ' * depth + b'b' + b']' * depth
+        count = {event_type: 0 for event_type in EventType}
+        for event in ListParser(TableListLexer(memoryview(input_bytes)), 2).events():
+            count[event.type] += 1
+        assert count == {
+            EventType.START_LIST: depth,
+            EventType.ELEMENT: depth + 1,
+            EventType.ASSIGN_PAIR: 0,
+            EventType.END_LIST: depth,
+        }
+
+    @pytest.mark.parametrize('input_list', _parse_success_test_cases())
+    def test_adaptive_parse_success(self, input_list):
+        for input_text in input_list:
+            AdaptiveListParser(ListLexer(input_text)).parse()
+
+    @pytest.mark.parametrize('input_list', _parse_fail_test_cases())
+    def test_adaptive_parse_fail(self, input_list):
+        for input_text in input_list:
+            with pytest.raises(ListParserException):
+                AdaptiveListParser(ListLexer(input_text)).parse()
+
+    @pytest.mark.parametrize('input_text, found', [
+        ('[a b]', "text='b'"),
+        ('[a', "type=<TokenType.EOF"),
+        ('[a, =]', "text='='"),
+    ])
+    def test_adaptive_parse_fail_at_token(self, input_text, found):
+        # reported at the token where no alternative of element matches, not at the first token of element
+        with pytest.raises(ListParserException, match=re.escape(found)):
+            AdaptiveListParser(ListLexer(input_text)).parse()
+
+    def test_adaptive_lookahead_buffer_is_released(self):
+        parser = AdaptiveListParser(ListLexer('[a, b=c, [d], e]'))
+        parser.parse()
+        # only the EOF token is left after the last consume
+        assert len(parser._lookahead_buffer) == 1
+
+    @pytest.mark.parametrize('input_list', _parse_success_test_cases())
+    def test_generated_parse_success(self, input_list):
+        for input_text in input_list:
+            GeneratedListParser(ListLexer(input_text)).parse()
+
+    @pytest.mark.parametrize('input_list', _parse_fail_test_cases())
+    def test_generated_parse_fail_with_same_error(self, input_list):
+        for input_text in input_list:
+            with pytest.raises(ListParserException) as expected:
+                ListParser(ListLexer(input_text), 2).parse()
+            with pytest.raises(ListParserException, match=re.escape(str(expected.value))):
+                GeneratedListParser(ListLexer(input_text)).parse()
@@ -0,0 +1,107 @@
+# Generated by lexer_generator from list.lexer. Do not edit.
+from bisect import bisect_right
+
+from .lexer import ListLexerNextTokenException, TokenType, _token
+
+
+_CLASS_COUNT = 7
+# character classes of code points from each boundary to the next one
+_BOUNDARIES = (
+    0, 9, 14, 28, 33, 44, 45, 61, 62, 65, 91, 92, 93, 94, 97, 123, 133, 134, 160, 161, 5760, 5761, 8192, 8203, 8232,
+    8234, 8239, 8240, 8287, 8288, 12288, 12289,
+)
+_BOUNDARY_CLASSES = (0, 1, 0, 1, 0, 2, 0, 3, 0, 4, 5, 0, 6, 0, 4, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0)
+# next states of state and class at state + class, where states are multiplied by _CLASS_COUNT
+# and the dead state is 0
+_TRANSITIONS = (
+    0, 0, 0, 0, 0, 0, 0, 0, 49, 21, 42, 14, 28, 35, 0, 0, 0, 0, 14, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 49, 0, 0, 0, 0, 0,
+)
+_START = 7
+# accepted rules of states, -1 for no rule
+_STATE_ACCEPTS = (-1, -1, 0, 1, 2, 3, 4, 5)
+_ACCEPTS = tuple(rule for rule in _STATE_ACCEPTS for _ in range(_CLASS_COUNT))
+# token types of rules, None for dropped rules
+_RULE_TYPES = (TokenType.VAR, TokenType.COMMA, TokenType.LBRACK, TokenType.RBRACK, TokenType.EQUAL, None)
+
+
+def _class_of(code_point: int) -> int:
+    return _BOUNDARY_CLASSES[bisect_right(_BOUNDARIES, code_point) - 1]
+
+
+# classes of ASCII characters of str inputs
+_STR_CLASSES = {chr(code_point): _class_of(code_point) for code_point in range(128)}
+# tables of bytes, where states are multiplied by 256
+# bytes from 0x80 are not latin-1 characters: like bytes regexes, only negated sets e.g. [^\n] match them,
+# so they are in the class of the last code point, which is dead for rules without negated sets
+_BYTE_TRANSITIONS = tuple(
+    _TRANSITIONS[state + _class_of(byte if byte < 0x80 else 0x10FFFF)] // _CLASS_COUNT << 8
+    for state in range(0, len(_TRANSITIONS), _CLASS_COUNT) for byte in range(256)
+)
+_BYTE_ACCEPTS = tuple(rule for rule in _STATE_ACCEPTS for _ in range(256))
+_BYTE_START = _START // _CLASS_COUNT << 8
+
+
+class GeneratedListLexer:
+    def __init__(self, input_text):
+        if isinstance(input_text, str):
+            self._input_text = input_text
+            classes = _STR_CLASSES
+            if not input_text.isascii():
+                classes = dict(classes)
+                classes.update((char, _class_of(ord(char))) for char in set(input_text).difference(classes))
+            self._tables = _TRANSITIONS, _ACCEPTS, _START, classes
+        else:
+            if not isinstance(input_text, (bytes, bytearray)):
+                input_text = memoryview(input_text).cast('B')
+            self._input_text = None
+            self._tables = _BYTE_TRANSITIONS, _BYTE_ACCEPTS, _BYTE_START, None
+        self._data = input_text
+        self._p = 0
+
+    def _text(self, start: int, end: int) -> str:
+        if self._input_text is None:
+            return str(self._data[start:end], 'latin-1')
+        return self._input_text[start:end]
+
+    def next_token(self):
+        transitions, accepts, start_state, classes = self._tables
+        input_text = self._input_text
+        data = self._data
+        n = len(data)
+        start = self._p
+        while start < n:
+            state = start_state
+            rule = -1
+            end = i = start
+            if classes is None:
+                while i < n:
+                    state = transitions[state + data[i]]
+                    if not state:
+                        break
+                    i += 1
+                    if (accepted := accepts[state]) >= 0:
+                        rule = accepted
+                        end = i
+            else:
+                while i < n:
+                    state = transitions[state + classes[data[i]]]
+                    if not state:
+                        break
+                    i += 1
+                    if (accepted := accepts[state]) >= 0:
+                        rule = accepted
+                        end = i
+            if rule < 0:
+                raise ListLexerNextTokenException(f'invalid character at {start}: {self._text(start, start + 1)}')
+
+            token_type = _RULE_TYPES[rule]
+            if token_type is None:
+                start = end
+                continue
+            self._p = end
+            if input_text is None:
+                return _token(token_type, str(data[start:end], 'latin-1'))
+            return _token(token_type, input_text[start:end])
+        self._p = start
+        return _token(TokenType.EOF, '')
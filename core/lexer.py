@@ -1,6 +1,10 @@
 import re
+import string
 from dataclasses import dataclass
 from enum import Enum
+from typing import Union
+
+from .token_buffer import TokenBuffer
 
 
 class TokenType(Enum):
@@ -12,8 +16,11 @@ class TokenType(Enum):
     EQUAL = 5
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Token:
+    """
+    Tokens with fixed text (punctuations and EOF) are shared instances, so tokens are immutable.
+    """
     type: TokenType
     text: str
 
@@ -22,6 +29,24 @@ class ListLexerNextTokenException(Exception):
     pass
 
 
+_PUNCTUATION_TOKENS = {
+    text: Token(token_type, text) for text, token_type in [
+        (',', TokenType.COMMA),
+        ('[', TokenType.LBRACK),
+        (']', TokenType.RBRACK),
+        ('=', TokenType.EQUAL),
+    ]
+}
+
+_EOF_TOKEN = Token(TokenType.EOF, '')
+
+
+def _token(token_type: TokenType, text: str) -> Token:
+    if token_type == TokenType.VAR:
+        return Token(TokenType.VAR, text)
+    return _EOF_TOKEN if token_type == TokenType.EOF else _PUNCTUATION_TOKENS[text]
+
+
 class ListLexer:
     EOF = -1
 
@@ -37,23 +62,14 @@ class ListLexer:
                 self._consume()
             elif self._is_whitespace():
                 self._whitespace()
-            elif self._current_char == ',':
+            elif (token := _PUNCTUATION_TOKENS.get(self._current_char)) is not None:
                 self._consume()
-                return Token(TokenType.COMMA, ',')
-            elif self._current_char == '[':
-                self._consume()
-                return Token(TokenType.LBRACK, '[')
-            elif self._current_char == ']':
-                self._consume()
-                return Token(TokenType.RBRACK, ']')
-            elif self._current_char == '=':
-                self._consume()
-                return Token(TokenType.EQUAL, '=')
+                return token
             elif self._is_letter():
                 return self._var_token()
             else:
                 raise ListLexerNextTokenException(f'invalid character: {self._current_char}')
-        return Token(TokenType.EOF, '')
+        return _EOF_TOKEN
 
     def _consume(self):
         self._cursor += 1
@@ -84,3 +100,77 @@ class ListLexer:
     def _whitespace(self):
         while self._is_whitespace():
             self._consume()
+
+
+class TableListLexer(ListLexer):
+    """
+    ListLexer which classifies characters with precomputed tables
+    and slices VAR tokens directly out of the input.
+
+    bytes, bytearray and memoryview inputs are scanned as ASCII without decoding or copying;
+    tables are keyed by both characters and byte values, and only VAR texts are decoded.
+    """
+    _LETTERS = frozenset(string.ascii_letters) | frozenset(string.ascii_letters.encode())
+    _PUNCTUATION_TOKENS = {**_PUNCTUATION_TOKENS, **{ord(text): token for text, token in _PUNCTUATION_TOKENS.items()}}
+    # same whitespaces as str.isspace() in ASCII; other unicode whitespaces are checked with str.isspace()
+    _WHITESPACES = frozenset(chr(i) for i in range(128) if chr(i).isspace()) | frozenset(
+        i for i in range(128) if chr(i).isspace())
+
+    def __init__(self, input_: Union[str, bytes, bytearray, memoryview]):
+        super().__init__(input_)
+        self._cursor = 0
+
+    def next_token(self) -> Token:
+        token_type, start = self._scan()
+        if token_type == TokenType.VAR:
+            return Token(TokenType.VAR, self._text(start, self._cursor))
+        return _EOF_TOKEN if token_type == TokenType.EOF else self._PUNCTUATION_TOKENS[self._input[start]]
+
+    def _scan(self) -> tuple[TokenType, int]:
+        """
+        Scan next token without building it.
+        :return: token type and start of the token; the token ends at self._cursor
+        """
+        input_ = self._input
+        cursor = self._cursor
+        letters = self._LETTERS
+        punctuation_tokens = self._PUNCTUATION_TOKENS
+        whitespaces = self._WHITESPACES
+
+        while cursor < len(input_):
+            char = input_[cursor]
+            if char in letters:
+                start = cursor
+                cursor += 1
+                while cursor < len(input_) and input_[cursor] in letters:
+                    cursor += 1
+                self._cursor = cursor
+                return TokenType.VAR, start
+            elif (token := punctuation_tokens.get(char)) is not None:
+                self._cursor = cursor + 1
+                return token.type, cursor
+            elif char in whitespaces or (isinstance(char, str) and char.isspace()):
+                cursor += 1
+            else:
+                self._cursor = cursor
+                raise ListLexerNextTokenException(f'invalid character: {char if isinstance(char, str) else chr(char)}')
+
+        self._cursor = cursor
+        return TokenType.EOF, cursor
+
+    def _text(self, start: int, end: int) -> str:
+        text = self._input[start:end]
+        return text if isinstance(text, str) else str(text, 'ascii')
+
+
+def tokenize(input_: Union[str, bytes, bytearray, memoryview]) -> TokenBuffer:
+    """
+    Lex the whole input into a columnar TokenBuffer without building Token objects.
+    """
+    tokens = TokenBuffer(input_, TokenType, _token)
+    lexer = TableListLexer(input_)
+    while True:
+        token_type, start = lexer._scan()
+        tokens.append(token_type.value, start, lexer._cursor)
+        if token_type == TokenType.EOF:
+            return tokens
@@ -1,6 +1,7 @@
 import pytest
 
-from core.lexer import Token, TokenType, ListLexer
+from core.generated_lexer import GeneratedListLexer
+from core.lexer import Token, TokenType, ListLexer, TableListLexer, ListLexerNextTokenException, tokenize
 
 
 class TestLexer:
@@ -39,11 +40,76 @@ class TestLexer:
             ]),
         ]
 
+    @staticmethod
+    def _lexer_classes() -> list[type]:
+        return [ListLexer, TableListLexer, GeneratedListLexer]
+
+    @pytest.mark.parametrize('lexer_class', _lexer_classes())
     @pytest.mark.parametrize('input_text,expected', _lexer_test_cases())
-    def test_next_token(self, input_text, expected):
-        lexer = ListLexer(input_text)
+    def test_next_token(self, lexer_class, input_text, expected):
+        lexer = lexer_class(input_text)
         results = []
         while (token := lexer.next_token()).type != TokenType.EOF:
             results.append(token)
 
         assert results == expected
+
+    @pytest.mark.parametrize('lexer_class', _lexer_classes())
+    @pytest.mark.parametrize('input_text', ['[a, 1]', '[a_b]', '[\u00e9]'])
+    def test_next_token_fail(self, lexer_class, input_text):
+        lexer = lexer_class(input_text)
+        with pytest.raises(ListLexerNextTokenException):
+            while lexer.next_token().type != TokenType.EOF:
+                pass
+
+    @pytest.mark.parametrize('lexer_class', _lexer_classes())
+    def test_token_is_compact(self, lexer_class):
+        def tokens(input_text: str) -> list[Token]:
+            lexer = lexer_class(input_text)
+            return [lexer.next_token() for _ in range(6)]
+
+        first = tokens('[a=b,]')
+        second = tokens('[c=d,]')
+
+        assert not hasattr(first[0], '__dict__')
+        # punctuation and EOF tokens are shared
+        for i in [0, 2, 4, 5]:
+            assert first[i] is second[i]
+
+    @pytest.mark.parametrize('input_text,expected', _lexer_test_cases())
+    def test_tokenize(self, input_text, expected):
+        tokens = tokenize(input_text)
+
+        assert [tokens.token(i) for i in range(len(tokens))] == expected + [Token(TokenType.EOF, '')]
+        # fixed tokens are shared with lexers
+        assert tokenize('[').token(0) is ListLexer('[').next_token()
+
+    @pytest.mark.parametrize('input_type', [bytes, bytearray, memoryview])
+    @pytest.mark.parametrize('input_text,expected', _lexer_test_cases())
+    @pytest.mark.parametrize('lexer_class', [TableListLexer, GeneratedListLexer])
+    def test_next_token_bytes(self, lexer_class, input_type, input_text, expected):
+        lexer = lexer_class(input_type(input_text.encode()))
+        results = []
+        while (token := lexer.next_token()).type != TokenType.EOF:
+            results.append(token)
+
+        assert results == expected
+
+    @pytest.mark.parametrize('input_text,expected', _lexer_test_cases())
+    def test_tokenize_bytes(self, input_text, expected):
+        tokens = tokenize(memoryview(input_text.encode()))
+        assert [tokens.token(i) for i in range(len(tokens))] == expected + [Token(TokenType.EOF, '')]
+
+    @pytest.mark.parametrize('input_bytes', [
+        '[a, \u00e9]'.encode(),
+        # whitespaces of latin-1 are not whitespaces of bytes
+        b'[a\xa0b]',
+        b'[a\x85b]',
+    ])
+    @pytest.mark.parametrize('input_type', [bytes, bytearray, memoryview])
+    @pytest.mark.parametrize('lexer_class', [TableListLexer, GeneratedListLexer])
+    def test_next_token_bytes_fail(self, lexer_class, input_type, input_bytes):
+        lexer = lexer_class(input_type(input_bytes))
+        with pytest.raises(ListLexerNextTokenException):
+            while lexer.next_token().type != TokenType.EOF:
+                pass
@@ -0,0 +1,30 @@
+from .lexer import Token, TokenType
+from .token_buffer import TokenBuffer
+
+
+class TestTokenBuffer:
+    @staticmethod
+    def _token_buffer() -> TokenBuffer:
+        tokens = TokenBuffer('[ab]', TokenType, Token)
+        tokens.append(TokenType.LBRACK.value, 0, 1)
+        tokens.append(TokenType.VAR.value, 1, 3)
+        tokens.append(TokenType.RBRACK.value, 3, 4)
+        tokens.append(TokenType.EOF.value, 4, 4)
+        return tokens
+
+    def test_token(self):
+        tokens = self._token_buffer()
+        assert len(tokens) == 4
+        assert tokens.type(1) == TokenType.VAR
+        assert tokens.text(1) == 'ab'
+        assert tokens.token(2) == Token(TokenType.RBRACK, ']')
+
+    def test_past_end_is_eof(self):
+        tokens = self._token_buffer()
+        assert tokens.type(10) == TokenType.EOF
+        assert tokens.token(10) == Token(TokenType.EOF, '')
+
+    def test_members(self):
+        tokens = self._token_buffer()
+        assert [tokens.members[value] for value in tokens.types] == \
+               [TokenType.LBRACK, TokenType.VAR, TokenType.RBRACK, TokenType.EOF]
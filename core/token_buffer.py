@@ -0,0 +1,49 @@
+from array import array
+from enum import Enum
+from typing import Any, Callable, Union
+
+
+class TokenBuffer:
+    """
+    Columnar token stream of a whole source (str or ASCII bytes-like object):
+    token type values in array('b'), start and end offsets into the source in array('I').
+    Token texts and objects are only built when asked.
+    The last token is always EOF, and indexes past the end refer to it.
+    Parsers looking ahead in a hot loop index members by types directly, falling back to EOF on IndexError.
+    """
+    def __init__(self, source: Union[str, bytes, bytearray, memoryview], token_type: type[Enum], token_factory: Callable[[Any, str], Any]):
+        self.source = source
+        self.types = array('b')
+        self.starts = array('I')
+        self.ends = array('I')
+        # token type members indexed by their values, negative values from the end
+        values = [member.value for member in token_type]
+        members = [None] * (max(max(values), -1) + 1 - min(min(values), 0))
+        for member in token_type:
+            members[member.value] = member
+        self.members: tuple[Enum, ...] = tuple(members)
+        self._token_factory = token_factory
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def append(self, type_value: int, start: int, end: int):
+        self.types.append(type_value)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def type(self, i: int) -> Enum:
+        try:
+            return self.members[self.types[i]]
+        except IndexError:
+            return self.members[self.types[-1]]
+
+    def text(self, i: int) -> str:
+        try:
+            text = self.source[self.starts[i]:self.ends[i]]
+        except IndexError:
+            return self.text(len(self.types) - 1)
+        return text if isinstance(text, str) else str(text, 'ascii')
+
+    def token(self, i: int) -> Any:
+        return self._token_factory(self.type(i), self.text(i))
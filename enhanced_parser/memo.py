@@ -0,0 +1,93 @@
+from collections import deque
+from typing import Any, Optional
+
+
+class _MemoWindow:
+    __slots__ = ('start', 'rules', 'size')
+
+    def __init__(self, start: int):
+        self.start = start
+        # rule name -> position relative to start -> memoized value
+        self.rules: dict[str, dict[int, Any]] = {}
+        self.size = 0
+
+
+class MemoTable:
+    """
+    Memo of parsed rules by absolute token position.
+
+    Entries are grouped in windows which start where the parser's lookahead buffer starts,
+    and are keyed by position relative to the window start.
+    Invalidation drops whole windows instead of scanning entries.
+    With max_entries, a window is split when it holds half of max_entries,
+    and the oldest window is evicted when the number of entries reaches max_entries.
+    """
+    def __init__(self, max_entries: Optional[int] = None):
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError('max_entries should be larger than 0')
+        self._max_entries = max_entries
+        self._windows = deque([_MemoWindow(0)])
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def start_window(self, start: int):
+        """
+        Put entries from start to a new window.
+        """
+        if start > self._windows[-1].start:
+            self._windows.append(_MemoWindow(start))
+
+    def release(self, position: int):
+        """
+        Drop windows which only have entries before position.
+        """
+        windows = self._windows
+        while len(windows) > 1 and windows[1].start <= position:
+            self._size -= windows.popleft().size
+
+    def get(self, rule: str, position: int) -> Optional[Any]:
+        if (window := self._window(position)) is None or (rule_memo := window.rules.get(rule)) is None:
+            return None
+        return rule_memo.get(position - window.start)
+
+    def put(self, rule: str, position: int, value: Any):
+        if self._max_entries is not None:
+            if self._windows[-1].size >= self._max_entries // 2:
+                # split a large window, so that eviction keeps recent entries
+                self.start_window(position)
+            if self._size >= self._max_entries:
+                self._evict()
+
+        if (window := self._window(position)) is None:
+            # released or evicted position
+            return
+        if (rule_memo := window.rules.get(rule)) is None:
+            rule_memo = window.rules[rule] = {}
+        relative_position = position - window.start
+        if relative_position not in rule_memo:
+            window.size += 1
+            self._size += 1
+        rule_memo[relative_position] = value
+
+    def _window(self, position: int) -> Optional[_MemoWindow]:
+        windows = self._windows
+        window = windows[-1]
+        if position >= window.start:
+            return window
+
+        for window in reversed(windows):
+            if position >= window.start:
+                return window
+        return None
+
+    def _evict(self):
+        windows = self._windows
+        if len(windows) > 1:
+            self._size -= windows.popleft().size
+        else:
+            window = windows[0]
+            self._size -= window.size
+            window.rules.clear()
+            window.size = 0
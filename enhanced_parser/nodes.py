@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import Union
+
+
+@dataclass(frozen=True, slots=True)
+class VarNode:
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class PairNode:
+    """
+    VAR '=' VAR element e.g. a=b
+    """
+    name: str
+    value: str
+
+
+@dataclass(frozen=True, slots=True)
+class ListNode:
+    """
+    Nodes are immutable, so a subtree memoized while speculating is shared by the committed parse.
+    """
+    elements: tuple[Union[VarNode, PairNode, 'ListNode'], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class AssignNode:
+    left: ListNode
+    right: ListNode
+
+
+Element = Union[VarNode, PairNode, ListNode]
+Stat = Union[ListNode, AssignNode]
@@ -1,6 +1,12 @@
-from core.lexer import TokenType, Token, ListLexer
+from functools import wraps
+from typing import Optional, Union
 
-from collections import defaultdict
+from core.lexer import TokenType, Token, ListLexer
+from core.token_buffer import TokenBuffer
+from parser_generator.grammar import parse_grammar
+from parser_generator.prediction import AdaptivePredictor
+from .memo import MemoTable
+from .nodes import AssignNode, Element, ListNode, PairNode, Stat, VarNode
 
 
 class ParserException(Exception):
@@ -17,162 +23,239 @@ class SpeculationException(ParserException):
 
 def save_and_restore_p(method):
     def inner(self, *args, **kwargs):
-        self._save_p()
+        self._mark()
         returned = method(self, *args, **kwargs)
-        self._restore_p()
+        self._release()
         return returned
     return inner
 
 
+class _Failure:
+    __slots__ = ('position', 'expected', 'found')
+
+    def __init__(self, position: int, expected: TokenType, found: TokenType):
+        # accumulative position of the mismatched token
+        self.position = position
+        self.expected = expected
+        self.found = found
+
+
+def memoize(method):
+    """
+    Memoize result of a rule by accumulative position where it starts:
+    (accumulative position where it ends, node) for success and _Failure for failure.
+    A rule is parsed at most once per position, so speculation keeps parsing linear
+    and the committed parse reuses nodes built while speculating.
+    """
+    rule = method.__name__
+
+    @wraps(method)
+    def inner(self):
+        start_accumulative_p = self._accumulative_p()
+        if (memo := self._memo.get(rule, start_accumulative_p)) is not None:
+            if isinstance(memo, _Failure):
+                self._fail(memo)
+                return None
+            end_accumulative_p, node = memo
+            self._p = end_accumulative_p - self._retrieved_buffer_size
+            return node
+
+        if (node := method(self)) is None:
+            self._memo.put(rule, start_accumulative_p, self._failure)
+            return None
+        self._memo.put(rule, start_accumulative_p, (self._accumulative_p(), node))
+        return node
+    return inner
+
+
 class Parser:
-    def __init__(self, lexer: ListLexer):
+    def __init__(self, lexer: ListLexer, max_memo_entries: Optional[int] = None):
         self._lexer = lexer
         self._lookahead_buffer = []
 
-        self._lock_buffer_reset = False
+        # number of tokens released from the head of lookahead buffer
         self._retrieved_buffer_size = 0
 
         self._p = -1
-        self._saved_p = -1
+        # accumulative positions to return to, the oldest first
+        self._marks: list[int] = []
+        # last mismatch while speculating
+        self._failure: Optional[_Failure] = None
 
         # caches for already parsed rule
-        self._parsed_caches = defaultdict(dict)
+        self._memo = MemoTable(max_memo_entries)
 
         self._consume()
 
-    def parse(self):
-        self._stat()
+    def parse(self) -> Stat:
+        node = self._stat()
         self._match(TokenType.EOF)
+        return node
 
-    def _stat(self):
+    def _stat(self) -> Stat:
         """
         stat: list EOF | assign EOF;
         :return:
         """
         if self._speculate_list():
-            self._list()
-            self._match(TokenType.EOF)
+            return self._list_stat()
         elif self._speculate_assign():
-            self._assign()
-            self._match(TokenType.EOF)
+            return self._assign_stat()
         else:
             raise SpeculationException(f'expecting stat but found {self._lookahead_token(0)}')
 
     @save_and_restore_p
     def _speculate_list(self) -> bool:
-        success = True
-        try:
-            self._list()
-            self._match(TokenType.EOF)
-        except MisMatchException:
-            success = False
-        return success
+        return self._list_stat() is not None
 
     @save_and_restore_p
     def _speculate_assign(self) -> bool:
-        success = True
-        try:
-            self._assign()
-            self._match(TokenType.EOF)
-        except MisMatchException:
-            success = False
-        return success
-
-    def _save_p(self):
-        self._lock_buffer_reset = True
-        self._saved_p = self._p
+        return self._assign_stat() is not None
 
-    def _restore_p(self):
-        self._p = self._saved_p
-        self._saved_p = -1
-        self._lock_buffer_reset = False
-
-    def _assign(self):
+    @memoize
+    def _list_stat(self) -> Optional[ListNode]:
         """
-        assign: List '=' List;
+        list_stat: list EOF
         :return:
         """
-        self._list()
-        self._match(TokenType.EQUAL)
-        self._list()
+        if (node := self._list()) is None or not self._match(TokenType.EOF):
+            return None
+        return node
 
-    def _list(self):
+    @memoize
+    def _assign_stat(self) -> Optional[AssignNode]:
         """
-        list: '[' elements ']'
+        assign_stat: assign EOF
         :return:
         """
-        cache_key = '_list'
+        if (node := self._assign()) is None or not self._match(TokenType.EOF):
+            return None
+        return node
 
-        start_accumulative_p = self._accumulative_p()
-        if (start_end_p_tuple := self._parsed_caches[cache_key].get(start_accumulative_p)) is not None:
-            self._p = start_end_p_tuple[1]
-            return
+    def _mark(self):
+        self._marks.append(self._accumulative_p())
 
-        start_p = self._p
-        self._match(TokenType.LBRACK)
-        if self._lookahead_token(0).type != TokenType.RBRACK:
-            self._elements()
-        self._match(TokenType.RBRACK)
-        end_p = self._p
+    def _release(self):
+        self._p = self._marks.pop() - self._retrieved_buffer_size
 
-        self._parsed_caches[cache_key][start_accumulative_p] = (start_p, end_p)
+    def _speculating(self) -> bool:
+        return bool(self._marks)
 
-    def _elements(self):
+    @memoize
+    def _assign(self) -> Optional[AssignNode]:
         """
-        elements: element (',' element)*
+        assign: List '=' List;
         :return:
         """
-        self._element()
-        while self._lookahead_token(0).type == TokenType.COMMA:
-            self._match(TokenType.COMMA)
-            self._element()
+        if (left := self._list()) is None or not self._match(TokenType.EQUAL) or (right := self._list()) is None:
+            return None
+        return AssignNode(left, right)
 
-    def _element(self):
+    @memoize
+    def _list(self) -> Optional[ListNode]:
+        """
+        list: '[' elements ']'
+        :return:
+        """
+        if not self._match(TokenType.LBRACK):
+            return None
+        elements = ()
+        if self._lookahead_type(0) != TokenType.RBRACK and (elements := self._elements()) is None:
+            return None
+        if not self._match(TokenType.RBRACK):
+            return None
+        return ListNode(elements)
+
+    def _elements(self) -> Optional[tuple[Element, ...]]:
+        """
+        elements: element (',' element)*
+        :return:
+        """
+        if (element := self._element()) is None:
+            return None
+        elements = [element]
+        while self._lookahead_type(0) == TokenType.COMMA:
+            if not self._match(TokenType.COMMA) or (element := self._element()) is None:
+                return None
+            elements.append(element)
+        return tuple(elements)
+
+    def _element(self) -> Optional[Element]:
         """
         element: VAR '=' VAR | VAR | list
         :return:
         """
-        if self._lookahead_token(0).type == TokenType.VAR and self._lookahead_token(1).type == TokenType.EQUAL:
-            # VAR=VAR case e.g. a=b
-            self._match(TokenType.VAR)
-            self._match(TokenType.EQUAL)
-            self._match(TokenType.VAR)
-        elif self._lookahead_token(0).type == TokenType.VAR:
-            self._match(TokenType.VAR)
+        if self._lookahead_type(0) == TokenType.VAR:
+            return self._var_element()
         else:
-            self._list()
+            return self._list()
+
+    def _var_element(self) -> Optional[Union[VarNode, PairNode]]:
+        """
+        element: VAR '=' VAR | VAR
+        :return:
+        """
+        name = self._lookahead_token(0).text
+        self._match(TokenType.VAR)
+        if self._lookahead_type(0) != TokenType.EQUAL:
+            return VarNode(name)
 
-    def _match(self, token_type: TokenType):
-        if self._lookahead_token(0).type == token_type:
+        # VAR=VAR case e.g. a=b
+        self._match(TokenType.EQUAL)
+        value = self._lookahead_token(0).text
+        if not self._match(TokenType.VAR):
+            return None
+        return PairNode(name, value)
+
+    def _match(self, token_type: TokenType) -> bool:
+        """
+        While speculating, a mismatch is returned as False and recorded in self._failure
+        instead of raising MisMatchException, so that failed alternatives are cheap.
+        """
+        if (found := self._lookahead_type(0)) == token_type:
             self._consume()
-        else:
-            raise MisMatchException(f'expecting {token_type}; found {self._lookahead_token(0).type}')
+            return True
+        return self._fail(_Failure(self._accumulative_p(), token_type, found))
+
+    def _fail(self, failure: _Failure) -> bool:
+        if not self._speculating():
+            raise MisMatchException(f'expecting {failure.expected}; found {failure.found}')
+        self._failure = failure
+        return False
 
     def _lookahead_token(self, i: int) -> Token:
         self._sync(i+1)
         return self._lookahead_buffer[self._p+i]
 
+    def _lookahead_type(self, i: int) -> TokenType:
+        return self._lookahead_token(i).type
+
     def _consume(self):
         self._p += 1
-        if self._p == len(self._lookahead_buffer) and not self._lock_buffer_reset:
-            self._reset_buffer()
-            self._remove_old_caches()
+        if self._p == len(self._lookahead_buffer):
+            self._compact_buffer()
         self._sync(1)
 
-    def _reset_buffer(self):
-        self._retrieved_buffer_size += self._retrieved_buffer_size + len(self._lookahead_buffer)
-        self._p = 0
-        self._lookahead_buffer = []
+    def _compact_buffer(self):
+        """
+        Release tokens before the oldest mark, or all consumed tokens without marks.
+        """
+        if self._marks:
+            n = self._marks[0] - self._retrieved_buffer_size
+        else:
+            n = self._p
+        if n == 0:
+            return
+
+        del self._lookahead_buffer[:n]
+        self._retrieved_buffer_size += n
+        self._p -= n
+        self._remove_old_caches()
 
     def _remove_old_caches(self):
-        for cache_method_key in self._parsed_caches.keys():
-            cache_for_method = self._parsed_caches[cache_method_key]
-            delete_keys = []
-            for cached_acc_p in cache_for_method.keys():
-                if cached_acc_p < self._retrieved_buffer_size:
-                    delete_keys.append(cached_acc_p)
-            for key in delete_keys:
-                cache_for_method.pop(key)
+        # caches before new buffer are never used again
+        self._memo.start_window(self._retrieved_buffer_size)
+        self._memo.release(self._retrieved_buffer_size)
 
     def _accumulative_p(self):
         return self._retrieved_buffer_size + self._p
@@ -185,3 +268,151 @@ class Parser:
     def _fill(self, n: int):
         for _ in range(n):
             self._lookahead_buffer.append(self._lexer.next_token())
+
+
+class IterativeParser(Parser):
+    """
+    Parser parsing nested lists in a loop instead of recursion, so that nesting depth is not limited
+    by the recursion limit. Accepts and rejects the same inputs with the same errors as Parser,
+    and memoizes every nested list like memoize does.
+    """
+    def _list(self) -> Optional[ListNode]:
+        """
+        list: '[' elements ']'
+        Every open list waits for ',' or ']' after its current element,
+        so the explicit stack only keeps where open lists start and their elements so far.
+        An element which is not VAR is parsed as a list by the next iteration.
+        :return:
+        """
+        open_lists: list[tuple[int, list[Element]]] = []
+        while True:
+            # '[' of the outermost list or of a list as an element
+            start_accumulative_p = self._accumulative_p()
+            if (memo := self._memo.get('_list', start_accumulative_p)) is None:
+                open_lists.append((start_accumulative_p, []))
+                if not self._match(TokenType.LBRACK):
+                    return self._fail_lists(open_lists)
+                if self._lookahead_type(0) != TokenType.RBRACK:
+                    if self._lookahead_type(0) != TokenType.VAR:
+                        continue
+                    if (element := self._var_element()) is None:
+                        return self._fail_lists(open_lists)
+                    open_lists[-1][1].append(element)
+            elif isinstance(memo, _Failure):
+                self._fail(memo)
+                return self._fail_lists(open_lists)
+            else:
+                end_accumulative_p, node = memo
+                self._p = end_accumulative_p - self._retrieved_buffer_size
+                if not open_lists:
+                    return node
+                open_lists[-1][1].append(node)
+
+            # after an element of the innermost open list: (',' element)* ']'
+            while True:
+                if self._lookahead_type(0) == TokenType.COMMA:
+                    self._match(TokenType.COMMA)
+                    if self._lookahead_type(0) != TokenType.VAR:
+                        break
+                    if (element := self._var_element()) is None:
+                        return self._fail_lists(open_lists)
+                    open_lists[-1][1].append(element)
+                    continue
+
+                if not self._match(TokenType.RBRACK):
+                    return self._fail_lists(open_lists)
+                start_accumulative_p, elements = open_lists.pop()
+                node = ListNode(tuple(elements))
+                self._memo.put('_list', start_accumulative_p, (self._accumulative_p(), node))
+                if not open_lists:
+                    return node
+                open_lists[-1][1].append(node)
+
+    def _fail_lists(self, open_lists: list[tuple[int, list[Element]]]) -> None:
+        # a failed list fails all lists it is nested in
+        for start_accumulative_p, _ in reversed(open_lists):
+            self._memo.put('_list', start_accumulative_p, self._failure)
+        return None
+
+
+_GRAMMAR = parse_grammar('''
+    stat: list EOF | assign EOF ;
+    assign: list EQUAL list ;
+    list: LBRACK elements? RBRACK ;
+    elements: element (COMMA element)* ;
+    element: VAR EQUAL VAR | VAR | list ;
+''')
+
+
+class AdaptiveParser(Parser):
+    """
+    Parser predicting the alternative of stat by adaptive LL(*) prediction instead of speculation.
+    The prediction looks ahead only to the token after the first list, and is cached as a DFA
+    shared by all instances, so stat is parsed in one pass and repeated shapes of input are dict lookups.
+    As no rule is parsed twice, rules are not memoized and no position is marked, which makes short inputs
+    faster than Parser. A long first list is still walked by the prediction before it is parsed,
+    while Parser speculates it once and reuses the memo, so stat of a long list may be slower.
+    Inputs are accepted and rejected as Parser does, but a syntax error after the predicted point
+    is MisMatchException of the predicted alternative, and a syntax error before it is reported
+    at the token where no alternative matches any more.
+    """
+    _predictor = AdaptivePredictor(_GRAMMAR, TokenType)
+
+    _list_stat = Parser._list_stat.__wrapped__
+    _assign_stat = Parser._assign_stat.__wrapped__
+    _assign = Parser._assign.__wrapped__
+    _list = Parser._list.__wrapped__
+
+    def _stat(self) -> Stat:
+        """
+        stat: list EOF | assign EOF;
+        :return:
+        """
+        alternative = self._predictor.predict('stat', self._lookahead_type)
+        if alternative == 0:
+            return self._list_stat()
+        elif alternative == 1:
+            return self._assign_stat()
+        else:
+            index = self._predictor.error_index('stat', self._lookahead_type)
+            raise SpeculationException(f'expecting stat but found {self._lookahead_token(index)}')
+
+    def _lookahead_token(self, i: int) -> Token:
+        try:
+            return self._lookahead_buffer[self._p + i]
+        except IndexError:
+            return super()._lookahead_token(i)
+
+    def _lookahead_type(self, i: int) -> TokenType:
+        try:
+            return self._lookahead_buffer[self._p + i].type
+        except IndexError:
+            return super()._lookahead_token(i).type
+
+    def _consume(self):
+        # without marks, the buffer is emptied when every token is consumed
+        self._p += 1
+        if self._p == len(self._lookahead_buffer):
+            self._retrieved_buffer_size += self._p
+            self._lookahead_buffer.clear()
+            self._lookahead_buffer.append(self._lexer.next_token())
+            self._p = 0
+
+
+class TokenBufferParser(Parser):
+    """
+    Parser reading tokens directly from a columnar TokenBuffer.
+    The whole input is already lexed, so positions are token indexes and the buffer is never compacted.
+    """
+    def __init__(self, tokens: TokenBuffer, max_memo_entries: Optional[int] = None):
+        self._tokens = tokens
+        super().__init__(None, max_memo_entries)
+
+    def _consume(self):
+        self._p += 1
+
+    def _lookahead_token(self, i: int) -> Token:
+        return self._tokens.token(self._p + i)
+
+    def _lookahead_type(self, i: int) -> TokenType:
+        return self._tokens.type(self._p + i)
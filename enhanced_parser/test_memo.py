@@ -0,0 +1,54 @@
+import pytest
+
+from .memo import MemoTable
+
+
+class TestMemoTable:
+    def test_get_put(self):
+        memo = MemoTable()
+        memo.put('_list', 3, (3, 5))
+        memo.start_window(10)
+        memo.put('_list', 12, (2, 4))
+
+        assert memo.get('_list', 3) == (3, 5)
+        assert memo.get('_list', 12) == (2, 4)
+        assert memo.get('_list', 4) is None
+        assert memo.get('_assign', 3) is None
+        assert len(memo) == 2
+
+    def test_release(self):
+        memo = MemoTable()
+        memo.put('_list', 3, (3, 5))
+        memo.start_window(10)
+        memo.put('_list', 12, (2, 4))
+        memo.start_window(20)
+        memo.put('_list', 21, (1, 2))
+
+        # window from 10 still has entries after 15
+        memo.release(15)
+        assert memo.get('_list', 3) is None
+        assert memo.get('_list', 12) == (2, 4)
+        assert len(memo) == 2
+
+        memo.release(20)
+        assert memo.get('_list', 12) is None
+        assert memo.get('_list', 21) == (1, 2)
+        assert len(memo) == 1
+
+        # released positions are not memoized again
+        memo.put('_list', 5, (5, 6))
+        assert memo.get('_list', 5) is None
+
+    def test_max_entries(self):
+        memo = MemoTable(max_entries=10)
+        for position in range(100):
+            memo.put('_list', position, position)
+            assert len(memo) <= 10
+
+        # recent entries survive eviction
+        assert memo.get('_list', 99) == 99
+        assert memo.get('_list', 0) is None
+
+    def test_constructor_fail(self):
+        with pytest.raises(ValueError):
+            MemoTable(max_entries=0)
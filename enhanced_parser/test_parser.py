@@ -1,7 +1,15 @@
+import re
+
 import pytest
 
-from core.lexer import ListLexer
-from .parser import Parser, SpeculationException
+from core.lexer import ListLexer, TokenType, tokenize
+from .nodes import AssignNode, ListNode, PairNode, VarNode
+from .parser import AdaptiveParser, IterativeParser, Parser, MisMatchException, ParserException, SpeculationException
+from .parser import TokenBufferParser
+
+
+class IterativeTokenBufferParser(IterativeParser, TokenBufferParser):
+    pass
 
 
 class TestListParser:
@@ -43,3 +51,222 @@ class TestListParser:
         parser = Parser(lexer)
         with pytest.raises(SpeculationException):
             parser.parse()
+
+    @pytest.mark.parametrize('input_text', _parse_success_test_cases())
+    def test_token_buffer_parse_success(self, input_text):
+        TokenBufferParser(tokenize(input_text)).parse()
+
+    @pytest.mark.parametrize('input_text', _parse_fail_test_cases())
+    def test_token_buffer_parse_fail(self, input_text):
+        parser = TokenBufferParser(tokenize(input_text))
+        with pytest.raises(SpeculationException):
+            parser.parse()
+
+    @pytest.mark.parametrize('input_text', _parse_success_test_cases())
+    def test_parse_success_with_max_memo_entries(self, input_text):
+        Parser(ListLexer(input_text), max_memo_entries=1).parse()
+
+    @pytest.mark.parametrize('input_text, rule, position, failure_position', [
+        ('[a, b]=[c, d', '_list_stat', 0, 5),
+        ('[a, b]=[c, d', '_assign_stat', 0, 10),
+        ('[a, b]=[c, d', '_list', 6, 10),
+        ('[a, [b, c]', '_list', 0, 8),
+    ])
+    def test_parse_fail_memoizes_failure(self, input_text, rule, position, failure_position):
+        parser = TokenBufferParser(tokenize(input_text))
+        with pytest.raises(SpeculationException):
+            parser.parse()
+
+        failure = parser._memo.get(rule, position)
+        assert failure.position == failure_position
+
+    @pytest.mark.parametrize('input_text, list_count', [
+        ('[a, ' * 100 + 'b' + ']' * 100, 100),
+        ('[a, ' * 100 + 'b' + ']' * 100 + '=[c]', 101),
+        ('[a, ' * 100 + 'b' + ']' * 100 + '=[c', 101),
+    ])
+    def test_parse_elements_once_per_list(self, input_text, list_count):
+        class CountingParser(TokenBufferParser):
+            elements_count = 0
+
+            def _elements(self):
+                CountingParser.elements_count += 1
+                return super()._elements()
+
+        try:
+            CountingParser(tokenize(input_text)).parse()
+        except SpeculationException:
+            pass
+        assert CountingParser.elements_count == list_count
+
+    @pytest.mark.parametrize('input_text, message', [
+        ('[a, b', 'expecting TokenType.RBRACK; found TokenType.EOF'),
+        ('[a, =]', 'expecting TokenType.LBRACK; found TokenType.EQUAL'),
+        ('a', 'expecting TokenType.LBRACK; found TokenType.VAR'),
+    ])
+    def test_committed_mismatch_raises(self, input_text, message):
+        parser = TokenBufferParser(tokenize(input_text))
+        assert not parser._speculate_list()
+        with pytest.raises(MisMatchException, match=message):
+            parser._list()
+
+    def test_consume_counts_accumulative_p(self):
+        parser = Parser(ListLexer('[a, b, c, d]'))
+        for p in range(1, 9):
+            parser._consume()
+            assert parser._accumulative_p() == p
+            assert parser._lookahead_type(0) == tokenize('[a, b, c, d]').type(p)
+
+    def test_nested_marks(self):
+        parser = Parser(ListLexer('[a, b, c, d]'))
+        parser._mark()
+        parser._consume()
+        parser._consume()
+        parser._mark()
+        for _ in range(4):
+            parser._consume()
+        parser._release()
+        assert parser._accumulative_p() == 2
+        parser._release()
+        assert parser._accumulative_p() == 0
+        assert parser._lookahead_type(0) == TokenType.LBRACK
+
+    def test_buffer_compacted_to_oldest_mark(self):
+        input_text = '[' + ', '.join(['a'] * 100) + ']'
+        parser = Parser(ListLexer(input_text))
+        for _ in range(50):
+            parser._consume()
+        parser._mark()
+        for _ in range(100):
+            parser._consume()
+        # tokens before the mark are released
+        assert len(parser._lookahead_buffer) <= 101
+
+        parser._release()
+        assert parser._accumulative_p() == 50
+        assert parser._lookahead_type(0) == tokenize(input_text).type(50)
+        for _ in range(151):
+            parser._consume()
+        assert parser._lookahead_type(0) == TokenType.EOF
+        assert len(parser._lookahead_buffer) <= 1
+
+    @pytest.mark.parametrize('input_text', _parse_success_test_cases())
+    def test_iterative_parse_success(self, input_text):
+        IterativeParser(ListLexer(input_text)).parse()
+
+    @pytest.mark.parametrize('input_text', _parse_fail_test_cases())
+    def test_iterative_parse_fail(self, input_text):
+        parser = IterativeParser(ListLexer(input_text))
+        with pytest.raises(SpeculationException):
+            parser.parse()
+
+    @pytest.mark.parametrize('input_text', _parse_fail_test_cases())
+    def test_iterative_committed_mismatch_is_same(self, input_text):
+        with pytest.raises(MisMatchException) as expected:
+            Parser(ListLexer(input_text))._list_stat()
+        with pytest.raises(MisMatchException, match=re.escape(str(expected.value))):
+            IterativeParser(ListLexer(input_text))._list_stat()
+
+    @pytest.mark.parametrize('input_text', _parse_success_test_cases() + _parse_fail_test_cases())
+    def test_iterative_memo_is_same(self, input_text):
+        parser = Parser(ListLexer(input_text))
+        iterative_parser = IterativeParser(ListLexer(input_text))
+        for p in (parser, iterative_parser):
+            p._speculate_list()
+            p._speculate_assign()
+
+        for position in range(len(tokenize(input_text))):
+            expected = parser._memo.get('_list', position)
+            memo = iterative_parser._memo.get('_list', position)
+            if isinstance(expected, tuple) or expected is None:
+                assert memo == expected
+            else:
+                assert memo.position == expected.position
+
+    @pytest.mark.parametrize('depth', [1, 100, 10000])
+    def test_iterative_parse_deep_list(self, depth):
+        input_text = '[a, ' * depth + 'b=c' + ']' * depth
+        IterativeParser(ListLexer(input_text)).parse()
+        IterativeParser(ListLexer(input_text + '=[]')).parse()
+
+        with pytest.raises(SpeculationException):
+            IterativeParser(ListLexer(input_text + '=[')).parse()
+
+    @staticmethod
+    def _parse_tree_test_cases() -> list[tuple[str, object]]:
+        return [
+            ('[]', ListNode(())),
+            ('[a, b=c]', ListNode((VarNode('a'), PairNode('b', 'c')))),
+            ('[a, [], [b, [c]]]', ListNode((
+                VarNode('a'), ListNode(()), ListNode((VarNode('b'), ListNode((VarNode('c'),)))),
+            ))),
+            ('[a, b]=[[c], de=f]', AssignNode(
+                ListNode((VarNode('a'), VarNode('b'))),
+                ListNode((ListNode((VarNode('c'),)), PairNode('de', 'f'))),
+            )),
+        ]
+
+    @pytest.mark.parametrize('input_text, expected', _parse_tree_test_cases())
+    def test_parse_tree(self, input_text, expected):
+        assert Parser(ListLexer(input_text)).parse() == expected
+        assert IterativeParser(ListLexer(input_text)).parse() == expected
+        assert TokenBufferParser(tokenize(input_text)).parse() == expected
+        assert AdaptiveParser(ListLexer(input_text)).parse() == expected
+
+    @pytest.mark.parametrize('parser_class', [TokenBufferParser, IterativeTokenBufferParser])
+    def test_parse_reuses_speculated_nodes(self, parser_class):
+        # memo of TokenBufferParser is not released after parsing
+        parser = parser_class(tokenize('[a, [b]]=[c]'))
+        node = parser.parse()
+        # the left list was built by the failed list speculation
+        _, left = parser._memo.get('_list', 0)
+        assert node.left is left
+        _, inner = parser._memo.get('_list', 3)
+        assert node.left.elements[1] is inner
+
+    @pytest.mark.parametrize('input_text', _parse_fail_test_cases())
+    def test_adaptive_parse_fail(self, input_text):
+        with pytest.raises(ParserException):
+            AdaptiveParser(ListLexer(input_text)).parse()
+
+    @pytest.mark.parametrize('input_text, exception', [
+        # no alternative matches the token after the first list
+        ('[a, b] c', SpeculationException),
+        ('[a, b', SpeculationException),
+        # '=' after the first list decides assign
+        ('[a, b]=[c, d', MisMatchException),
+    ])
+    def test_adaptive_parse_fail_exception(self, input_text, exception):
+        with pytest.raises(exception):
+            AdaptiveParser(ListLexer(input_text)).parse()
+
+    @pytest.mark.parametrize('input_text, found', [
+        ('[a b]', "text='b'"),
+        ('[a, [b]', "type=<TokenType.EOF"),
+        ('[a, b] c', "text='c'"),
+    ])
+    def test_adaptive_parse_fail_at_token(self, input_text, found):
+        # reported at the token where no alternative of stat matches, not at the first token of stat
+        with pytest.raises(SpeculationException, match=re.escape(found)):
+            AdaptiveParser(ListLexer(input_text)).parse()
+
+    def test_adaptive_parse_is_not_memoized(self):
+        parser = AdaptiveParser(ListLexer('[a, [b]]=[c]'))
+        parser.parse()
+        assert parser._memo.get('_list', 0) is None
+
+    def test_adaptive_parse_does_not_speculate(self, monkeypatch):
+        def mark(self):
+            raise AssertionError('speculation')
+
+        monkeypatch.setattr(AdaptiveParser, '_mark', mark)
+        assert AdaptiveParser(ListLexer('[a, [b]]=[c]')).parse() == AssignNode(
+            ListNode((VarNode('a'), ListNode((VarNode('b'),)))), ListNode((VarNode('c'),)),
+        )
+
+    def test_adaptive_prediction_is_cached(self):
+        AdaptiveParser(ListLexer('[a, [b=c]]=[d]')).parse()
+        state_count = AdaptiveParser._predictor.dfa_state_count
+        # the same shape of input walks the cached DFA
+        AdaptiveParser(ListLexer('[e, [f=g]]=[h]')).parse()
+        assert AdaptiveParser._predictor.dfa_state_count == state_count
@@ -0,0 +1,198 @@
+from array import array
+from typing import TextIO
+
+from .lexer import TokenType
+from .parser import Parser, Instruction, AInstruction, CInstruction, LInstruction
+
+
+# bump when emitted machine code changes, so that cached programs are not reused
+ASSEMBLER_VERSION = 1
+
+
+class AssemblerException(Exception):
+    pass
+
+
+PREDEFINED_SYMBOLS = {
+    'SP': 0,
+    'LCL': 1,
+    'ARG': 2,
+    'THIS': 3,
+    'THAT': 4,
+    'SCREEN': 16384,
+    'KBD': 24576,
+    **{f'R{i}': i for i in range(16)},
+}
+
+VARIABLE_START_ADDRESS = 16
+MAX_A_VALUE = (1 << 15) - 1
+
+DEST_CODES = {
+    '': 0b000,
+    'M': 0b001,
+    'D': 0b010,
+    'MD': 0b011,
+    'A': 0b100,
+    'AM': 0b101,
+    'AD': 0b110,
+    'AMD': 0b111,
+}
+
+JUMP_CODES = {
+    '': 0b000,
+    'JGT': 0b001,
+    'JEQ': 0b010,
+    'JGE': 0b011,
+    'JLT': 0b100,
+    'JNE': 0b101,
+    'JLE': 0b110,
+    'JMP': 0b111,
+}
+
+
+def _comp_codes() -> dict[str, int]:
+    # a bit = 0 forms; a bit = 1 forms are the same with A replaced by M
+    a_codes = {
+        '0': 0b101010,
+        '1': 0b111111,
+        '-1': 0b111010,
+        'D': 0b001100,
+        'A': 0b110000,
+        '!D': 0b001101,
+        '!A': 0b110001,
+        '-D': 0b001111,
+        '-A': 0b110011,
+        'D+1': 0b011111,
+        'A+1': 0b110111,
+        'D-1': 0b001110,
+        'A-1': 0b110010,
+        'D+A': 0b000010,
+        'D-A': 0b010011,
+        'A-D': 0b000111,
+        'D&A': 0b000000,
+        'D|A': 0b010101,
+    }
+    codes = {}
+    for comp, code in a_codes.items():
+        codes[comp] = code
+        if 'A' in comp:
+            codes[comp.replace('A', 'M')] = 1 << 6 | code
+
+    # commutative operators between registers may be written in both orders e.g. A+D
+    for comp, code in list(codes.items()):
+        if len(comp) == 3 and comp[1] in '+&|' and comp[2] in 'ADM':
+            codes[comp[2] + comp[1] + comp[0]] = code
+    return codes
+
+
+COMP_CODES = _comp_codes()
+
+
+class Assembler:
+    """
+    Two pass assembler: the first pass defines labels, the second pass resolves symbols
+    and emits one 16 bit machine word per A or C instruction.
+    assemble_single_pass() emits the same words reading the instructions only once.
+    """
+    def __init__(self, parser: Parser):
+        self._parser = parser
+        self.symbols = dict(PREDEFINED_SYMBOLS)
+        self.labels = {}
+        self._next_variable_address = VARIABLE_START_ADDRESS
+
+    def assemble(self) -> array:
+        instructions = self._parser.parse()
+
+        address = 0
+        for instruction in instructions:
+            if isinstance(instruction, LInstruction):
+                self._define_label(instruction.symbol, address)
+            else:
+                address += 1
+
+        words = array('H')
+        for instruction in instructions:
+            if not isinstance(instruction, LInstruction):
+                words.append(self._word(instruction))
+        return words
+
+    def assemble_single_pass(self) -> array:
+        """
+        Emit words while parsing, for inputs which can not be read twice.
+        A symbol not defined yet may be a label defined later, so the words using it are recorded
+        in a fixup table and patched when the label is defined.
+        Symbols still unresolved at the end are variables, allocated in order of their first use.
+        """
+        words = array('H')
+        fixups: dict[str, list[int]] = {}
+        for instruction in self._parser.instructions():
+            if isinstance(instruction, LInstruction):
+                address = len(words)
+                self._define_label(instruction.symbol, address)
+                for index in fixups.pop(instruction.symbol, ()):
+                    words[index] = address
+            elif isinstance(instruction, CInstruction):
+                words.append(c_instruction_word(instruction))
+            elif instruction.value.type == TokenType.VAR and instruction.value.text not in self.symbols:
+                fixups.setdefault(instruction.value.text, []).append(len(words))
+                words.append(0)
+            else:
+                words.append(self._a_value(instruction))
+
+        for symbol, indexes in fixups.items():
+            address = self._define_variable(symbol)
+            for index in indexes:
+                words[index] = address
+        return words
+
+    def _define_label(self, symbol: str, address: int):
+        if symbol in self.labels:
+            raise AssemblerException(f'label {symbol} is defined twice')
+        self.labels[symbol] = address
+        self.symbols[symbol] = address
+
+    def _word(self, instruction: Instruction) -> int:
+        if isinstance(instruction, AInstruction):
+            return self._a_value(instruction)
+        return c_instruction_word(instruction)
+
+    def _a_value(self, instruction: AInstruction) -> int:
+        token = instruction.value
+        if token.type == TokenType.INT:
+            if (value := int(token.text)) > MAX_A_VALUE:
+                raise AssemblerException(f'{token.text} is larger than {MAX_A_VALUE}')
+            return value
+        elif token.type == TokenType.PREDEFINED and token.text not in self.symbols:
+            # R00 ~ R05 are also predefined symbols
+            return int(token.text[1:])
+
+        if (address := self.symbols.get(token.text)) is None:
+            address = self._define_variable(token.text)
+        return address
+
+    def _define_variable(self, symbol: str) -> int:
+        address = self._next_variable_address
+        if address > MAX_A_VALUE:
+            raise AssemblerException(f'no more address for variable {symbol}')
+        self.symbols[symbol] = address
+        self._next_variable_address += 1
+        return address
+
+
+def c_instruction_word(instruction: CInstruction) -> int:
+    if (comp_code := COMP_CODES.get(instruction.comp)) is None:
+        raise AssemblerException(f'comp {instruction.comp} can not be encoded')
+    return 0b111 << 13 | comp_code << 6 | DEST_CODES[instruction.dest] << 3 | JUMP_CODES[instruction.jump]
+
+
+def to_hack_text(words: array) -> str:
+    """
+    :return: .hack file content, one 16 digit binary number per line
+    """
+    if not words:
+        return ''
+    return '\n'.join(map('{:016b}'.format, words)) + '\n'
+
+
+def write_hack(words: array, file: TextIO):
+    file.write(to_hack_text(words))
@@ -0,0 +1,123 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Iterable, Optional
+
+from .assembler import Assembler, AssemblerException, write_hack
+from .cache import AssemblyCache, CachedProgram
+from .lexer import StreamLexer, LexerNextTokenException
+from .parser import Parser, MismatchException
+
+# errors reported per file instead of aborting the batch
+FILE_ERRORS = (LexerNextTokenException, MismatchException, AssemblerException, OSError, UnicodeDecodeError)
+
+
+@dataclass
+class BatchResult:
+    path: str
+    output_path: Optional[str]  # None if assembling failed
+    error: Optional[str] = None
+    cached: bool = False  # True if machine code was taken from the cache
+
+
+def hack_path(path: str, output_dir: Optional[str] = None) -> str:
+    """
+    :return: path of .hack file for .asm file path e.g. Max.asm -> Max.hack
+    """
+    root, ext = os.path.splitext(path)
+    if ext != '.asm':
+        root = path
+    if output_dir is not None:
+        root = os.path.join(output_dir, os.path.basename(root))
+    return root + '.hack'
+
+
+def assemble_file(path: str, output_dir: Optional[str] = None, cache_dir: Optional[str] = None) -> BatchResult:
+    output_path = hack_path(path, output_dir)
+    try:
+        program = None
+        if cache_dir is not None:
+            cache = AssemblyCache(cache_dir)
+            with open(path, 'rb') as file:
+                key = cache.file_key(file)
+            program = cache.get(key)
+
+        cached = program is not None
+        if not cached:
+            with StreamLexer(path) as lexer:
+                assembler = Assembler(Parser(lexer))
+                program = CachedProgram(assembler.assemble_single_pass(), assembler.labels)
+            if cache_dir is not None:
+                cache.put(key, program)
+
+        with open(output_path, 'w') as file:
+            write_hack(program.words, file)
+    except FILE_ERRORS as e:
+        return BatchResult(path, None, f'{type(e).__name__}: {e}')
+    return BatchResult(path, output_path, cached=cached)
+
+
+def assemble_files(
+        paths: Iterable[str], output_dir: Optional[str] = None, cache_dir: Optional[str] = None,
+        max_workers: Optional[int] = None, chunksize: Optional[int] = None) -> list[BatchResult]:
+    """
+    Assemble files in worker processes.
+    Files whose .hack files would overwrite each other are not assembled but reported as errors.
+    :return: results in the same order as paths
+    """
+    paths = list(paths)
+    results = _duplicate_output_results(paths, output_dir)
+    pending = [path for path, result in zip(paths, results) if result is None]
+    max_workers = max_workers or os.cpu_count() or 1
+    if chunksize is None:
+        # a few chunks per worker keeps workers busy without paying IPC per file
+        chunksize = max(1, len(pending) // (max_workers * 4))
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        assemble = partial(assemble_file, output_dir=output_dir, cache_dir=cache_dir)
+        assembled = executor.map(assemble, pending, chunksize=chunksize)
+        return [result if result is not None else next(assembled) for result in results]
+
+
+def _duplicate_output_results(paths: list[str], output_dir: Optional[str]) -> list[Optional[BatchResult]]:
+    """
+    :return: error results of paths sharing a .hack file with other paths, None for the others
+    """
+    output_paths = [hack_path(path, output_dir) for path in paths]
+    indices_by_output: dict[str, list[int]] = {}
+    for i, output_path in enumerate(output_paths):
+        indices_by_output.setdefault(os.path.normcase(os.path.abspath(output_path)), []).append(i)
+
+    results: list[Optional[BatchResult]] = [None] * len(paths)
+    for indices in indices_by_output.values():
+        if len(indices) == 1:
+            continue
+        for i in indices:
+            others = ', '.join(paths[j] for j in indices if j != i)
+            results[i] = BatchResult(paths[i], None, f'output path {output_paths[i]} is shared with {others}')
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(prog='hack_assembly', description='assemble Hack .asm files into .hack files')
+    arg_parser.add_argument('paths', nargs='+', metavar='FILE')
+    arg_parser.add_argument('-o', '--output-dir', help='directory for .hack files (default: next to .asm files)')
+    arg_parser.add_argument('-j', '--jobs', type=int, help='number of worker processes (default: cpu count)')
+    arg_parser.add_argument('--cache-dir', help='directory of assembled programs reused for unchanged sources')
+    args = arg_parser.parse_args(argv)
+    if args.output_dir is not None:
+        try:
+            os.makedirs(args.output_dir, exist_ok=True)
+        except OSError as e:
+            arg_parser.error(f'cannot create output directory: {e}')
+
+    failed = 0
+    for result in assemble_files(args.paths, args.output_dir, args.cache_dir, args.jobs):
+        if result.error is not None:
+            failed += 1
+            print(f'{result.path}: {result.error}', file=sys.stderr)
+
+    return 1 if failed else 0
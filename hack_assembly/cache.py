@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from array import array
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+from .assembler import ASSEMBLER_VERSION
+
+
+@dataclass
+class CachedProgram:
+    words: array
+    labels: dict[str, int]
+
+
+class AssemblyCache:
+    """
+    On-disk cache of assembled programs, keyed by a hash of the source text and the assembler version.
+    Least recently used entries are evicted when the total size of entries exceeds max_bytes,
+    down to 3/4 of max_bytes, so that a full cache is not scanned again by the next put.
+
+    An entry is one file: a JSON header line followed by the machine words in little endian.
+    Entries are written to a temporary file and renamed, so processes can share one directory.
+    The total size is estimated in a small file updated by every put, so the directory is only scanned
+    when the estimate exceeds max_bytes. Concurrent puts may lose updates of the estimate,
+    which delays eviction to a later put.
+    """
+    DEFAULT_MAX_BYTES = 256 << 20
+    _SUFFIX = '.entry'
+    _SIZE_NAME = 'size'
+    # temporary files are not taken for entries, and are removed by eviction when writes left them behind
+    _TEMP_PREFIX = '.'
+    _TEMP_SUFFIX = '.tmp'
+    _TEMP_MAX_AGE_NS = 3600 * 10 ** 9
+    _READ_SIZE = 1 << 16
+    # eviction leaves the total size at most max_bytes * _LOW_WATER_NUMERATOR / _LOW_WATER_DENOMINATOR
+    _LOW_WATER_NUMERATOR = 3
+    _LOW_WATER_DENOMINATOR = 4
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(source: bytes) -> str:
+        hash_ = AssemblyCache._new_hash()
+        hash_.update(source)
+        return hash_.hexdigest()
+
+    @staticmethod
+    def file_key(file: BinaryIO) -> str:
+        hash_ = AssemblyCache._new_hash()
+        while chunk := file.read(AssemblyCache._READ_SIZE):
+            hash_.update(chunk)
+        return hash_.hexdigest()
+
+    def get(self, key: str) -> Optional[CachedProgram]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                header = json.loads(file.readline())
+                words = array('H')
+                words.frombytes(file.read())
+            if len(words) != header['size']:
+                return None
+            labels = header['labels']
+            # mark as recently used
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            # missing, evicted by another process or corrupted entry
+            return None
+
+        if sys.byteorder != 'little':
+            words.byteswap()
+        return CachedProgram(words, labels)
+
+    def put(self, key: str, program: CachedProgram):
+        words = program.words
+        if sys.byteorder != 'little':
+            words = array('H', words)
+            words.byteswap()
+        data = json.dumps({'size': len(words), 'labels': program.labels}).encode() + b'\n' + words.tobytes()
+        self._write(self._path(key), data)
+
+        # an entry replacing the same key is counted twice until the next scan
+        total_size = self._read_total_size()
+        if total_size is None or total_size + len(data) > self._max_bytes:
+            total_size = self._evict()
+        else:
+            total_size += len(data)
+        self._write(os.path.join(self._directory, self._SIZE_NAME), str(total_size).encode())
+
+    def _write(self, path: str, data: bytes):
+        fd, temp_path = tempfile.mkstemp(self._TEMP_SUFFIX, self._TEMP_PREFIX, self._directory)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _read_total_size(self) -> Optional[int]:
+        """
+        :return: estimated total size of entries, None if it is not known
+        """
+        try:
+            with open(os.path.join(self._directory, self._SIZE_NAME), 'rb') as file:
+                return int(file.read())
+        except (OSError, ValueError):
+            return None
+
+    def _evict(self) -> int:
+        """
+        Scan the directory, evicting temporary files left by interrupted writes, and least recently used entries
+        down to the low water mark if the total size exceeds max_bytes.
+        :return: total size of the remaining entries
+        """
+        entries = []
+        total_size = 0
+        temp_deadline = time.time_ns() - self._TEMP_MAX_AGE_NS
+        with os.scandir(self._directory) as dir_entries:
+            for entry in dir_entries:
+                is_temp = entry.name.startswith(self._TEMP_PREFIX) and entry.name.endswith(self._TEMP_SUFFIX)
+                if not is_temp and not entry.name.endswith(self._SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                    if is_temp:
+                        if stat.st_mtime_ns < temp_deadline:
+                            os.unlink(entry.path)
+                        continue
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        if total_size <= self._max_bytes:
+            return total_size
+
+        low_water = self._max_bytes * self._LOW_WATER_NUMERATOR // self._LOW_WATER_DENOMINATOR
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= low_water:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total_size -= size
+        return total_size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key + self._SUFFIX)
+
+    @staticmethod
+    def _new_hash():
+        hash_ = hashlib.sha256()
+        hash_.update(f'hack_assembly {ASSEMBLER_VERSION}\0'.encode())
+        return hash_
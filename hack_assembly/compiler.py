@@ -0,0 +1,282 @@
+from array import array
+from functools import lru_cache
+from typing import Callable, Iterable, Optional
+
+from .assembler import Assembler
+from .devices import KBD, SCREEN
+from .emulator import (
+    A_BIT, ADDRESS_MASK, COMP_SOURCES, D_BIT, HALT, M_BIT, PAGE_SHIFT, Decoded, Emulator, alu, decode
+)
+from .lexer import RegexLexer
+from .parser import Parser
+
+
+# ram, A, D, budget of cycles, write to screen, flags of written pages -> A, D, pc and cycles run
+BlockFunction = Callable[[array, int, int, int, Callable[[int, int], None], bytearray], tuple[int, int, int, int]]
+# (function, the most cycles run without looping) of a block, or HALT_BLOCK at the halt loop
+Block = tuple[Optional[BlockFunction], int]
+HALT_BLOCK: Block = (None, 0)
+# budget of a run without max_cycles
+UNLIMITED = 1 << 62
+# basic blocks followed into one function
+MAX_TRACE_BLOCKS = 16
+
+_CONDITIONS = {
+    0b001: '{} > 0',
+    0b010: '{} == 0',
+    0b011: '{} >= 0',
+    0b100: '{} < 0',
+    0b101: '{} != 0',
+    0b110: '{} <= 0',
+}
+
+
+def find_leaders(program: list[Decoded], labels: Iterable[int] = ()) -> frozenset[int]:
+    """
+    :return: addresses where basic blocks start: the first instruction, labels, instructions after jumps
+             and targets of jumps whose A is loaded right before
+    """
+    leaders = {0, *labels}
+    for pc, instruction in enumerate(program):
+        if instruction.__class__ is not tuple or not instruction[2]:
+            continue
+        leaders.add(pc + 1)
+        if pc > 0 and (target := program[pc - 1]).__class__ is int:
+            leaders.add(target)
+    return frozenset(leader for leader in leaders if leader < len(program))
+
+
+class BlockCompiler:
+    """
+    Compile basic blocks of a ROM to Python functions, so that instructions are not dispatched one by one.
+
+    A basic block ends at a jump, before the next leader, before the halt loop or at the end of ROM.
+    The function of a block goes on with the blocks which surely follow it: the fall through of
+    a conditional jump, an unconditional jump to a loaded constant and a leader right after it.
+    When they lead back to the first block, the function loops while the budget of cycles allows
+    another pass through all of its blocks, so a hot loop runs in a single call.
+    Registers are local variables of the function, and while A holds a value loaded in the function,
+    memory is accessed at that constant address and A is stored only when it is read or returned.
+    Blocks are compiled when they are first run and kept in blocks by their start address.
+    Jumping into the middle of a block only compiles another block starting there.
+    """
+    def __init__(self, words: array, leaders: frozenset[int]):
+        self._words = words
+        self._program = decode(words)
+        self._leaders = leaders
+        self.blocks: list[Optional[Block]] = [None] * len(words)
+        self._lines: list[str] = []
+        self._namespace: dict[str, object] = {}
+        # value of A while it is a constant loaded in the function
+        self._known: Optional[int] = None
+        self._a_stored = True
+        # instructions on the path from the start of the function
+        self._length = 0
+        # pages written at constant addresses, which are flagged once when the function is called
+        self._pages: set[int] = set()
+
+    def block(self, start: int) -> Block:
+        if (block := self.blocks[start]) is None:
+            block = self.blocks[start] = self._compile(start)
+        return block
+
+    def source(self, start: int) -> str:
+        """
+        :return: Python source of the block starting at start
+        """
+        self._compile(start)
+        return '\n'.join(self._lines) + '\n'
+
+    def _compile(self, start: int) -> Block:
+        program = self._program
+        if program[start] is HALT:
+            return HALT_BLOCK
+
+        self._lines = []
+        self._namespace = {}
+        self._known = None
+        self._a_stored = True
+        self._length = 0
+        self._pages = set()
+        traced = {start}
+        loops = False
+        pc = start
+        while True:
+            # pc after the basic block when it goes on without jumping to a register value
+            pc = self._basic_block(pc)
+            if pc == start:
+                self._store_a()
+                self._line(f'cycles += {self._length}')
+                self._line('if cycles > limit:')
+                self._line(f'    return a, d, {start}, cycles')
+                loops = True
+                break
+            if pc is None or pc >= len(program) or program[pc] is HALT or pc in traced \
+                    or len(traced) == MAX_TRACE_BLOCKS:
+                if pc is not None:
+                    self._return(pc)
+                break
+            traced.add(pc)
+
+        # a pass through the function runs each instruction at most once
+        max_length = self._length
+        body = [f'    {line}' for line in self._lines] if loops else self._lines
+        self._lines = [
+            f'def block_{start}(ram, a, d, budget, screen_write, dirty):',
+            f'    limit = budget - {max_length}',
+            '    cycles = 0',
+            *(f'    dirty[{page}] = 1' for page in sorted(self._pages)),
+            *(['    while True:'] if loops else []),
+            *body,
+        ]
+        exec(compile('\n'.join(self._lines) + '\n', f'<hack block {start}>', 'exec'), self._namespace)
+        return self._namespace[f'block_{start}'], max_length
+
+    def _basic_block(self, pc: int) -> Optional[int]:
+        """
+        :return: the next pc when it is a constant, or None after returning a jump to a register value
+        """
+        program = self._program
+        while True:
+            instruction = program[pc]
+            pc += 1
+            self._length += 1
+            if instruction.__class__ is int:
+                self._known = instruction
+                self._a_stored = False
+            else:
+                _, dest, jump = instruction
+                if jump:
+                    return self._c_instruction(pc - 1, dest, jump)
+                self._c_instruction(pc - 1, dest, jump)
+            if pc == len(program) or pc in self._leaders or program[pc] is HALT:
+                return pc
+
+    def _c_instruction(self, pc: int, dest: int, jump: int) -> Optional[int]:
+        """
+        :return: the next pc when it is a constant, or None after returning a jump to a register value
+        """
+        code = self._words[pc] >> 6 & 0b1111111
+        reads_m = code >> 6
+        # y input of ALU is A unless it is M or zero
+        if not reads_m and not code >> 3 & 1:
+            self._store_a()
+        if (target := self._known) is not None:
+            address = str(target)
+        else:
+            address = 'address'
+            if dest & M_BIT or reads_m or jump:
+                self._line(f'address = a & {ADDRESS_MASK}')
+
+        if (source := COMP_SOURCES.get(code)) is None:
+            # comp codes without mnemonics go through ALU bits
+            self._namespace[f'alu_{pc}'] = alu(code)
+            source = f'alu_{pc}(a, d, {"m" if reads_m else 0})'
+        if source == 'm':
+            source = f'ram[{address}]'
+        elif reads_m:
+            self._line(f'm = ram[{address}]')
+
+        targets = []
+        # M is written at the address before A is updated
+        if dest & M_BIT:
+            targets.append(f'ram[{address}]')
+        if dest & D_BIT:
+            targets.append('d')
+        if dest & A_BIT:
+            targets.append('a')
+            self._known = None
+            self._a_stored = True
+        # a register holding the output is tested by the jump
+        out = 'd' if dest & D_BIT else 'a' if dest & A_BIT else source if source in ('a', 'd') else 'out'
+        if out == 'out' and jump not in (0, 0b111):
+            targets.append('out')
+        if targets:
+            self._line(f'{" = ".join(targets)} = {source}')
+        if dest & M_BIT:
+            if target is None:
+                self._line(f'dirty[address >> {PAGE_SHIFT}] = 1')
+                self._line(f'if {SCREEN} <= address < {KBD}:')
+                self._line('    screen_write(address, ram[address])')
+            else:
+                self._pages.add(target >> PAGE_SHIFT)
+                if SCREEN <= target < KBD:
+                    self._line(f'screen_write({target}, ram[{target}])')
+
+        if jump == 0b111:
+            if target is not None:
+                return target
+            self._return(address)
+            return None
+        elif jump:
+            self._line(f'if {_CONDITIONS[jump].format(out)}:')
+            self._line(f'    return {self._a()}, d, {address}, cycles + {self._length}')
+        return pc + 1
+
+    def _store_a(self):
+        if not self._a_stored:
+            self._line(f'a = {self._known}')
+            self._a_stored = True
+
+    def _a(self) -> str:
+        """
+        :return: source of A register, which is not stored to the local variable while it is a loaded constant
+        """
+        return 'a' if self._a_stored else str(self._known)
+
+    def _return(self, pc):
+        self._line(f'return {self._a()}, d, {pc}, cycles + {self._length}')
+
+    def _line(self, text: str):
+        self._lines.append(f'    {text}')
+
+
+@lru_cache(maxsize=64)
+def _block_compiler(rom: bytes, leaders: frozenset[int]) -> BlockCompiler:
+    return BlockCompiler(array('h', rom), leaders)
+
+
+class CompiledEmulator(Emulator):
+    """
+    Emulator running basic blocks compiled to Python functions.
+    Compiled blocks are shared by emulators of the same ROM.
+    When the next block may not fit in max_cycles, its instructions are interpreted up to the limit.
+    """
+    def __init__(self, words: Iterable[int], labels: Iterable[int] = ()):
+        super().__init__(words)
+        self._compiler = _block_compiler(self.rom.tobytes(), find_leaders(self._program, labels))
+
+    @classmethod
+    def from_assembly(cls, source: str) -> 'CompiledEmulator':
+        assembler = Assembler(Parser(RegexLexer(source)))
+        words = assembler.assemble()
+        return cls(words, assembler.labels.values())
+
+    def _run(self, max_cycles: Optional[int]) -> int:
+        compiler = self._compiler
+        blocks = compiler.blocks
+        ram = self._ram
+        screen_write = self.screen.write
+        dirty = self._dirty
+        a, d, pc = self.a, self.d, self.pc
+        size = len(blocks)
+        limit = max_cycles if max_cycles is not None else -1
+        cycles = 0
+        halted = self.halted
+        while pc < size and not halted:
+            function, max_length = blocks[pc] or compiler.block(pc)
+            if function is None:
+                halted = True
+                break
+            budget = limit - cycles if limit >= 0 else UNLIMITED
+            if budget < max_length:
+                break
+            a, d, pc, block_cycles = function(ram, a, d, budget, screen_write, dirty)
+            cycles += block_cycles
+
+        self.a, self.d, self.pc = a, d, pc
+        self.halted = halted
+        self.cycles += cycles
+        if cycles != limit and pc < size and not halted:
+            cycles += super()._run(limit - cycles)
+        return cycles
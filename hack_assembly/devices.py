@@ -0,0 +1,155 @@
+import sys
+from array import array
+from collections import deque
+from typing import Optional, Union
+
+from .assembler import PREDEFINED_SYMBOLS
+
+
+SCREEN = PREDEFINED_SYMBOLS['SCREEN']
+KBD = PREDEFINED_SYMBOLS['KBD']
+
+SCREEN_WIDTH = 512
+SCREEN_HEIGHT = 256
+ROW_WORDS = SCREEN_WIDTH // 16
+ROW_BYTES = ROW_WORDS * 2
+
+# key codes of the Hack keyboard, other keys are their characters
+KEY_CODES = {
+    'newline': 128,
+    'backspace': 129,
+    'left': 130,
+    'up': 131,
+    'right': 132,
+    'down': 133,
+    'home': 134,
+    'end': 135,
+    'page up': 136,
+    'page down': 137,
+    'insert': 138,
+    'delete': 139,
+    'esc': 140,
+    **{f'f{i}': 140 + i for i in range(1, 13)},
+}
+
+
+def key_code(key: Union[int, str]) -> int:
+    if isinstance(key, int):
+        return key
+    if (code := KEY_CODES.get(key.lower())) is not None:
+        return code
+    if key == '\n':
+        return KEY_CODES['newline']
+    if len(key) != 1:
+        raise ValueError(f'unknown key {key!r}')
+    return ord(key)
+
+
+class Screen:
+    """
+    Framebuffer of the screen memory map from SCREEN, 256 rows of 32 words.
+
+    Words are kept as little endian bytes, so bit i of a byte is the i-th pixel from its left as in Hack.
+    Emulators write through to the framebuffer when programs write screen memory, and the rows written
+    since the last dirty_rows() call are flagged, so rendering a frame only reads the rows which changed.
+    """
+    def __init__(self):
+        self.framebuffer = bytearray(SCREEN_HEIGHT * ROW_BYTES)
+        self._dirty = bytearray(SCREEN_HEIGHT)
+
+    def write(self, address: int, value: int):
+        offset = address - SCREEN
+        self.framebuffer[offset << 1] = value & 0xFF
+        self.framebuffer[(offset << 1) + 1] = value >> 8 & 0xFF
+        self._dirty[offset >> 5] = 1
+
+    def load(self, address: int, data: bytes):
+        """
+        Copy screen memory from address, given as words in native byte order, and flag rows which change.
+        """
+        if sys.byteorder != 'little':
+            words = array('h', data)
+            words.byteswap()
+            data = words.tobytes()
+        start = (address - SCREEN) << 1
+        for offset in range(0, len(data), ROW_BYTES):
+            row = data[offset:offset + ROW_BYTES]
+            if self.framebuffer[start + offset:start + offset + ROW_BYTES] != row:
+                self.framebuffer[start + offset:start + offset + ROW_BYTES] = row
+                self._dirty[(start + offset) // ROW_BYTES] = 1
+
+    def dirty_rows(self) -> list[int]:
+        """
+        :return: rows written since the last call, which are clean after the call
+        """
+        rows = []
+        y = self._dirty.find(1)
+        while y >= 0:
+            rows.append(y)
+            y = self._dirty.find(1, y + 1)
+        self._dirty[:] = bytes(SCREEN_HEIGHT)
+        return rows
+
+    def row(self, y: int) -> memoryview:
+        """
+        :return: bytes of row y without copying
+        """
+        return memoryview(self.framebuffer)[y * ROW_BYTES:(y + 1) * ROW_BYTES]
+
+    def pixel(self, x: int, y: int) -> bool:
+        return bool(self.framebuffer[y * ROW_BYTES + (x >> 3)] >> (x & 7) & 1)
+
+
+# (key, cycle where the key is released, queued keys)
+KeyboardState = tuple[int, Optional[int], tuple[tuple[int, int], ...]]
+
+
+class Keyboard:
+    """
+    Scripted keyboard: queued keys are held one after another for their number of cycles.
+    Key 0 is no key pressed, and no key is pressed when the queue runs out.
+    Cycles are counted by the emulator, and a key queued while nothing is pressed starts at the next run.
+    """
+    def __init__(self):
+        self.key = 0
+        self._queue: deque[tuple[int, int]] = deque()
+        # cycle where the current key is released, None while the script is not running
+        self._until: Optional[int] = None
+
+    def press(self, key: Union[int, str], cycles: int):
+        if cycles <= 0:
+            raise ValueError('keys are held for at least 1 cycle')
+        self._queue.append((key_code(key), cycles))
+
+    def release(self, cycles: int):
+        self.press(0, cycles)
+
+    def type(self, text: str, cycles: int, release_cycles: int = 0):
+        """
+        Press each character of text for cycles, with no key pressed for release_cycles after each of them.
+        """
+        for char in text:
+            self.press(char, cycles)
+            if release_cycles:
+                self.release(release_cycles)
+
+    def snapshot(self) -> KeyboardState:
+        return self.key, self._until, tuple(self._queue)
+
+    def restore(self, state: KeyboardState):
+        self.key, self._until, queue = state
+        self._queue = deque(queue)
+
+    def update(self, cycle: int) -> Optional[int]:
+        """
+        Move the script to cycle.
+        :return: cycle of the next change of key, None when the queue is empty
+        """
+        while self._until is None or cycle >= self._until:
+            if not self._queue:
+                self.key = 0
+                self._until = None
+                return None
+            self.key, cycles = self._queue.popleft()
+            self._until = (cycle if self._until is None else self._until) + cycles
+        return self._until
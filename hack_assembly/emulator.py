@@ -0,0 +1,294 @@
+from array import array
+from dataclasses import dataclass
+from itertools import compress
+from operator import is_not
+from typing import Callable, Iterable, Optional, Union
+
+from .assembler import Assembler
+from .devices import KBD, SCREEN, Keyboard, KeyboardState, Screen
+from .lexer import RegexLexer
+from .parser import Parser
+
+
+RAM_SIZE = 1 << 15
+ADDRESS_MASK = RAM_SIZE - 1
+# RAM is copied to snapshots by pages of 256 words
+PAGE_SHIFT = 8
+PAGE_WORDS = 1 << PAGE_SHIFT
+PAGE_COUNT = RAM_SIZE >> PAGE_SHIFT
+_ZERO_PAGE = bytes(2 * PAGE_WORDS)
+
+# jump bits: out > 0, out == 0 and out < 0
+JGT_BIT = 0b001
+JEQ_BIT = 0b010
+JLT_BIT = 0b100
+# dest bits
+M_BIT = 0b001
+D_BIT = 0b010
+A_BIT = 0b100
+
+Compute = Callable[[int, int, int], int]
+
+
+def to_signed(value: int) -> int:
+    """
+    :return: value wrapped to a signed 16 bit integer
+    """
+    return ((value + 0x8000) & 0xFFFF) - 0x8000
+
+
+def alu(code: int) -> Compute:
+    """
+    Hack ALU for any 7 bit comp code (a, zx, nx, zy, ny, f, no), including codes without assembly mnemonics.
+    :return: function of A, D and M registers
+    """
+    reads_m, zx, nx, zy, ny, f, no = ((code >> shift) & 1 for shift in range(6, -1, -1))
+
+    def compute(a: int, d: int, m: int) -> int:
+        x = 0 if zx else d
+        y = 0 if zy else (m if reads_m else a)
+        if nx:
+            x = ~x
+        if ny:
+            y = ~y
+        out = to_signed(x + y) if f else x & y
+        return ~out if no else out
+    return compute
+
+
+# Python expressions of A, D and M registers for comp codes of assembly mnemonics,
+# which are computed without going through ALU bits
+COMP_SOURCES: dict[int, str] = {
+    0b0101010: '0',
+    0b0111111: '1',
+    0b0111010: '-1',
+    0b0001100: 'd',
+    0b0110000: 'a',
+    0b1110000: 'm',
+    0b0001101: '~d',
+    0b0110001: '~a',
+    0b1110001: '~m',
+    0b0001111: '((0x8000 - d) & 0xFFFF) - 0x8000',
+    0b0110011: '((0x8000 - a) & 0xFFFF) - 0x8000',
+    0b1110011: '((0x8000 - m) & 0xFFFF) - 0x8000',
+    0b0011111: '((d + 0x8001) & 0xFFFF) - 0x8000',
+    0b0110111: '((a + 0x8001) & 0xFFFF) - 0x8000',
+    0b1110111: '((m + 0x8001) & 0xFFFF) - 0x8000',
+    0b0001110: '((d + 0x7FFF) & 0xFFFF) - 0x8000',
+    0b0110010: '((a + 0x7FFF) & 0xFFFF) - 0x8000',
+    0b1110010: '((m + 0x7FFF) & 0xFFFF) - 0x8000',
+    0b0000010: '((d + a + 0x8000) & 0xFFFF) - 0x8000',
+    0b1000010: '((d + m + 0x8000) & 0xFFFF) - 0x8000',
+    0b0010011: '((d - a + 0x8000) & 0xFFFF) - 0x8000',
+    0b1010011: '((d - m + 0x8000) & 0xFFFF) - 0x8000',
+    0b0000111: '((a - d + 0x8000) & 0xFFFF) - 0x8000',
+    0b1000111: '((m - d + 0x8000) & 0xFFFF) - 0x8000',
+    0b0000000: 'd & a',
+    0b1000000: 'd & m',
+    0b0010101: 'd | a',
+    0b1010101: 'd | m',
+}
+_COMPUTES: dict[int, Compute] = {
+    code: eval(f'lambda a, d, m: {source}') for code, source in COMP_SOURCES.items()
+}
+
+# a decoded C instruction: (compute, dest bits, jump bits)
+DecodedC = tuple[Compute, int, int]
+# A instructions are decoded to their values, and the usual halt loop '@X (X) 0;JMP' to HALT
+Decoded = Union[int, DecodedC, None]
+HALT = None
+
+
+def decode(words: array) -> list[Decoded]:
+    """
+    Decode every word once, so that running an instruction is a list index and a type test.
+    A C instruction without dest jumping unconditionally to itself right after an A instruction loading
+    its own address never changes the machine state, and is decoded to HALT.
+    """
+    decoded: list[Decoded] = []
+    for pc, word in enumerate(words):
+        word &= 0xFFFF
+        if not word & 0x8000:
+            decoded.append(word)
+            continue
+
+        code = word >> 6 & 0b1111111
+        dest = word >> 3 & 0b111
+        jump = word & 0b111
+        if dest == 0 and jump == 0b111 and pc > 0 and decoded[pc - 1] == pc - 1:
+            decoded.append(HALT)
+            continue
+        compute = _COMPUTES.get(code) or alu(code)
+        decoded.append((compute, dest, jump))
+    return decoded
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    # RAM by pages, which are shared with other snapshots while they are not written
+    pages: tuple[bytes, ...]
+    a: int
+    d: int
+    pc: int
+    cycles: int
+    halted: bool
+    keyboard: KeyboardState
+
+
+class Emulator:
+    """
+    Hack CPU running predecoded instructions of a ROM against a 32K word RAM.
+    Registers and memory are signed 16 bit words, and addresses are the lower 15 bits of A.
+    Writes to screen memory are also written to screen, and the key of the keyboard script is put at KBD
+    when it changes.
+
+    Programs flag the pages of RAM they write, so that snapshot() copies only pages written since
+    the last snapshot or restore, and shares the others with the snapshot RAM was synced with.
+    ram is a read-only view, and RAM is written outside programs by write(), which flags pages as well.
+    """
+    def __init__(self, words: Iterable[int]):
+        self.rom = array('h', array('H', (word & 0xFFFF for word in words)).tobytes())
+        self._ram = array('h', bytes(2 * RAM_SIZE))
+        self._ram_view = memoryview(self._ram).toreadonly()
+        self.a = 0
+        self.d = 0
+        self.pc = 0
+        self.cycles = 0
+        self.halted = False
+        self.screen = Screen()
+        self.keyboard = Keyboard()
+        self._program = decode(self.rom)
+        # pages of the snapshot RAM was synced with, and pages written since then,
+        # which are all pages until the first snapshot
+        self._pages = [_ZERO_PAGE] * PAGE_COUNT
+        self._dirty = bytearray(b'\x01' * PAGE_COUNT)
+
+    @classmethod
+    def from_assembly(cls, source: str) -> 'Emulator':
+        return cls(Assembler(Parser(RegexLexer(source))).assemble())
+
+    @property
+    def ram(self) -> memoryview:
+        return self._ram_view
+
+    def reset(self):
+        """
+        Restart from the first instruction, keeping registers and memory as the Hack reset does.
+        """
+        self.pc = 0
+        self.halted = False
+
+    def write(self, address: int, value: int):
+        """
+        Write a word of RAM as a program does.
+        """
+        self._ram[address] = value
+        self._dirty[address >> PAGE_SHIFT] = 1
+        if SCREEN <= address < KBD:
+            self.screen.write(address, value)
+
+    def snapshot(self) -> Snapshot:
+        """
+        :return: state of registers, RAM and keyboard script, which copies only pages written since the last
+                 snapshot or restore
+        """
+        pages = self._pages
+        words = memoryview(self._ram)
+        dirty = self._dirty
+        page = dirty.find(1)
+        while page >= 0:
+            pages[page] = words[page << PAGE_SHIFT:(page + 1) << PAGE_SHIFT].tobytes()
+            page = dirty.find(1, page + 1)
+        dirty[:] = bytes(PAGE_COUNT)
+        return Snapshot(tuple(pages), self.a, self.d, self.pc, self.cycles, self.halted, self.keyboard.snapshot())
+
+    def restore(self, snapshot: Snapshot):
+        """
+        Restore state of snapshot, copying only pages of RAM which may differ from it.
+        """
+        words = memoryview(self._ram).cast('B')
+        dirty = self._dirty
+        # pages not shared with snapshot, and written pages
+        changed = set(compress(range(PAGE_COUNT), map(is_not, self._pages, snapshot.pages)))
+        page = dirty.find(1)
+        while page >= 0:
+            changed.add(page)
+            page = dirty.find(1, page + 1)
+        for page in changed:
+            address = page << PAGE_SHIFT
+            data = snapshot.pages[page]
+            words[address << 1:(address + PAGE_WORDS) << 1] = data
+            if SCREEN <= address < KBD:
+                self.screen.load(address, data)
+        self._pages = list(snapshot.pages)
+        dirty[:] = bytes(PAGE_COUNT)
+        self.a, self.d, self.pc = snapshot.a, snapshot.d, snapshot.pc
+        self.cycles = snapshot.cycles
+        self.halted = snapshot.halted
+        self.keyboard.restore(snapshot.keyboard)
+
+    def run(self, max_cycles: Optional[int] = None) -> int:
+        """
+        Run until the halt loop, the end of ROM, or max_cycles instructions.
+        A run is split where the keyboard script changes the key, so that reads of KBD are not checked.
+        :return: number of instructions run
+        """
+        keyboard = self.keyboard
+        cycles = 0
+        while True:
+            key = keyboard.key
+            change = keyboard.update(self.cycles)
+            if keyboard.key != key:
+                self.write(KBD, keyboard.key)
+            budget = None if max_cycles is None else max_cycles - cycles
+            if change is not None and (budget is None or change - self.cycles < budget):
+                budget = change - self.cycles
+            ran = self._run(budget)
+            cycles += ran
+            if ran != budget or cycles == max_cycles:
+                return cycles
+
+    def _run(self, max_cycles: Optional[int]) -> int:
+        program = self._program
+        ram = self._ram
+        screen_write = self.screen.write
+        dirty = self._dirty
+        a, d, pc = self.a, self.d, self.pc
+        size = len(program)
+        limit = max_cycles if max_cycles is not None else -1
+        cycles = 0
+        halted = self.halted
+        while cycles != limit and pc < size and not halted:
+            instruction = program[pc]
+            if instruction.__class__ is int:
+                a = instruction
+                pc += 1
+                cycles += 1
+                continue
+            if instruction is HALT:
+                halted = True
+                break
+
+            compute, dest, jump = instruction
+            address = a & ADDRESS_MASK
+            out = compute(a, d, ram[address])
+            if dest:
+                if dest & M_BIT:
+                    ram[address] = out
+                    dirty[address >> PAGE_SHIFT] = 1
+                    if SCREEN <= address < KBD:
+                        screen_write(address, out)
+                if dest & D_BIT:
+                    d = out
+                if dest & A_BIT:
+                    a = out
+            if jump and jump & (JGT_BIT if out > 0 else JEQ_BIT if out == 0 else JLT_BIT):
+                pc = address
+            else:
+                pc += 1
+            cycles += 1
+
+        self.a, self.d, self.pc = a, d, pc
+        self.halted = halted
+        self.cycles += cycles
+        return cycles
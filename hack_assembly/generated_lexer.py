@@ -0,0 +1,206 @@
+# Generated by lexer_generator from hack.lexer. Do not edit.
+from bisect import bisect_right
+
+from .lexer import LexerNextTokenException, TokenType, _token
+
+
+_CLASS_COUNT = 36
+# character classes of code points from each boundary to the next one
+_BOUNDARIES = (
+    0, 9, 10, 11, 13, 14, 28, 33, 34, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 50, 54, 58, 59, 60, 61, 62, 64, 65,
+    66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 85, 91, 97, 123, 124, 125, 133, 134,
+    160, 161, 1632, 1642, 1776, 1786, 1984, 1994, 2406, 2416, 2534, 2544, 2662, 2672, 2790, 2800, 2918, 2928, 3046,
+    3056, 3174, 3184, 3302, 3312, 3430, 3440, 3558, 3568, 3664, 3674, 3792, 3802, 3872, 3882, 4160, 4170, 4240, 4250,
+    5760, 5761, 6112, 6122, 6160, 6170, 6470, 6480, 6608, 6618, 6784, 6794, 6800, 6810, 6992, 7002, 7088, 7098, 7232,
+    7242, 7248, 7258, 8192, 8203, 8232, 8234, 8239, 8240, 8287, 8288, 12288, 12289, 42528, 42538, 43216, 43226, 43264,
+    43274, 43472, 43482, 43504, 43514, 43600, 43610, 44016, 44026, 65296, 65306, 66720, 66730, 68912, 68922, 69734,
+    69744, 69872, 69882, 69942, 69952, 70096, 70106, 70384, 70394, 70736, 70746, 70864, 70874, 71248, 71258, 71360,
+    71370, 71472, 71482, 71904, 71914, 72016, 72026, 72784, 72794, 73040, 73050, 73120, 73130, 92768, 92778, 92864,
+    92874, 93008, 93018, 120782, 120832, 123200, 123210, 123632, 123642, 125264, 125274, 130032, 130042,
+)
+_BOUNDARY_CLASSES = (
+    0, 1, 2, 1, 2, 0, 1, 3, 0, 4, 0, 5, 6, 0, 7, 0, 8, 0, 9, 10, 11, 12, 0, 13, 0, 14, 0, 15, 16, 17, 18, 19, 20, 21,
+    22, 23, 24, 25, 26, 27, 28, 29, 21, 30, 31, 32, 33, 34, 21, 0, 21, 0, 35, 0, 1, 0, 1, 0, 12, 0, 12, 0, 12, 0, 12,
+    0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 1, 0, 12, 0,
+    12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 12, 0, 12, 0, 12, 0,
+    12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12,
+    0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0,
+)
+# next states of state and class at state + class, where states are multiplied by _CLASS_COUNT
+# and the dead state is 0
+_TRANSITIONS = (
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 108,
+    144, 504, 540, 684, 756, 468, 432, 180, 900, 900, 900, 648, 396, 360, 288, 864, 864, 828, 864, 864, 864, 864, 864,
+    72, 576, 252, 792, 864, 864, 864, 720, 216, 324, 612, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1044, 1044, 1044, 0, 0, 0,
+    1044, 1044, 1044, 1044, 1080, 1044, 936, 1044, 1044, 1044, 1044, 936, 1008, 972, 1044, 1044, 1044, 1044, 1044, 0,
+    0, 108, 144, 0, 0, 0, 0, 0, 0, 180, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 144, 144, 0, 0, 0, 0, 0, 0, 1116, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 1152, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 1044, 1044, 1044, 0, 0, 0, 1044, 1044, 1224, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1188, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1044, 1044, 1044, 0, 0, 0,
+    1044, 1044, 1260, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1044, 1044, 1044, 0, 0, 0, 1044, 1044, 1044, 1296, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1332, 1044, 1044, 1044, 1368, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1044, 1044, 1044, 0,
+    0, 0, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1404, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 1044, 1044, 1044, 0, 0, 0, 1044, 1440, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1476, 1188, 1188, 0, 0, 0, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1044, 1044,
+    1044, 0, 0, 0, 1044, 1044, 1044, 1296, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1044, 1044, 1044, 0, 0, 0, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    1044, 1044, 1044, 0, 0, 0, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 900, 900, 900, 0, 0, 0, 1512, 1512, 1512, 1512,
+    1512, 1512, 1512, 1512, 1512, 1512, 1512, 1512, 1512, 1512, 1512, 1512, 1512, 1512, 1512, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1044, 1548, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 1548, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1044,
+    1044, 1044, 1044, 1548, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1548, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044,
+    0, 0, 1584, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1548, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1620,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1152, 1152, 144, 1152, 1152, 1152,
+    1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152,
+    1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 1152, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044,
+    1044, 0, 0, 1584, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1656, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1188, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1296, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0,
+    1584, 1044, 1044, 1044, 1044, 1044, 1044, 1188, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1692, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1728, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044,
+    1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1188, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1188, 1188, 1044, 0, 0, 1584, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1620, 1620, 144, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620,
+    1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620, 1620,
+    1620, 1620, 1620, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1044, 1764,
+    1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1188, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1188, 1044, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0, 1584, 1044, 1044, 1044, 1044, 1800, 1044, 1044, 1044, 1044, 1044,
+    1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1584, 1044, 1044, 1044, 0, 0,
+    1584, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1044, 1188, 1044, 1044, 1044, 1044,
+    1044, 0,
+)
+_START = 36
+# accepted rules of states, -1 for no rule
+_STATE_ACCEPTS = (
+    -1, -1, 17, 1, 0, 2, 17, 17, 13, 17, 3, 4, 5, 6, 7, 8, 17, 9, 10, 11, 17, 12, 13, 13, 17, 19, 17, 17, 17, 17, 17,
+    2, 1, 16, 17, 17, 14, 14, 17, 17, 17, 16, 20, 15, 18, 0, 17, 17, 17, 17, 17,
+)
+_ACCEPTS = tuple(rule for rule in _STATE_ACCEPTS for _ in range(_CLASS_COUNT))
+# token types of rules, None for dropped rules
+_RULE_TYPES = (
+    TokenType.NEWLINE, None, None, TokenType.AT, TokenType.EQUAL, TokenType.MINUS, TokenType.PLUS, TokenType.NOT,
+    TokenType.AND, TokenType.OR, TokenType.SEMICOLON, TokenType.LPAREN, TokenType.RPAREN, TokenType.REG_ONE,
+    TokenType.REG_MULTI, TokenType.JUMP, TokenType.PREDEFINED, TokenType.VAR, None, TokenType.INT, None,
+)
+_ERROR_NAMES = {2: 'COMMENT_ERROR', 18: 'LETTERS_ERROR', 20: 'INT_ERROR'}
+_SEPARATOR_RULES = frozenset({0})
+
+
+def _class_of(code_point: int) -> int:
+    return _BOUNDARY_CLASSES[bisect_right(_BOUNDARIES, code_point) - 1]
+
+
+# classes of ASCII characters of str inputs
+_STR_CLASSES = {chr(code_point): _class_of(code_point) for code_point in range(128)}
+# tables of bytes, where states are multiplied by 256
+# bytes from 0x80 are not latin-1 characters: like bytes regexes, only negated sets e.g. [^\n] match them,
+# so they are in the class of the last code point, which is dead for rules without negated sets
+_BYTE_TRANSITIONS = tuple(
+    _TRANSITIONS[state + _class_of(byte if byte < 0x80 else 0x10FFFF)] // _CLASS_COUNT << 8
+    for state in range(0, len(_TRANSITIONS), _CLASS_COUNT) for byte in range(256)
+)
+_BYTE_ACCEPTS = tuple(rule for rule in _STATE_ACCEPTS for _ in range(256))
+_BYTE_START = _START // _CLASS_COUNT << 8
+
+
+class GeneratedLexer:
+    def __init__(self, input_text):
+        if isinstance(input_text, str):
+            self._input_text = input_text
+            classes = _STR_CLASSES
+            if not input_text.isascii():
+                classes = dict(classes)
+                classes.update((char, _class_of(ord(char))) for char in set(input_text).difference(classes))
+            self._tables = _TRANSITIONS, _ACCEPTS, _START, classes
+        else:
+            if not isinstance(input_text, (bytes, bytearray)):
+                input_text = memoryview(input_text).cast('B')
+            self._input_text = None
+            self._tables = _BYTE_TRANSITIONS, _BYTE_ACCEPTS, _BYTE_START, None
+        self._data = input_text
+        self._p = 0
+
+    def _text(self, start: int, end: int) -> str:
+        if self._input_text is None:
+            return str(self._data[start:end], 'latin-1')
+        return self._input_text[start:end]
+
+    def next_token(self):
+        transitions, accepts, start_state, classes = self._tables
+        input_text = self._input_text
+        data = self._data
+        n = len(data)
+        start = self._p
+        while start < n:
+            state = start_state
+            rule = -1
+            end = i = start
+            if classes is None:
+                while i < n:
+                    state = transitions[state + data[i]]
+                    if not state:
+                        break
+                    i += 1
+                    if (accepted := accepts[state]) >= 0:
+                        rule = accepted
+                        end = i
+            else:
+                while i < n:
+                    state = transitions[state + classes[data[i]]]
+                    if not state:
+                        break
+                    i += 1
+                    if (accepted := accepts[state]) >= 0:
+                        rule = accepted
+                        end = i
+            if rule < 0:
+                raise LexerNextTokenException(f'invalid character at {start}: {self._text(start, start + 1)}')
+
+            token_type = _RULE_TYPES[rule]
+            if token_type is None:
+                if rule in _ERROR_NAMES:
+                    raise LexerNextTokenException(f'{_ERROR_NAMES[rule]} at {start}: {self._text(start, end)!r}')
+                start = end
+                continue
+            # separators are only between tokens
+            if rule in _SEPARATOR_RULES and (self._p == 0 or end == n):
+                start = end
+                continue
+            self._p = end
+            if input_text is None:
+                return _token(token_type, str(data[start:end], 'latin-1'))
+            return _token(token_type, input_text[start:end])
+        self._p = start
+        return _token(TokenType.EOF, '')
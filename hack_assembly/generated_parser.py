@@ -0,0 +1,267 @@
+# Generated by parser_generator from hack.grammar. Do not edit.
+from typing import Iterator
+
+from .lexer import TokenType
+from .parser import AInstruction, CInstruction, Instruction, LInstruction, MismatchException
+
+
+_AND = TokenType.AND
+_AT = TokenType.AT
+_EOF = TokenType.EOF
+_EQUAL = TokenType.EQUAL
+_INT = TokenType.INT
+_JUMP = TokenType.JUMP
+_LPAREN = TokenType.LPAREN
+_MINUS = TokenType.MINUS
+_NEWLINE = TokenType.NEWLINE
+_NOT = TokenType.NOT
+_OR = TokenType.OR
+_PLUS = TokenType.PLUS
+_PREDEFINED = TokenType.PREDEFINED
+_REG_MULTI = TokenType.REG_MULTI
+_REG_ONE = TokenType.REG_ONE
+_RPAREN = TokenType.RPAREN
+_SEMICOLON = TokenType.SEMICOLON
+_VAR = TokenType.VAR
+
+
+class GeneratedParser:
+    def __init__(self, lexer):
+        self._lexer = lexer
+        self._next_token = lexer.next_token
+        self._t0 = self._next_token()
+        self._t1 = self._next_token()
+
+    def parse(self) -> list[Instruction]:
+        return list(self.instructions())
+
+    def instructions(self) -> Iterator[Instruction]:
+        """
+        Parse instructions lazily, one per line.
+        """
+        return self._instructions()
+
+    def _mismatch(self, expected: str):
+        raise MismatchException(f'expected: {expected} but {self._t0.type}')
+
+    def _instructions(self):
+        """
+        instructions: ((instruction=a_instruction | instruction=l_instruction | instruction=c_instruction) (NEWLINE | EOF))* EOF
+        :return:
+        """
+        while True:
+            _type0 = self._t0.type
+            if _type0 is _EOF:
+                break
+            _type0 = self._t0.type
+            if _type0 is _AT:
+                instruction = self._a_instruction()
+            elif _type0 is _LPAREN:
+                instruction = self._l_instruction()
+            else:
+                instruction = self._c_instruction()
+            yield instruction
+            _type0 = self._t0.type
+            if _type0 is _NEWLINE:
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+            else:
+                if self._t0.type is not _EOF:
+                    self._mismatch('TokenType.EOF')
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+                return
+        if self._t0.type is not _EOF:
+            self._mismatch('TokenType.EOF')
+        self._t0 = self._t1
+        self._t1 = self._next_token()
+
+    def _a_instruction(self):
+        """
+        a_instruction: AT (value=VAR | value=PREDEFINED | value=INT)
+        :return:
+        """
+        if self._t0.type is not _AT:
+            self._mismatch('TokenType.AT')
+        self._t0 = self._t1
+        self._t1 = self._next_token()
+        _type0 = self._t0.type
+        if _type0 is _VAR:
+            value = self._t0
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+        elif _type0 is _PREDEFINED:
+            value = self._t0
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+        else:
+            if self._t0.type is not _INT:
+                self._mismatch('TokenType.INT')
+            value = self._t0
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+        return AInstruction(value)
+
+    def _c_instruction(self):
+        """
+        c_instruction: dest=dest EQUAL comp=comp | comp=comp SEMICOLON jump=JUMP
+        :return:
+        """
+        if self._t1.type is TokenType.EQUAL:
+            dest = self._dest()
+            if self._t0.type is not _EQUAL:
+                self._mismatch('TokenType.EQUAL')
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+            comp = self._comp()
+            return CInstruction(dest, comp, '')
+        else:
+            comp = self._comp()
+            if self._t0.type is not _SEMICOLON:
+                self._mismatch('TokenType.SEMICOLON')
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+            if self._t0.type is not _JUMP:
+                self._mismatch('TokenType.JUMP')
+            jump = self._t0
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+            return CInstruction('', comp, jump.text)
+
+    def _l_instruction(self):
+        """
+        l_instruction: LPAREN symbol=VAR RPAREN
+        :return:
+        """
+        if self._t0.type is not _LPAREN:
+            self._mismatch('TokenType.LPAREN')
+        self._t0 = self._t1
+        self._t1 = self._next_token()
+        if self._t0.type is not _VAR:
+            self._mismatch('TokenType.VAR')
+        symbol = self._t0
+        self._t0 = self._t1
+        self._t1 = self._next_token()
+        if self._t0.type is not _RPAREN:
+            self._mismatch('TokenType.RPAREN')
+        self._t0 = self._t1
+        self._t1 = self._next_token()
+        return LInstruction(symbol.text)
+
+    def _dest(self):
+        """
+        dest: (register=REG_ONE | register=REG_MULTI)
+        :return:
+        """
+        _type0 = self._t0.type
+        if _type0 is _REG_ONE:
+            register = self._t0
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+        else:
+            if self._t0.type is not _REG_MULTI:
+                self._mismatch('TokenType.REG_MULTI')
+            register = self._t0
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+        return register.text
+
+    def _comp(self):
+        """
+        comp: ((INT='0' | INT='1') | MINUS (INT='1' | REG_ONE) | NOT REG_ONE | REG_ONE (PLUS (INT='1' | REG_ONE) | MINUS (INT='1' | REG_ONE) | AND REG_ONE | OR REG_ONE)? | )
+        :return:
+        """
+        _texts = []
+        _type0 = self._t0.type
+        if (_type0 is _INT and self._t0.text == '0') or (_type0 is _INT and self._t0.text == '1'):
+            _type0 = self._t0.type
+            if _type0 is _INT and self._t0.text == '0':
+                _texts.append(self._t0.text)
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+            else:
+                if self._t0.type is not _INT or self._t0.text != '1':
+                    self._mismatch("TokenType.INT='1'")
+                _texts.append(self._t0.text)
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+        elif _type0 is _MINUS:
+            _texts.append(self._t0.text)
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+            _type0 = self._t0.type
+            if _type0 is _INT and self._t0.text == '1':
+                _texts.append(self._t0.text)
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+            else:
+                if self._t0.type is not _REG_ONE:
+                    self._mismatch('TokenType.REG_ONE')
+                _texts.append(self._t0.text)
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+        elif _type0 is _NOT:
+            _texts.append(self._t0.text)
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+            if self._t0.type is not _REG_ONE:
+                self._mismatch('TokenType.REG_ONE')
+            _texts.append(self._t0.text)
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+        elif _type0 is _REG_ONE:
+            _texts.append(self._t0.text)
+            self._t0 = self._t1
+            self._t1 = self._next_token()
+            _type0 = self._t0.type
+            if _type0 is _PLUS:
+                _texts.append(self._t0.text)
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+                _type0 = self._t0.type
+                if _type0 is _INT and self._t0.text == '1':
+                    _texts.append(self._t0.text)
+                    self._t0 = self._t1
+                    self._t1 = self._next_token()
+                else:
+                    if self._t0.type is not _REG_ONE:
+                        self._mismatch('TokenType.REG_ONE')
+                    _texts.append(self._t0.text)
+                    self._t0 = self._t1
+                    self._t1 = self._next_token()
+            elif _type0 is _MINUS:
+                _texts.append(self._t0.text)
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+                _type0 = self._t0.type
+                if _type0 is _INT and self._t0.text == '1':
+                    _texts.append(self._t0.text)
+                    self._t0 = self._t1
+                    self._t1 = self._next_token()
+                else:
+                    if self._t0.type is not _REG_ONE:
+                        self._mismatch('TokenType.REG_ONE')
+                    _texts.append(self._t0.text)
+                    self._t0 = self._t1
+                    self._t1 = self._next_token()
+            elif _type0 is _AND:
+                _texts.append(self._t0.text)
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+                if self._t0.type is not _REG_ONE:
+                    self._mismatch('TokenType.REG_ONE')
+                _texts.append(self._t0.text)
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+            elif _type0 is _OR:
+                _texts.append(self._t0.text)
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+                if self._t0.type is not _REG_ONE:
+                    self._mismatch('TokenType.REG_ONE')
+                _texts.append(self._t0.text)
+                self._t0 = self._t1
+                self._t1 = self._next_token()
+        else:
+            raise MismatchException(f'comp parsing failed at {self._t0}')
+        return ''.join(_texts)
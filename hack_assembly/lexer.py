@@ -1,7 +1,11 @@
+import codecs
+import os
 import re
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import BinaryIO, Iterator, Optional, Union
+
+from core.token_buffer import TokenBuffer
 
 
 class TokenType(Enum):
@@ -32,8 +36,12 @@ class TokenType(Enum):
     NEWLINE = 33
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Token:
+    """
+    Tokens with fixed text (operators, keywords, NEWLINE and EOF) are shared instances,
+    so tokens are immutable.
+    """
     type: TokenType
     text: str
 
@@ -42,6 +50,61 @@ class LexerNextTokenException(Exception):
     pass
 
 
+_OPERATOR_TOKENS = {
+    text: Token(token_type, text) for text, token_type in [
+        ('@', TokenType.AT),
+        ('=', TokenType.EQUAL),
+        ('-', TokenType.MINUS),
+        ('+', TokenType.PLUS),
+        ('!', TokenType.NOT),
+        ('&', TokenType.AND),
+        ('|', TokenType.OR),
+        (';', TokenType.SEMICOLON),
+        ('(', TokenType.LPAREN),
+        (')', TokenType.RPAREN),
+    ]
+}
+
+_KEYWORD_TOKENS = {
+    **{text: Token(TokenType.REG_ONE, text) for text in ['M', 'D', 'A']},
+    **{text: Token(TokenType.REG_MULTI, text) for text in ['MD', 'AM', 'AD', 'AMD']},
+    **{text: Token(TokenType.JUMP, text) for text in ['JGT', 'JEQ', 'JGE', 'JLT', 'JNE', 'JLE', 'JMP']},
+    **{text: Token(TokenType.PREDEFINED, text) for text in ['SP', 'LCL', 'ARG', 'THIS', 'THAT', 'SCREEN', 'KBD']},
+    **{f'R{i}': Token(TokenType.PREDEFINED, f'R{i}') for i in range(16)},
+}
+
+_NEWLINE_TOKEN = Token(TokenType.NEWLINE, '')
+_EOF_TOKEN = Token(TokenType.EOF, '')
+
+
+def _token(token_type: TokenType, text: str) -> Token:
+    if token_type == TokenType.NEWLINE:
+        return _NEWLINE_TOKEN
+    elif token_type == TokenType.EOF:
+        return _EOF_TOKEN
+    elif token_type == TokenType.INT or token_type == TokenType.VAR:
+        return Token(token_type, text)
+    # shared instances of operators and keywords; token_type is already classified
+    return _OPERATOR_TOKENS.get(text) or _KEYWORD_TOKENS.get(text) or Token(token_type, text)
+
+
+def _letters_token(var_text: str) -> Token:
+    if (token := _KEYWORD_TOKENS.get(var_text)) is not None:
+        return token
+    return Token(TokenType.PREDEFINED if _is_register_symbol(var_text) else TokenType.VAR, var_text)
+
+
+def _letters_token_type(var_text: str) -> TokenType:
+    if (token := _KEYWORD_TOKENS.get(var_text)) is not None:
+        return token.type
+    return TokenType.PREDEFINED if _is_register_symbol(var_text) else TokenType.VAR
+
+
+def _is_register_symbol(var_text: str) -> bool:
+    # R00 ~ R05 and R followed by other unicode digits, which are not in _KEYWORD_TOKENS
+    return var_text[0] == 'R' and re.match(r'^R([01][0-5]|\d)$', var_text) is not None
+
+
 class Lexer:
     EOF = ''
 
@@ -57,36 +120,9 @@ class Lexer:
 
     def next_token(self) -> Token:
         while self._current_char != self.EOF:
-            if self._current_char == '@':
-                self._consume()
-                return Token(TokenType.AT, '@')
-            elif self._current_char == '=':
-                self._consume()
-                return Token(TokenType.EQUAL, '=')
-            elif self._current_char == '-':
-                self._consume()
-                return Token(TokenType.MINUS, '-')
-            elif self._current_char == '+':
+            if (token := _OPERATOR_TOKENS.get(self._current_char)) is not None:
                 self._consume()
-                return Token(TokenType.PLUS, '+')
-            elif self._current_char == '!':
-                self._consume()
-                return Token(TokenType.NOT, '!')
-            elif self._current_char == '&':
-                self._consume()
-                return Token(TokenType.AND, '&')
-            elif self._current_char == '|':
-                self._consume()
-                return Token(TokenType.OR, '|')
-            elif self._current_char == ';':
-                self._consume()
-                return Token(TokenType.SEMICOLON, ';')
-            elif self._current_char == '(':
-                self._consume()
-                return Token(TokenType.LPAREN, '(')
-            elif self._current_char == ')':
-                self._consume()
-                return Token(TokenType.RPAREN, ')')
+                return token
             elif self._is_whitespace_or_comment():
                 if (token := self._whitespace_or_comment()) is not None:
                     return token
@@ -96,7 +132,7 @@ class Lexer:
                 return self._letters_token()
             else:
                 raise LexerNextTokenException(f'invalid character at {self._p}: {self._current_char}')
-        return Token(TokenType.EOF, '')
+        return _EOF_TOKEN
 
     def _consume(self):
         self._p += 1
@@ -143,7 +179,7 @@ class Lexer:
             self._consume()
 
         if has_newline:
-            return Token(TokenType.NEWLINE, '')
+            return _NEWLINE_TOKEN
 
         return None
 
@@ -192,15 +228,266 @@ class Lexer:
             if self._is_banned_trailing_char():
                 raise LexerNextTokenException(f'{self._current_char} is not proper for letters token')
 
-        var_text = ''.join(chars)
-
-        if var_text in ['M', 'D', 'A']:
-            return Token(TokenType.REG_ONE, var_text)
-        elif var_text in ['MD', 'AM', 'AD', 'AMD']:
-            return Token(TokenType.REG_MULTI, var_text)
-        elif var_text in ['JGT', 'JEQ', 'JGE', 'JLT', 'JNE', 'JLE', 'JMP']:
-            return Token(TokenType.JUMP, var_text)
-        elif (var_text in ['SP', 'LCL', 'ARG', 'THIS', 'THAT', 'SCREEN', 'KBD'] or
-                re.match(r'^R([01][0-5]|\d)$', var_text) is not None):
-            return Token(TokenType.PREDEFINED, var_text)
-        return Token(TokenType.VAR, ''.join(chars))
+        return _letters_token(''.join(chars))
+
+
+_INPUT_TYPES = Union[str, bytes, bytearray, memoryview]
+
+
+class RegexLexer(Lexer):
+    """
+    Lexer which produces the same tokens and exceptions as Lexer,
+    but scans the input with one precompiled pattern instead of character by character.
+
+    bytes, bytearray and memoryview inputs are scanned as ASCII without decoding or copying;
+    only token texts are decoded.
+    In-memory str input is scanned by one loop over the matches of the pattern.
+    Both next_token() and tokenize() read spans of tokens from spans(), and INT and VAR tokens
+    of the same text are shared in the input like tokens with fixed text.
+    """
+    _PATTERN_SOURCE = r'''
+        (?P<OPERATOR>[@=\-+!&|;()])
+      # Lexer checks trailing characters only after the second character of letters token,
+      # and a letters token never follows a letter or digit
+      | (?P<LETTERS>[a-zA-Z][a-zA-Z\d]*)(?P<LETTERS_ERROR>(?<=[a-zA-Z\d]{2})[@/])?
+      | (?P<SKIP>(?:\s+|(?P<SKIP_COMMENT>//[^\r\n]*))+)(?P<SKIP_COMMENT_ERROR>/)?   # whitespaces and comments
+      | (?P<INT>\d+)(?P<INT_ERROR>[a-zA-Z])?
+      | (?P<COMMENT_ERROR>/)
+    '''
+    _PATTERN = re.compile(_PATTERN_SOURCE, re.VERBOSE)
+    # finditer skips characters which are not matched, so invalid characters are matched too
+    _STR_PATTERN = re.compile(_PATTERN_SOURCE + r'| (?P<INVALID>.)', re.VERBOSE | re.DOTALL)
+    _NEWLINE_PATTERN = re.compile(r'[\r\n]')
+    # same whitespaces as str.isspace() in ASCII
+    _BYTES_PATTERN = re.compile(_PATTERN_SOURCE.replace(r'\s', r'[\t-\r\x1c-\x20]').encode(), re.VERBOSE)
+    _BYTES_NEWLINE_PATTERN = re.compile(rb'[\r\n]')
+    # rest of a comment continued in the next input
+    _COMMENT_REST_PATTERN = re.compile(r'[^\r\n]*')
+    _BYTES_COMMENT_REST_PATTERN = re.compile(rb'[^\r\n]*')
+
+    def __init__(self, input_text: _INPUT_TYPES):
+        self._input_text = input_text
+        self._p = 0
+        # absolute position of self._input_text[0], only moves for streamed input
+        self._offset = 0
+        if isinstance(input_text, str):
+            self._pattern = self._PATTERN
+            self._newline_pattern = self._NEWLINE_PATTERN
+            self._comment_rest_pattern = self._COMMENT_REST_PATTERN
+        else:
+            self._pattern = self._BYTES_PATTERN
+            self._newline_pattern = self._BYTES_NEWLINE_PATTERN
+            self._comment_rest_pattern = self._BYTES_COMMENT_REST_PATTERN
+
+        # if newline or comment exists in front, ignore it
+        while (match := self._match()) is not None and match.lastgroup in ('SKIP', 'SKIP_COMMENT_ERROR'):
+            self._skip(match)
+        if match is not None and match.lastgroup == 'COMMENT_ERROR':
+            self._raise_comment_error(match.end())
+
+        # tokens by text, so that INT and VAR tokens of the same text are shared
+        self._tokens = {**_OPERATOR_TOKENS, **_KEYWORD_TOKENS}
+        self._next_span = self.spans().__next__
+
+    def next_token(self) -> Token:
+        kind, start, end = self._next_span()
+        if kind == 'OPERATOR' or kind == 'LETTERS' or kind == 'INT':
+            if (text := self._input_text[start:end]).__class__ is not str:
+                text = str(text, 'ascii')
+            if (token := self._tokens.get(text)) is None:
+                token = self._tokens[text] = Token(TokenType.INT, text) if kind == 'INT' else _letters_token(text)
+            return token
+        return _NEWLINE_TOKEN if kind == 'NEWLINE' else _EOF_TOKEN
+
+    def spans(self) -> Iterator[tuple[str, int, int]]:
+        """
+        Scan tokens without building them, repeating EOF at the end.
+        :return: OPERATOR, LETTERS, INT, NEWLINE or EOF with start and end of each token in self._input_text,
+                 where NEWLINE and EOF are empty
+        """
+        # str input not read by _fill() is scanned by one loop over the matches,
+        # which leaves self._p behind until an error or EOF
+        if isinstance(self._input_text, str) and type(self)._fill is RegexLexer._fill:
+            size = len(self._input_text)
+            for match in self._STR_PATTERN.finditer(self._input_text, self._p):
+                kind = match.lastgroup
+                if kind == 'SKIP':
+                    # For EOF, newline has no meaning
+                    if (end := match.end()) < size and ('\n' in (text := match[0]) or '\r' in text):
+                        yield 'NEWLINE', end, end
+                elif kind == 'OPERATOR' or kind == 'LETTERS' or kind == 'INT':
+                    start, end = match.span()
+                    yield kind, start, end
+                else:
+                    # errors are raised by _scan() from the start of the match
+                    self._p = match.start()
+                    break
+            else:
+                self._p = size
+
+        while True:
+            kind, start = self._scan()
+            yield kind, start, self._p if kind not in ('NEWLINE', 'EOF') else start
+
+    def _scan(self) -> tuple[str, int]:
+        """
+        Scan next token without building it.
+        :return: OPERATOR, LETTERS, INT, NEWLINE or EOF and start of the token in self._input_text;
+                 the token ends at self._p
+        """
+        # whitespaces and comments skipped before the next token had a newline
+        newline = False
+        while self._p < len(self._input_text) or self._fill():
+            if (match := self._match()) is None:
+                if newline:
+                    return 'NEWLINE', self._p
+                raise LexerNextTokenException(
+                    f'invalid character at {self._offset + self._p}: {self._char(self._p)}')
+
+            kind = match.lastgroup
+            if kind == 'SKIP':
+                # what follows is decided unless the run reaches the end of the input read so far
+                decided = match.end() + 2 <= len(self._input_text)
+                newline = self._skip(match) or newline
+                # If multiple newlines exist, only one newline token is returned
+                if decided and newline:
+                    return 'NEWLINE', self._p
+                continue
+            elif kind == 'SKIP_COMMENT_ERROR':
+                # the slash is matched again, after reading the character following it if needed
+                newline = self._skip(match) or newline
+                continue
+            elif kind == 'COMMENT_ERROR':
+                self._raise_comment_error(match.end())
+            elif newline:
+                # the token is scanned again by the next call
+                return 'NEWLINE', self._p
+
+            start = self._p
+            self._p = match.end()
+            if kind in ('OPERATOR', 'LETTERS', 'INT'):
+                return kind, start
+            elif kind == 'INT_ERROR':
+                raise LexerNextTokenException(f'{self._char(self._p - 1)} char is not proper for integer')
+            else:
+                raise LexerNextTokenException(f'{self._char(self._p - 1)} is not proper for letters token')
+        # For EOF, newline has no meaning
+        return 'EOF', self._p
+
+    def _match(self) -> Optional[re.Match]:
+        match = self._pattern.match(self._input_text, self._p)
+        # two more characters are needed to decide the end of the match and check what follows it,
+        # but whitespaces and comments are skipped as far as they are read, so that long runs are not kept
+        while (match is None or match.end() + 2 > len(self._input_text) and match.start('SKIP') < 0) \
+                and self._fill():
+            match = self._pattern.match(self._input_text, self._p)
+        return match
+
+    def _skip(self, match: re.Match) -> bool:
+        """
+        Consume whitespaces and comments of match, reading the rest of a comment reaching the end of the input.
+        :return: True if they have a newline
+        """
+        end = match.end('SKIP')
+        newline = self._newline_pattern.search(self._input_text, self._p, end) is not None
+        self._p = end
+        # a comment ending the run reaches the end of the input read so far
+        if match.end('SKIP_COMMENT') == end:
+            while self._p == len(self._input_text) and self._fill():
+                self._p = self._comment_rest_pattern.match(self._input_text).end()
+        return newline
+
+    def _fill(self) -> bool:
+        """
+        Append more input to self._input_text.
+        :return: False if there is no more input
+        """
+        return False
+
+    def _raise_comment_error(self, after_slash: int):
+        # comment should start with two slashes
+        raise LexerNextTokenException(f'expected / but {self._char(after_slash)}')
+
+    def _text(self, start: int, end: int) -> str:
+        text = self._input_text[start:end]
+        return text if isinstance(text, str) else str(text, 'ascii')
+
+    def _char(self, i: int) -> str:
+        """
+        :return: character at i for error messages, empty if i is at the end
+        """
+        char = self._input_text[i:i + 1]
+        return char if isinstance(char, str) else str(char, 'latin-1')
+
+
+def tokenize(input_text: _INPUT_TYPES) -> TokenBuffer:
+    """
+    Lex the whole input into a columnar TokenBuffer without building Token objects.
+    """
+    tokens = TokenBuffer(input_text, TokenType, _token)
+    append_type, append_start, append_end = tokens.types.append, tokens.starts.append, tokens.ends.append
+    type_values = {text: token.type.value for text, token in {**_OPERATOR_TOKENS, **_KEYWORD_TOKENS}.items()}
+    newline_value = TokenType.NEWLINE.value
+    for kind, start, end in RegexLexer(input_text).spans():
+        if kind == 'OPERATOR' or kind == 'LETTERS' or kind == 'INT':
+            if (text := input_text[start:end]).__class__ is not str:
+                text = str(text, 'ascii')
+            if (value := type_values.get(text)) is None:
+                value = type_values[text] = (TokenType.INT if kind == 'INT' else _letters_token_type(text)).value
+            append_type(value)
+        elif kind == 'NEWLINE':
+            append_type(newline_value)
+        else:
+            tokens.append(TokenType.EOF.value, start, end)
+            return tokens
+        append_start(start)
+        append_end(end)
+
+
+class StreamLexer(RegexLexer):
+    """
+    RegexLexer reading the program from a file path or binary file object chunk by chunk,
+    so only the unconsumed part of the current chunk is kept in memory.
+    Tokens and comments straddling chunk boundaries are completed by reading the next chunks.
+    """
+    DEFAULT_CHUNK_SIZE = 1 << 16
+
+    def __init__(self, source: Union[str, os.PathLike, BinaryIO], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size <= 0:
+            raise ValueError('chunk_size should be larger than 0')
+        if isinstance(source, (str, os.PathLike)):
+            self._file = open(source, 'rb')
+            self._owns_file = True
+        else:
+            self._file = source
+            self._owns_file = False
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._exhausted = False
+
+        super().__init__('')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+
+    def _fill(self) -> bool:
+        while not self._exhausted:
+            chunk = self._file.read(self._chunk_size)
+            if not chunk:
+                self._exhausted = True
+                self.close()
+
+            if text := self._decoder.decode(chunk, final=not chunk):
+                # drop consumed input before appending new one
+                self._offset += self._p
+                self._input_text = self._input_text[self._p:] + text
+                self._p = 0
+                return True
+        return False
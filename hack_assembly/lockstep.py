@@ -0,0 +1,107 @@
+from typing import Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .assembler import Assembler
+from .emulator import A_BIT, ADDRESS_MASK, D_BIT, HALT, JEQ_BIT, JGT_BIT, JLT_BIT, M_BIT, RAM_SIZE, decode
+from .lexer import RegexLexer
+from .parser import Parser
+
+
+class LockstepEmulator:
+    """
+    Many instances of a Hack program with their own registers and RAM, run together by NumPy.
+
+    Registers are arrays of instances, and ram[address] is the array of a word of all instances,
+    so the same address loaded by an A instruction is a row of memory.
+    Each step runs one instruction for all running instances at the lowest pc, and the others wait,
+    so instances which branch differently are masked until they meet at the same pc again.
+    An instance stops at the halt loop, at the end of ROM, or after max_cycles instructions of a run,
+    and registers, memory, pc and cycles of every instance are the same as those of Emulator.
+    """
+    def __init__(self, words: Iterable[int], count: int):
+        if np is None:
+            raise ImportError('LockstepEmulator requires numpy')
+        words = [word & 0xFFFF for word in words]
+        self.rom = np.array(words, dtype=np.uint16).view(np.int16)
+        self.count = count
+        self.ram = np.zeros((RAM_SIZE, count), dtype=np.int16)
+        self.a = np.zeros(count, dtype=np.int16)
+        self.d = np.zeros(count, dtype=np.int16)
+        self.pc = np.zeros(count, dtype=np.int32)
+        self.cycles = np.zeros(count, dtype=np.int64)
+        self.halted = np.zeros(count, dtype=bool)
+        self._program = decode(words)
+        self._lanes = np.arange(count)
+
+    @classmethod
+    def from_assembly(cls, source: str, count: int) -> 'LockstepEmulator':
+        return cls(Assembler(Parser(RegexLexer(source))).assemble(), count)
+
+    def reset(self):
+        self.pc[:] = 0
+        self.halted[:] = False
+
+    def run(self, max_cycles: Optional[int] = None) -> int:
+        """
+        :return: number of steps, each of which runs an instruction for some instances
+        """
+        program = self._program
+        size = len(program)
+        pc = self.pc
+        start_cycles = self.cycles.copy()
+        steps = 0
+        while True:
+            running = ~self.halted & (pc < size)
+            if max_cycles is not None:
+                running &= self.cycles - start_cycles < max_cycles
+            if not running.any():
+                return steps
+
+            current = int(pc[running].min())
+            lanes = running & (pc == current)
+            if lanes.all():
+                lanes = self._lanes
+            else:
+                lanes = np.flatnonzero(lanes)
+
+            instruction = program[current]
+            if instruction is HALT:
+                self.halted[lanes] = True
+                continue
+            steps += 1
+            self.cycles[lanes] += 1
+            if instruction.__class__ is int:
+                self.a[lanes] = instruction
+                pc[lanes] = current + 1
+            else:
+                self._c_instruction(lanes, current, *instruction)
+
+    def _c_instruction(self, lanes, current: int, compute, dest: int, jump: int):
+        a = self.a[lanes].astype(np.int32)
+        d = self.d[lanes].astype(np.int32)
+        address = a & ADDRESS_MASK
+        m = self.ram[address, lanes].astype(np.int32)
+        # constant comps are broadcast to all lanes
+        out = np.broadcast_to(compute(a, d, m), lanes.shape)
+        if dest & M_BIT:
+            self.ram[address, lanes] = out
+        if dest & D_BIT:
+            self.d[lanes] = out
+        if dest & A_BIT:
+            self.a[lanes] = out
+
+        if not jump:
+            self.pc[lanes] = current + 1
+            return
+        taken = np.zeros(out.shape, dtype=bool)
+        if jump & JGT_BIT:
+            taken |= out > 0
+        if jump & JEQ_BIT:
+            taken |= out == 0
+        if jump & JLT_BIT:
+            taken |= out < 0
+        self.pc[lanes] = np.where(taken, address, current + 1)
@@ -1,4 +1,8 @@
 
+from dataclasses import dataclass
+from typing import Iterator, Union
+
+from core.token_buffer import TokenBuffer
 from .lexer import TokenType, Token, Lexer
 
 
@@ -6,11 +10,27 @@ class MismatchException(Exception):
     pass
 
 
+@dataclass
+class AInstruction:
+    value: Token  # VAR, PREDEFINED or INT token
+
+
+@dataclass
+class CInstruction:
+    dest: str  # empty if omitted
+    comp: str
+    jump: str  # empty if omitted
+
+
+@dataclass
+class LInstruction:
+    symbol: str
+
+
+Instruction = Union[AInstruction, CInstruction, LInstruction]
+
+
 class Parser:
-    """
-    TODO:
-      - if symbol for l instruction is defined twice, where to deal with it
-    """
     def __init__(self, lexer: Lexer):
         self._lexer = lexer
         self._buffer_size = 2
@@ -20,14 +40,21 @@ class Parser:
         for _ in range(self._buffer_size):
             self._consume()
 
-    def parse(self):
+    def parse(self) -> list[Instruction]:
+        return list(self.instructions())
+
+    def instructions(self) -> Iterator[Instruction]:
+        """
+        Parse instructions lazily, one per line.
+        Label symbols are not resolved here; see assembler.Assembler.
+        """
         while self._lookahead_token_type(0) != TokenType.EOF:
             if self._lookahead_token_type(0) == TokenType.AT:
-                self._a_instruction()
+                yield self._a_instruction()
             elif self._lookahead_token_type(0) == TokenType.LPAREN:
-                self._l_instruction()
+                yield self._l_instruction()
             else:
-                self._c_instruction()
+                yield self._c_instruction()
 
             if self._lookahead_token_type(0) == TokenType.NEWLINE:
                 self._match(TokenType.NEWLINE)
@@ -41,44 +68,54 @@ class Parser:
 
     def _match(self, token_type: TokenType):
         if self._lookahead_token_type(0) != token_type:
-            raise MismatchException(f'expected: {token_type} but {self._lookahead_token(0).type}')
+            raise MismatchException(f'expected: {token_type} but {self._lookahead_token_type(0)}')
         self._consume()
 
+    def _match_text(self, token_type: TokenType) -> str:
+        text = self._lookahead_text(0)
+        self._match(token_type)
+        return text
+
     def _lookahead_token(self, i: int) -> Token:
         return self._lookahead_buffer[(self._p + i) % 2]
 
+    def _lookahead_text(self, i: int) -> str:
+        return self._lookahead_token(i).text
+
     def _lookahead_token_type(self, i: int) -> TokenType:
         return self._lookahead_token(i).type
 
-    def _a_instruction(self):
+    def _a_instruction(self) -> AInstruction:
         """
         a_instruction: '@' VAR | PREDEFINED | INT
         :return:
         """
         self._match(TokenType.AT)
+        value = self._lookahead_token(0)
         if self._lookahead_token_type(0) == TokenType.VAR:
             self._match(TokenType.VAR)
         elif self._lookahead_token_type(0) == TokenType.PREDEFINED:
             self._match(TokenType.PREDEFINED)
         else:
             self._match(TokenType.INT)
+        return AInstruction(value)
 
-    def _c_instruction(self):
+    def _c_instruction(self) -> CInstruction:
         """
         c_instruction: dest '=' comp
                      | comp ';' jump
         :return:
         """
         if self._lookahead_token_type(1) == TokenType.EQUAL:
-            self._dest()
+            dest = self._dest()
             self._match(TokenType.EQUAL)
-            self._comp()
+            return CInstruction(dest, self._comp(), '')
         else:
-            self._comp()
+            comp = self._comp()
             self._match(TokenType.SEMICOLON)
-            self._jump()
+            return CInstruction('', comp, self._jump())
 
-    def _l_instruction(self):
+    def _l_instruction(self) -> LInstruction:
         """
         l_instruction: '(' VAR ')'
 
@@ -86,20 +123,21 @@ class Parser:
         """
 
         self._match(TokenType.LPAREN)
-        self._match(TokenType.VAR)
+        symbol = self._match_text(TokenType.VAR)
         self._match(TokenType.RPAREN)
+        return LInstruction(symbol)
 
-    def _dest(self):
+    def _dest(self) -> str:
         """
         dest: REG_ONE | REG_MULTI
         :return:
         """
         if self._lookahead_token_type(0) == TokenType.REG_ONE:
-            self._match(TokenType.REG_ONE)
+            return self._match_text(TokenType.REG_ONE)
         else:
-            self._match(TokenType.REG_MULTI)
+            return self._match_text(TokenType.REG_MULTI)
 
-    def _comp(self):
+    def _comp(self) -> str:
         """
         comp: INT{0, 1}
               | '-' (INT{1} | REG_ONE)
@@ -108,47 +146,90 @@ class Parser:
               | REG_ONE '-' (REG_ONE | INT{1})
               | REG_ONE '&' REG_ONE
               | REG_ONE '|' REG_ONE
-        :return:
+        :return: comp text without whitespaces e.g. D+1
         """
+        texts = []
         if self._is_zero_or_one_int_token():
-            self._match(TokenType.INT)
+            texts.append(self._match_text(TokenType.INT))
         elif self._lookahead_token_type(0) == TokenType.MINUS:
-            self._match(TokenType.MINUS)
+            texts.append(self._match_text(TokenType.MINUS))
             if self._is_one_int_token():
-                self._match(TokenType.INT)
+                texts.append(self._match_text(TokenType.INT))
             else:
-                self._match(TokenType.REG_ONE)
+                texts.append(self._match_text(TokenType.REG_ONE))
         elif self._lookahead_token_type(0) == TokenType.NOT:
-            self._match(TokenType.NOT)
-            self._match(TokenType.REG_ONE)
+            texts.append(self._match_text(TokenType.NOT))
+            texts.append(self._match_text(TokenType.REG_ONE))
         elif self._lookahead_token_type(0) == TokenType.REG_ONE:
-            self._match(TokenType.REG_ONE)
+            texts.append(self._match_text(TokenType.REG_ONE))
             if self._lookahead_token_type(0) == TokenType.PLUS:
-                self._match(TokenType.PLUS)
+                texts.append(self._match_text(TokenType.PLUS))
                 if self._is_one_int_token():
-                    self._match(TokenType.INT)
+                    texts.append(self._match_text(TokenType.INT))
                 else:
-                    self._match(TokenType.REG_ONE)
+                    texts.append(self._match_text(TokenType.REG_ONE))
             elif self._lookahead_token_type(0) == TokenType.MINUS:
-                self._match(TokenType.MINUS)
+                texts.append(self._match_text(TokenType.MINUS))
                 if self._is_one_int_token():
-                    self._match(TokenType.INT)
+                    texts.append(self._match_text(TokenType.INT))
                 else:
-                    self._match(TokenType.REG_ONE)
+                    texts.append(self._match_text(TokenType.REG_ONE))
             elif self._lookahead_token_type(0) == TokenType.AND:
-                self._match(TokenType.AND)
-                self._match(TokenType.REG_ONE)
+                texts.append(self._match_text(TokenType.AND))
+                texts.append(self._match_text(TokenType.REG_ONE))
             elif self._lookahead_token_type(0) == TokenType.OR:
-                self._match(TokenType.OR)
-                self._match(TokenType.REG_ONE)
+                texts.append(self._match_text(TokenType.OR))
+                texts.append(self._match_text(TokenType.REG_ONE))
         else:
-            raise MismatchException(f'comp parsing failed at {self._lookahead_token}')
+            raise MismatchException(f'comp parsing failed at {self._lookahead_token(0)}')
+        return ''.join(texts)
 
-    def _jump(self):
-        self._match(TokenType.JUMP)
+    def _jump(self) -> str:
+        return self._match_text(TokenType.JUMP)
 
     def _is_zero_or_one_int_token(self):
-        return self._lookahead_token_type(0) == TokenType.INT and self._lookahead_token(0).text in {'0', '1'}
+        return self._lookahead_token_type(0) == TokenType.INT and self._lookahead_text(0) in {'0', '1'}
 
     def _is_one_int_token(self):
-        return self._lookahead_token_type(0) == TokenType.INT and self._lookahead_token(0).text == '1'
+        return self._lookahead_token_type(0) == TokenType.INT and self._lookahead_text(0) == '1'
+
+
+class TokenBufferParser(Parser):
+    """
+    Parser reading tokens directly from a columnar TokenBuffer instead of a ring buffer of tokens.
+    Token objects are only built for values of A instructions, and texts only where they are needed.
+    """
+    def __init__(self, tokens: TokenBuffer):
+        self._tokens = tokens
+        self._types = tokens.types
+        self._members = tokens.members
+        self._shared_tokens: dict[tuple[TokenType, str], Token] = {}
+        self._p = 0
+
+    def _consume(self):
+        self._p += 1
+
+    def _match(self, token_type: TokenType):
+        if self._lookahead_token_type(0) != token_type:
+            raise MismatchException(f'expected: {token_type} but {self._lookahead_token_type(0)}')
+        self._p += 1
+
+    def _match_text(self, token_type: TokenType) -> str:
+        self._match(token_type)
+        return self._tokens.text(self._p - 1)
+
+    def _lookahead_token(self, i: int) -> Token:
+        # tokens are immutable, so tokens of the same type and text are shared
+        key = (self._lookahead_token_type(i), self._tokens.text(self._p + i))
+        if (token := self._shared_tokens.get(key)) is None:
+            token = self._shared_tokens[key] = self._tokens.token(self._p + i)
+        return token
+
+    def _lookahead_text(self, i: int) -> str:
+        return self._tokens.text(self._p + i)
+
+    def _lookahead_token_type(self, i: int) -> TokenType:
+        try:
+            return self._members[self._types[self._p + i]]
+        except IndexError:
+            return TokenType.EOF
@@ -0,0 +1,120 @@
+import io
+
+import pytest
+
+from .assembler import Assembler, AssemblerException, to_hack_text, write_hack
+from .lexer import RegexLexer, StreamLexer
+from .parser import Parser
+
+
+class TestAssembler:
+    @staticmethod
+    def _assemble(input_text: str) -> Assembler:
+        return Assembler(Parser(RegexLexer(input_text)))
+
+    @staticmethod
+    def _assemble_success_test_cases() -> list[tuple]:
+        return [
+            ('''
+// Computes R0 = 2 + 3
+    @2
+    D=A
+    @3
+    D=D+A
+    @0
+    M=D
+            ''', [
+                '0000000000000010',
+                '1110110000010000',
+                '0000000000000011',
+                '1110000010010000',
+                '0000000000000000',
+                '1110001100001000',
+            ]),
+            # predefined symbols
+            ('@SP\n@LCL\n@ARG\n@THIS\n@THAT\n@R13\n@SCREEN\n@KBD', [
+                '0000000000000000',
+                '0000000000000001',
+                '0000000000000010',
+                '0000000000000011',
+                '0000000000000100',
+                '0000000000001101',
+                '0100000000000000',
+                '0110000000000000',
+            ]),
+            # labels, forward references and variables
+            ('''
+    @i
+    M=1
+(LOOP)
+    @END
+    D;JGT
+    @j
+    M=M+1
+    @LOOP
+    0;JMP
+(END)
+    @i
+    AMD=!M
+            ''', [
+                '0000000000010000',
+                '1110111111001000',
+                '0000000000001000',
+                '1110001100000001',
+                '0000000000010001',
+                '1111110111001000',
+                '0000000000000010',
+                '1110101010000111',
+                '0000000000010000',
+                '1111110001111000',
+            ]),
+            # commutative comp
+            ('D=A+D\nD=D+A\nM=M&D\nM=D|M', [
+                '1110000010010000',
+                '1110000010010000',
+                '1111000000001000',
+                '1111010101001000',
+            ]),
+            ('', []),
+        ]
+
+    @staticmethod
+    def _assemble_fail_test_cases() -> list[str]:
+        return [
+            '(LOOP)\n@LOOP\n(LOOP)',  # duplicate label
+            '@32768',  # too large
+            'D=A+A',  # no machine code for comp
+            'D=M-A',
+        ]
+
+    @pytest.mark.parametrize('single_pass', [False, True])
+    @pytest.mark.parametrize('input_text,expected', _assemble_success_test_cases())
+    def test_assemble_success(self, single_pass: bool, input_text: str, expected: list[str]):
+        assembler = self._assemble(input_text)
+        words = assembler.assemble_single_pass() if single_pass else assembler.assemble()
+        assert to_hack_text(words).splitlines() == expected
+
+    @pytest.mark.parametrize('single_pass', [False, True])
+    @pytest.mark.parametrize('input_text', _assemble_fail_test_cases())
+    def test_assemble_fail(self, single_pass: bool, input_text: str):
+        assembler = self._assemble(input_text)
+        with pytest.raises(AssemblerException):
+            assembler.assemble_single_pass() if single_pass else assembler.assemble()
+
+    @pytest.mark.parametrize('single_pass', [False, True])
+    def test_symbol_table(self, single_pass: bool):
+        assembler = self._assemble('@a\n@END\n(LOOP)\n@b\n(END)\n@a\n@LOOP')
+        assembler.assemble_single_pass() if single_pass else assembler.assemble()
+        assert assembler.labels == {'LOOP': 2, 'END': 3}
+        assert assembler.symbols['a'] == 16
+        assert assembler.symbols['b'] == 17
+
+    def test_assemble_single_pass_from_stream(self):
+        source = io.BytesIO(b'@END\n0;JMP\n@x\nM=1\n(END)\n@END\n0;JMP')
+        words = Assembler(Parser(StreamLexer(source, 4))).assemble_single_pass()
+        assert list(words) == [4, 0b1110101010000111, 16, 0b1110111111001000, 4, 0b1110101010000111]
+
+    def test_write_hack(self):
+        file = io.StringIO()
+        write_hack(self._assemble('@1\n0;JMP').assemble(), file)
+        assert file.getvalue() == '0000000000000001\n1110101010000111\n'
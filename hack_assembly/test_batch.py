@@ -0,0 +1,108 @@
+import pytest
+
+from .batch import assemble_files, hack_path, main
+
+
+class TestBatch:
+    @staticmethod
+    def _write_sources(tmp_path) -> list[str]:
+        sources = {
+            'Add.asm': '@2\nD=A\n@3\nD=D+A\n@0\nM=D',
+            'Broken.asm': '@2\nD=A\n@3\nD=D+',
+            'Loop.asm': '(LOOP)\n@LOOP\n0;JMP',
+            'Duplicate.asm': '(LOOP)\n(LOOP)',
+        }
+        paths = []
+        for name, source in sources.items():
+            path = tmp_path / name
+            path.write_text(source)
+            paths.append(str(path))
+        return paths
+
+    @staticmethod
+    def _hack_path_test_cases() -> list[tuple]:
+        return [
+            ('dir/Max.asm', None, 'dir/Max.hack'),
+            ('dir/Max', None, 'dir/Max.hack'),
+            ('dir/Max.asm', 'out', 'out/Max.hack'),
+        ]
+
+    @pytest.mark.parametrize('path,output_dir,expected', _hack_path_test_cases())
+    def test_hack_path(self, path, output_dir, expected):
+        assert hack_path(path, output_dir) == expected
+
+    def test_assemble_files(self, tmp_path):
+        paths = self._write_sources(tmp_path)
+        paths.append(str(tmp_path / 'Missing.asm'))
+
+        results = assemble_files(paths, max_workers=2, chunksize=2)
+
+        assert [result.path for result in results] == paths
+        assert [result.error is None for result in results] == [True, False, True, False, False]
+        assert 'MismatchException' in results[1].error
+        assert 'AssemblerException' in results[3].error
+        assert (tmp_path / 'Loop.hack').read_text() == '0000000000000000\n1110101010000111\n'
+        assert not (tmp_path / 'Broken.hack').exists()
+
+    def test_main(self, tmp_path, capsys):
+        paths = self._write_sources(tmp_path)
+        output_dir = tmp_path / 'out'
+        output_dir.mkdir()
+
+        assert main(['-j', '2', '-o', str(output_dir), paths[0], paths[2]]) == 0
+        assert (output_dir / 'Add.hack').exists()
+
+        assert main(['-j', '1', *paths]) == 1
+        assert 'Broken.asm' in capsys.readouterr().err
+
+    def test_assemble_files_with_duplicate_output_paths(self, tmp_path):
+        paths = self._write_sources(tmp_path)
+        (tmp_path / 'other').mkdir()
+        (tmp_path / 'other' / 'Add.asm').write_text('@1')
+        paths.append(str(tmp_path / 'other' / 'Add.asm'))
+        output_dir = tmp_path / 'out'
+        output_dir.mkdir()
+
+        results = assemble_files(paths, str(output_dir), max_workers=2)
+
+        # both Add.asm would write out/Add.hack, so neither is assembled
+        assert [result.error is None for result in results] == [False, False, True, False, False]
+        assert results[0].error == f'output path {output_dir / "Add.hack"} is shared with {paths[4]}'
+        assert results[4].error == f'output path {output_dir / "Add.hack"} is shared with {paths[0]}'
+        assert not (output_dir / 'Add.hack').exists()
+        assert (output_dir / 'Loop.hack').exists()
+
+    def test_main_with_duplicate_output_paths(self, tmp_path, capsys):
+        paths = self._write_sources(tmp_path)
+
+        assert main(['-j', '1', '-o', str(tmp_path / 'out'), paths[0], paths[0]]) == 1
+        assert 'is shared with' in capsys.readouterr().err
+
+    def test_main_creates_output_dir(self, tmp_path):
+        paths = self._write_sources(tmp_path)
+        output_dir = tmp_path / 'out' / 'nested'
+
+        assert main(['-j', '1', '-o', str(output_dir), paths[0]]) == 0
+        assert (output_dir / 'Add.hack').exists()
+
+    def test_main_output_dir_is_file(self, tmp_path, capsys):
+        paths = self._write_sources(tmp_path)
+
+        with pytest.raises(SystemExit):
+            main(['-j', '1', '-o', paths[2], paths[0]])
+        assert 'cannot create output directory' in capsys.readouterr().err
+
+    def test_assemble_files_with_cache(self, tmp_path):
+        paths = self._write_sources(tmp_path)
+        cache_dir = str(tmp_path / 'cache')
+
+        first = assemble_files(paths, cache_dir=cache_dir, max_workers=2)
+        (tmp_path / 'Add.hack').unlink()
+        (tmp_path / 'Loop.asm').write_text('(LOOP)\n@LOOP\nD;JMP')
+        second = assemble_files(paths, cache_dir=cache_dir, max_workers=2)
+
+        assert [result.cached for result in first] == [False, False, False, False]
+        # Add.asm is unchanged, Loop.asm is changed and failed files are never cached
+        assert [result.cached for result in second] == [True, False, False, False]
+        assert (tmp_path / 'Add.hack').read_text().splitlines()[0] == '0000000000000010'
+        assert (tmp_path / 'Loop.hack').read_text() == '0000000000000000\n1110001100000111\n'
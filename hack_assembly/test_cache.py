@@ -0,0 +1,100 @@
+import io
+import os
+from array import array
+
+from . import cache as cache_module
+from .cache import AssemblyCache, CachedProgram
+
+
+class TestAssemblyCache:
+    def test_get_put(self, tmp_path):
+        cache = AssemblyCache(str(tmp_path))
+        key = AssemblyCache.key(b'@1\n0;JMP')
+        assert cache.get(key) is None
+
+        cache.put(key, CachedProgram(array('H', [1, 0b1110101010000111]), {'LOOP': 0}))
+
+        program = cache.get(key)
+        assert list(program.words) == [1, 0b1110101010000111]
+        assert program.labels == {'LOOP': 0}
+
+    def test_key(self, monkeypatch):
+        source = b'@1\n0;JMP'
+        key = AssemblyCache.key(source)
+        assert AssemblyCache.file_key(io.BytesIO(source)) == key
+        assert AssemblyCache.key(b'@2\n0;JMP') != key
+
+        # programs assembled by other assembler versions are not reused
+        monkeypatch.setattr(cache_module, 'ASSEMBLER_VERSION', cache_module.ASSEMBLER_VERSION + 1)
+        assert AssemblyCache.key(source) != key
+
+    def test_corrupted_entry(self, tmp_path):
+        cache = AssemblyCache(str(tmp_path))
+        key = AssemblyCache.key(b'')
+        (tmp_path / (key + '.entry')).write_bytes(b'{"size": 3, "labels": {}}\n\x00\x00')
+        assert cache.get(key) is None
+
+    def test_evict_least_recently_used(self, tmp_path):
+        words = array('H', range(100))
+        # room for three entries, and eviction leaves two of them
+        entry_size = len(b'{"size": 100, "labels": {}}\n') + len(words) * 2
+        cache = AssemblyCache(str(tmp_path), entry_size * 3)
+
+        keys = [AssemblyCache.key(bytes([i])) for i in range(4)]
+        for i in range(3):
+            cache.put(keys[i], CachedProgram(words, {}))
+            os.utime(tmp_path / (keys[i] + '.entry'), ns=(i + 1, i + 1))
+
+        # keys[0] becomes the most recently used
+        assert cache.get(keys[0]) is not None
+        cache.put(keys[3], CachedProgram(words, {}))
+
+        assert [cache.get(key) is not None for key in keys] == [True, False, False, True]
+
+    def test_put_scans_only_over_max_bytes(self, tmp_path, monkeypatch):
+        scans = []
+        evict = AssemblyCache._evict
+        monkeypatch.setattr(AssemblyCache, '_evict', lambda self: scans.append(1) or evict(self))
+        words = array('H', range(100))
+        entry_size = len(b'{"size": 100, "labels": {}}\n') + len(words) * 2
+        cache = AssemblyCache(str(tmp_path), entry_size * 10)
+
+        for i in range(10):
+            cache.put(AssemblyCache.key(bytes([i])), CachedProgram(words, {}))
+        # only the first put scans, as the size is not known yet
+        assert len(scans) == 1
+
+        cache.put(AssemblyCache.key(b'over'), CachedProgram(words, {}))
+        assert len(scans) == 2
+        # evicted down to 3/4 of max bytes
+        assert len(list(tmp_path.glob('*.entry'))) == 7
+
+    def test_full_cache_scans_once_per_evicted_entries(self, tmp_path, monkeypatch):
+        scans = []
+        evict = AssemblyCache._evict
+        monkeypatch.setattr(AssemblyCache, '_evict', lambda self: scans.append(1) or evict(self))
+        words = array('H', range(100))
+        entry_size = len(b'{"size": 100, "labels": {}}\n') + len(words) * 2
+        cache = AssemblyCache(str(tmp_path), entry_size * 20)
+
+        for i in range(400):
+            cache.put(AssemblyCache.key(i.to_bytes(2, 'little')), CachedProgram(words, {}))
+        # eviction leaves 15 entries, so the first put and every 6th of the other 380 puts scan,
+        # instead of every put once the cache is full
+        assert len(scans) == 1 + 64
+        assert len(list(tmp_path.glob('*.entry'))) <= 20
+
+    def test_evict_orphaned_temp_files(self, tmp_path):
+        cache = AssemblyCache(str(tmp_path), 0)
+        old = tmp_path / '.orphan.tmp'
+        old.write_bytes(b'partial')
+        os.utime(old, ns=(1, 1))
+        # may be written by another process
+        recent = tmp_path / '.recent.tmp'
+        recent.write_bytes(b'partial')
+
+        cache.put(AssemblyCache.key(b''), CachedProgram(array('H'), {}))
+
+        assert not old.exists()
+        assert recent.exists()
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['.recent.tmp', 'size']
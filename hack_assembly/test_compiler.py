@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from .assembler import COMP_CODES, DEST_CODES, JUMP_CODES
+from .compiler import CompiledEmulator, find_leaders
+from .emulator import Emulator, decode
+from .test_emulator import _MAX, _MULT, _random_words
+
+
+def _c(comp: str, dest: str = '', jump: str = '') -> int:
+    # C instructions with both dest and jump, which are not accepted by the parser
+    return 0b111 << 13 | COMP_CODES[comp] << 6 | DEST_CODES[dest] << 3 | JUMP_CODES[jump]
+
+
+class TestCompiledEmulator:
+    @staticmethod
+    def _run(emulator: Emulator, ram: dict[int, int], max_cycles=None) -> Emulator:
+        for address, value in ram.items():
+            emulator.write(address, value)
+        emulator.run(max_cycles)
+        return emulator
+
+    @staticmethod
+    def _same_as_emulator_test_cases() -> list[tuple]:
+        return [
+            ('@2\nD=A\n@3\nD=D+A\n@0\nM=D', {}),
+            (_MAX, {0: 3, 1: 7}),
+            (_MAX, {0: -4, 1: -9}),
+            (_MULT, {0: 6, 1: 7}),
+            (_MULT, {0: 300, 1: 300}),
+            # A and M written by the same instruction, jumps to old A
+            ([100, _c('A+1', 'AM'), 200, _c('A', 'D'), 101, _c('D+1', 'AMD', 'JGT'), 0, _c('1', 'M')], {}),
+            ([5, _c('-A', 'D'), _c('D', 'A'), _c('1', 'M'), 8, _c('-1', 'A', 'JLT'), 1, _c('1', 'M')], {}),
+            # computed jump to the middle of a block
+            ([6, _c('A', 'D'), 3, _c('A+1', 'A'), _c('D', 'A', 'JMP'), 0, _c('1', 'M'), 1, _c('1', 'M')], {}),
+        ]
+
+    @pytest.mark.parametrize('program, ram', _same_as_emulator_test_cases())
+    def test_same_as_emulator(self, program, ram):
+        if isinstance(program, str):
+            expected = self._run(Emulator.from_assembly(program), ram)
+            compiled = self._run(CompiledEmulator.from_assembly(program), ram)
+        else:
+            expected = self._run(Emulator(program), ram)
+            compiled = self._run(CompiledEmulator(program), ram)
+        assert (compiled.a, compiled.d, compiled.pc, compiled.halted, compiled.cycles) == \
+               (expected.a, expected.d, expected.pc, expected.halted, expected.cycles)
+        assert compiled.ram == expected.ram
+
+    @pytest.mark.parametrize('max_cycles', [1, 2, 3, 5, 8, 13, 30, 100, 1000])
+    def test_max_cycles(self, max_cycles):
+        expected = self._run(Emulator.from_assembly(_MULT), {0: 7, 1: 9})
+        compiled = self._run(CompiledEmulator.from_assembly(_MULT), {0: 7, 1: 9}, max_cycles)
+        assert compiled.cycles == min(max_cycles, expected.cycles)
+        while not compiled.halted:
+            assert compiled.run(max_cycles) <= max_cycles
+        assert compiled.cycles == expected.cycles
+        assert compiled.ram == expected.ram
+
+    @pytest.mark.parametrize('seed', range(20))
+    def test_random_programs(self, seed):
+        rng = random.Random(seed)
+        words = _random_words(rng, 40)
+        ram = {address: rng.randrange(-1 << 15, 1 << 15) for address in range(45)}
+        expected = self._run(Emulator(words), ram, 500)
+        compiled = CompiledEmulator(words)
+        for address, value in ram.items():
+            compiled.write(address, value)
+        while compiled.cycles < expected.cycles:
+            assert compiled.run(min(rng.randrange(1, 60), expected.cycles - compiled.cycles))
+        assert (compiled.a, compiled.d, compiled.pc, compiled.halted, compiled.cycles) == \
+               (expected.a, expected.d, expected.pc, expected.halted, expected.cycles)
+        assert compiled.ram == expected.ram
+
+    def test_blocks_are_shared(self):
+        first = CompiledEmulator.from_assembly(_MULT)
+        first.write(1, 3)
+        first.run()
+        second = CompiledEmulator.from_assembly(_MULT)
+        assert second._compiler is first._compiler
+        assert any(second._compiler.blocks)
+
+    def test_leaders(self):
+        emulator = CompiledEmulator.from_assembly(_MULT)
+        # start, LOOP, after D;JLE, after 0;JMP which is END
+        assert find_leaders(decode(emulator.rom)) == {0, 6, 10, 18}
+
+    def test_constant_address(self):
+        emulator = CompiledEmulator.from_assembly('@R2\nM=M+1\nD=M\n@R3\nM=D')
+        source = emulator._compiler.source(0)
+        assert 'ram[2]' in source
+        assert 'ram[3]' in source
+        assert 'address' not in source
+
+    def test_loop(self):
+        # LOOP, the loop body and the jump back to LOOP are one function
+        emulator = CompiledEmulator.from_assembly(_MULT)
+        assert 'while True:' in emulator._compiler.source(6)
+        assert 'while True:' not in emulator._compiler.source(0)
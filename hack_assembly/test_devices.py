@@ -0,0 +1,78 @@
+import pytest
+
+from .devices import KEY_CODES, SCREEN, Keyboard, Screen, key_code
+
+
+class TestScreen:
+    def test_write(self):
+        screen = Screen()
+        screen.write(SCREEN, 1)
+        screen.write(SCREEN + 33, -32768)
+        assert screen.pixel(0, 0)
+        assert not screen.pixel(1, 0)
+        assert screen.pixel(31, 1)
+        assert not screen.pixel(15, 1)
+        assert bytes(screen.row(1)[2:4]) == b'\x00\x80'
+
+    def test_dirty_rows(self):
+        screen = Screen()
+        assert screen.dirty_rows() == []
+        screen.write(SCREEN + 32 * 255 + 31, 5)
+        screen.write(SCREEN + 32 * 7, 0)
+        screen.write(SCREEN + 32 * 7 + 1, 3)
+        assert screen.dirty_rows() == [7, 255]
+        assert screen.dirty_rows() == []
+
+
+class TestKeyboard:
+    @staticmethod
+    def _key_code_test_cases() -> list[tuple]:
+        return [
+            ('A', 65),
+            (' ', 32),
+            ('\n', 128),
+            ('newline', 128),
+            ('Esc', 140),
+            ('F12', 152),
+            (200, 200),
+        ]
+
+    @pytest.mark.parametrize('key, expected', _key_code_test_cases())
+    def test_key_code(self, key, expected):
+        assert key_code(key) == expected
+
+    def test_unknown_key(self):
+        with pytest.raises(ValueError):
+            key_code('space bar')
+
+    def test_update(self):
+        keyboard = Keyboard()
+        assert keyboard.update(0) is None
+        keyboard.press('A', 10)
+        keyboard.release(5)
+        keyboard.press('left', 3)
+        # the script starts at the first update after keys are queued
+        assert keyboard.update(100) == 110
+        assert keyboard.key == 65
+        assert keyboard.update(109) == 110
+        assert keyboard.update(110) == 115
+        assert keyboard.key == 0
+        # keys keep their schedule when updated late
+        assert keyboard.update(116) == 118
+        assert keyboard.key == KEY_CODES['left']
+        assert keyboard.update(118) is None
+        assert keyboard.key == 0
+
+    def test_type(self):
+        keyboard = Keyboard()
+        keyboard.type('HI', 4, 2)
+        keys = []
+        cycle = 0
+        while (change := keyboard.update(cycle)) is not None:
+            keys.append((cycle, keyboard.key))
+            cycle = change
+        assert keys == [(0, 72), (4, 0), (6, 73), (10, 0)]
+
+    def test_press_without_cycles(self):
+        with pytest.raises(ValueError):
+            Keyboard().press('A', 0)
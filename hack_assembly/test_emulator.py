@@ -0,0 +1,433 @@
+import random
+
+import pytest
+
+from .assembler import COMP_CODES
+from .compiler import CompiledEmulator
+from .emulator import Emulator, HALT, _COMPUTES, alu, decode, to_signed
+
+
+def _random_words(rng: random.Random, size: int) -> list[int]:
+    words = []
+    for _ in range(size):
+        if rng.random() < 0.5:
+            words.append(rng.choice([rng.randrange(size + 2), rng.randrange(1 << 15)]))
+        else:
+            words.append(0b111 << 13 | rng.randrange(1 << 13))
+    return words
+
+
+_MAX = '''
+// R2 = max(R0, R1)
+    @R0
+    D=M
+    @R1
+    D=D-M
+    @FIRST
+    D;JGT
+    @R1
+    D=M
+    @R2
+    M=D
+    @END
+    0;JMP
+(FIRST)
+    @R0
+    D=M
+    @R2
+    M=D
+(END)
+    @END
+    0;JMP
+'''
+
+_MULT = '''
+// R2 = R0 * R1
+    @R2
+    M=0
+    @R1
+    D=M
+    @i
+    M=D
+(LOOP)
+    @i
+    D=M
+    @END
+    D;JLE
+    @R0
+    D=M
+    @R2
+    M=D+M
+    @i
+    M=M-1
+    @LOOP
+    0;JMP
+(END)
+    @END
+    0;JMP
+'''
+
+
+class TestEmulator:
+    @staticmethod
+    def _run(source: str, ram: dict[int, int] = None) -> Emulator:
+        emulator = Emulator.from_assembly(source)
+        for address, value in (ram or {}).items():
+            emulator.write(address, value)
+        emulator.run()
+        return emulator
+
+    @staticmethod
+    def _program_test_cases() -> list[tuple]:
+        return [
+            ('@2\nD=A\n@3\nD=D+A\n@0\nM=D', {}, {0: 5}),
+            (_MAX, {0: 3, 1: 7}, {2: 7}),
+            (_MAX, {0: 7, 1: 3}, {2: 7}),
+            (_MAX, {0: -4, 1: -9}, {2: -4}),
+            (_MULT, {0: 6, 1: 7}, {2: 42}),
+            (_MULT, {0: -3, 1: 5}, {2: -15}),
+            (_MULT, {0: 123, 1: 0}, {2: 0}),
+            # 16 bit wraparound
+            (_MULT, {0: 300, 1: 300}, {2: to_signed(90000)}),
+            ('@32767\nD=A\nD=D+1\n@0\nM=D', {}, {0: -32768}),
+            ('@0\nM=-1\nM=M-1\nD=!M\n@1\nM=-D', {}, {0: -2, 1: -1}),
+        ]
+
+    @pytest.mark.parametrize('source, ram, expected', _program_test_cases())
+    def test_program(self, source, ram, expected):
+        emulator = self._run(source, ram)
+        for address, value in expected.items():
+            assert emulator.ram[address] == value
+
+    @staticmethod
+    def _jump_test_cases() -> list[tuple]:
+        return [
+            (jump, value, taken)
+            for jump, condition in [
+                ('JGT', lambda x: x > 0),
+                ('JEQ', lambda x: x == 0),
+                ('JGE', lambda x: x >= 0),
+                ('JLT', lambda x: x < 0),
+                ('JNE', lambda x: x != 0),
+                ('JLE', lambda x: x <= 0),
+                ('JMP', lambda x: True),
+            ]
+            for value, taken in [(v, condition(v)) for v in (-32768, -1, 0, 1, 32767)]
+        ]
+
+    @pytest.mark.parametrize('jump, value, taken', _jump_test_cases())
+    def test_jump(self, jump, value, taken):
+        source = f'''
+    @R0
+    D=M
+    @TAKEN
+    D;{jump}
+    @R1
+    M=-1
+    @END
+    0;JMP
+(TAKEN)
+    @R1
+    M=1
+(END)
+    @END
+    0;JMP
+'''
+        assert self._run(source, {0: value}).ram[1] == (1 if taken else -1)
+
+    def test_halt(self):
+        emulator = Emulator.from_assembly('@1\nD=A\n(END)\n@END\n0;JMP\n@0\nM=1')
+        assert emulator.run() == 3
+        assert emulator.halted
+        assert emulator.pc == 3
+        assert emulator.d == 1
+        assert emulator.ram[0] == 0
+        # halted emulator does not run until reset
+        assert emulator.run() == 0
+        emulator.reset()
+        assert emulator.run() == 3
+
+    def test_end_of_rom(self):
+        emulator = Emulator.from_assembly('@7\nD=A')
+        assert emulator.run() == 2
+        assert not emulator.halted
+        assert emulator.pc == 2
+        assert emulator.a == 7
+        assert emulator.d == 7
+
+    def test_max_cycles(self):
+        emulator = Emulator.from_assembly(_MULT)
+        emulator.write(0, 5)
+        emulator.write(1, 100)
+        assert emulator.run(10) == 10
+        assert not emulator.halted
+        while not emulator.halted:
+            emulator.run(7)
+        assert emulator.ram[2] == 500
+        assert emulator.cycles == self._run(_MULT, {0: 5, 1: 100}).cycles
+
+    def test_infinite_loop_is_not_halt(self):
+        # jumps to itself with A loaded elsewhere
+        emulator = Emulator.from_assembly('@2\nD=A\n(LOOP)\n@LOOP\nD;JGT')
+        assert decode(emulator.rom)[3] is not HALT
+        assert emulator.run(100) == 100
+        assert not emulator.halted
+
+    def test_dest_order(self):
+        # M is written at the address of A before A is updated, and jumps go to the old A
+        emulator = self._run('@100\nAM=A+1\n@200\nD=A\n@101\nAMD=D+1')
+        assert emulator.ram[100] == 101
+        assert emulator.ram[101] == 201
+        assert emulator.a == 201
+        assert emulator.d == 201
+
+    def test_address_mask(self):
+        # A holding a negative value addresses RAM by its lower 15 bits
+        emulator = self._run('@5\nD=-A\nA=D\nM=1')
+        assert emulator.a == -5
+        assert emulator.ram[(-5) & 0x7FFF] == 1
+
+    def test_words(self):
+        # machine words with the sign bit as unsigned or signed values
+        emulator = Emulator([21, 0b1110110000010000, 0, to_signed(0b1110001100001000)])
+        emulator.run()
+        assert emulator.ram[0] == 21
+
+    @staticmethod
+    def _compute_test_cases() -> list[tuple]:
+        return sorted(set(COMP_CODES.values()))
+
+    @pytest.mark.parametrize('code', _compute_test_cases())
+    def test_computes_match_alu(self, code):
+        values = (-32768, -32767, -2, -1, 0, 1, 2, 12345, 32766, 32767)
+        compute = _COMPUTES[code]
+        generic = alu(code)
+        for a in values:
+            for d in values:
+                for m in (-32768, -1, 0, 1, 32767):
+                    assert compute(a, d, m) == generic(a, d, m)
+
+    def test_non_mnemonic_comp(self):
+        # no=1 without other bits: !(D&A), which has no assembly mnemonic
+        code = 0b0000001
+        assert code not in _COMPUTES
+        emulator = Emulator([12, 0b111 << 13 | 0b0110000 << 6 | 0b010 << 3, 10, 0b111 << 13 | code << 6 | 0b010 << 3])
+        emulator.run()
+        assert emulator.d == ~(12 & 10)
+
+
+_FILL_ROWS = '''
+// fill rows 10 to 12 of the screen
+    @SCREEN
+    D=A
+    @320
+    D=D+A
+    @address
+    M=D
+    @96
+    D=A
+    @n
+    M=D
+(LOOP)
+    @n
+    D=M
+    @END
+    D;JEQ
+    @address
+    A=M
+    M=-1
+    @address
+    M=M+1
+    @n
+    M=M-1
+    @LOOP
+    0;JMP
+(END)
+    @END
+    0;JMP
+'''
+
+_ECHO = '''
+// store each key pressed from RAM[100]
+    @100
+    D=A
+    @pointer
+    M=D
+(WAIT)
+    @KBD
+    D=M
+    @WAIT
+    D;JEQ
+    @pointer
+    A=M
+    M=D
+    @pointer
+    M=M+1
+(RELEASE)
+    @KBD
+    D=M
+    @RELEASE
+    D;JNE
+    @WAIT
+    0;JMP
+'''
+
+
+class TestEmulatorDevices:
+    @pytest.mark.parametrize('emulator_class', [Emulator, CompiledEmulator])
+    def test_screen(self, emulator_class):
+        emulator = emulator_class.from_assembly(_FILL_ROWS)
+        emulator.run()
+        assert emulator.screen.dirty_rows() == [10, 11, 12]
+        assert emulator.screen.pixel(0, 10)
+        assert emulator.screen.pixel(511, 12)
+        assert not emulator.screen.pixel(0, 9)
+        assert not emulator.screen.pixel(0, 13)
+        assert bytes(emulator.screen.row(11)) == b'\xff' * 64
+        assert emulator.ram[16384 + 320] == -1
+
+    @pytest.mark.parametrize('emulator_class', [Emulator, CompiledEmulator])
+    def test_screen_constant_address(self, emulator_class):
+        emulator = emulator_class.from_assembly('@SCREEN\nM=1\n@32767\nD=!A\n@16417\nM=D\n@KBD\nM=1')
+        emulator.run()
+        assert emulator.screen.pixel(0, 0)
+        assert emulator.screen.pixel(31, 1)
+        assert emulator.screen.dirty_rows() == [0, 1]
+
+    @pytest.mark.parametrize('emulator_class', [Emulator, CompiledEmulator])
+    def test_keyboard(self, emulator_class):
+        emulator = emulator_class.from_assembly(_ECHO)
+        emulator.keyboard.release(100)
+        emulator.keyboard.type('HI\n', 50, 30)
+        assert emulator.run(1000) == 1000
+        assert emulator.ram[100:104].tolist() == [72, 73, 128, 0]
+        assert emulator.ram[16384 + 8192] == 0
+
+    @pytest.mark.parametrize('emulator_class', [Emulator, CompiledEmulator])
+    def test_keyboard_across_runs(self, emulator_class):
+        emulator = emulator_class.from_assembly(_ECHO)
+        emulator.keyboard.press('A', 20)
+        for _ in range(30):
+            emulator.run(3)
+        emulator.keyboard.press('B', 20)
+        for _ in range(30):
+            emulator.run(7)
+        assert emulator.cycles == 300
+        assert emulator.ram[100:103].tolist() == [65, 66, 0]
+
+
+class TestSnapshot:
+    @staticmethod
+    def _state(emulator: Emulator) -> tuple:
+        return emulator.a, emulator.d, emulator.pc, emulator.cycles, emulator.halted, emulator.ram.tobytes()
+
+    @pytest.mark.parametrize('emulator_class', [Emulator, CompiledEmulator])
+    def test_restore(self, emulator_class):
+        emulator = emulator_class.from_assembly(_MULT)
+        emulator.write(0, 7)
+        emulator.write(1, 9)
+        emulator.run(20)
+        snapshot = emulator.snapshot()
+        state = self._state(emulator)
+        emulator.run()
+        finished = self._state(emulator)
+        assert emulator.ram[2] == 63
+
+        emulator.restore(snapshot)
+        assert self._state(emulator) == state
+        emulator.run()
+        assert self._state(emulator) == finished
+
+    @pytest.mark.parametrize('emulator_class', [Emulator, CompiledEmulator])
+    def test_pages_are_shared(self, emulator_class):
+        emulator = emulator_class.from_assembly(_MULT)
+        emulator.write(1, 50)
+        first = emulator.snapshot()
+        emulator.run(30)
+        second = emulator.snapshot()
+        emulator.write(20000, 1)
+        third = emulator.snapshot()
+        # R2 and i are in the first page
+        assert [page for page in range(len(first.pages)) if first.pages[page] is not second.pages[page]] == [0]
+        assert [page for page in range(len(first.pages)) if second.pages[page] is not third.pages[page]] == [78]
+        assert third.pages[0] is second.pages[0]
+
+    @pytest.mark.parametrize('emulator_class', [Emulator, CompiledEmulator])
+    def test_write_after_snapshot(self, emulator_class):
+        emulator = emulator_class.from_assembly('@1000\nD=M\n@R1\nM=D')
+        start = emulator.snapshot()
+        with pytest.raises(TypeError):
+            emulator.ram[1000] = 7
+        emulator.write(1000, 7)
+        emulator.run()
+        assert emulator.ram[1] == 7
+        emulator.snapshot()
+
+        emulator.restore(start)
+        assert emulator.ram[1000] == 0
+        assert emulator.ram[1] == 0
+
+    @pytest.mark.parametrize('emulator_class', [Emulator, CompiledEmulator])
+    def test_fork(self, emulator_class):
+        emulator = emulator_class.from_assembly(_MULT)
+        emulator.write(0, 3)
+        start = emulator.snapshot()
+        results = []
+        for multiplier in range(1, 6):
+            emulator.restore(start)
+            emulator.write(1, multiplier)
+            emulator.run()
+            results.append((emulator.ram[2], emulator.snapshot()))
+        assert [product for product, _ in results] == [3, 6, 9, 12, 15]
+        # each fork is restored exactly, whichever state is restored before
+        for product, snapshot in reversed(results):
+            emulator.restore(snapshot)
+            assert emulator.ram[2] == product
+            assert emulator.halted
+
+    @pytest.mark.parametrize('emulator_class', [Emulator, CompiledEmulator])
+    def test_screen(self, emulator_class):
+        emulator = emulator_class.from_assembly(_FILL_ROWS)
+        blank = emulator.snapshot()
+        emulator.run()
+        filled = emulator.snapshot()
+        assert emulator.screen.dirty_rows() == [10, 11, 12]
+
+        emulator.restore(blank)
+        assert emulator.screen.dirty_rows() == [10, 11, 12]
+        assert not emulator.screen.pixel(0, 11)
+        emulator.restore(filled)
+        assert emulator.screen.dirty_rows() == [10, 11, 12]
+        assert emulator.screen.pixel(0, 11)
+
+    @pytest.mark.parametrize('emulator_class', [Emulator, CompiledEmulator])
+    def test_keyboard(self, emulator_class):
+        emulator = emulator_class.from_assembly(_ECHO)
+        emulator.keyboard.type('AB', 50, 50)
+        emulator.run(75)
+        snapshot = emulator.snapshot()
+        emulator.run(200)
+        assert emulator.ram[100:102].tolist() == [65, 66]
+        emulator.restore(snapshot)
+        assert emulator.ram[100:102].tolist() == [65, 0]
+        emulator.run(200)
+        assert emulator.ram[100:102].tolist() == [65, 66]
+
+    @pytest.mark.parametrize('seed', range(10))
+    def test_random_programs(self, seed):
+        rng = random.Random(seed)
+        words = _random_words(rng, 40)
+        for emulator_class in (Emulator, CompiledEmulator):
+            emulator = emulator_class(words)
+            for address in range(45):
+                emulator.write(address, rng.randrange(-1 << 15, 1 << 15))
+            snapshots = []
+            for _ in range(30):
+                if snapshots and rng.random() < 0.3:
+                    snapshot, state = rng.choice(snapshots)
+                    emulator.restore(snapshot)
+                    assert self._state(emulator) == state
+                else:
+                    snapshots.append((emulator.snapshot(), self._state(emulator)))
+                emulator.reset()
+                emulator.run(rng.randrange(1, 50))
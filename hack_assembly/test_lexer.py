@@ -1,6 +1,9 @@
+import io
+
 import pytest
 
-from .lexer import Lexer
+from .generated_lexer import GeneratedLexer
+from .lexer import Lexer, RegexLexer, StreamLexer, tokenize
 from .lexer import LexerNextTokenException
 from .lexer import Token, TokenType
 
@@ -203,20 +206,219 @@ class TestLexer:
             ('abcdef//', LexerNextTokenException),
             ('abcdef@', LexerNextTokenException),
             ('/ hi', LexerNextTokenException),
+            ('@i\n  /x', LexerNextTokenException),
         ]
 
+    @staticmethod
+    def _lexer_classes() -> list[type]:
+        return [Lexer, RegexLexer, GeneratedLexer]
+
+    @pytest.mark.parametrize('lexer_class', _lexer_classes())
     @pytest.mark.parametrize('input_text,expected', _lexer_success_test_cases())
-    def test_next_token_success(self, input_text: str, expected: list[Token]):
-        lexer = Lexer(input_text)
+    def test_next_token_success(self, lexer_class, input_text: str, expected: list[Token]):
+        lexer = lexer_class(input_text)
         results = []
         while (token := lexer.next_token()).type != TokenType.EOF:
             results.append(token)
 
         assert results == expected
 
+    @pytest.mark.parametrize('lexer_class', _lexer_classes())
     @pytest.mark.parametrize('input_text,expected_exception', _lexer_fail_test_cases())
-    def test_next_token_fail(self, input_text: str, expected_exception):
+    def test_next_token_fail(self, lexer_class, input_text: str, expected_exception):
         with pytest.raises(expected_exception):
-            lexer = Lexer(input_text)
+            lexer = lexer_class(input_text)
             while lexer.next_token().type != TokenType.EOF:
                 lexer.next_token()
+
+    @pytest.mark.parametrize('input_text', [
+        'a@',  # trailing @ is allowed after one letter
+        '12 // comment\n\n  @i // comment',
+        '@i\n/x',
+        'AMD=D+1;JMP\r\n(END)\t@R15',
+        '@12a',
+        '\n\n// only comment',
+        'ab/ x',
+        '@i\nD/',
+        '@i\n\t$',
+    ])
+    def test_regex_lexer_same_as_lexer(self, input_text: str):
+        def tokens_or_error(lexer_class) -> list:
+            results = []
+            try:
+                lexer = lexer_class(input_text)
+                while (token := lexer.next_token()).type != TokenType.EOF:
+                    results.append(token)
+            except LexerNextTokenException as e:
+                results.append(str(e))
+            return results
+
+        assert tokens_or_error(RegexLexer) == tokens_or_error(Lexer)
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3, 1024])
+    @pytest.mark.parametrize('input_text,expected', _lexer_success_test_cases())
+    def test_stream_lexer_next_token_success(self, tmp_path, chunk_size: int, input_text: str, expected: list[Token]):
+        path = tmp_path / 'input.asm'
+        path.write_text(input_text)
+
+        with StreamLexer(path, chunk_size) as lexer:
+            results = []
+            while (token := lexer.next_token()).type != TokenType.EOF:
+                results.append(token)
+
+        assert results == expected
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3])
+    @pytest.mark.parametrize('input_text,expected_exception', _lexer_fail_test_cases())
+    def test_stream_lexer_next_token_fail(self, chunk_size: int, input_text: str, expected_exception):
+        with pytest.raises(expected_exception):
+            lexer = StreamLexer(io.BytesIO(input_text.encode()), chunk_size)
+            while lexer.next_token().type != TokenType.EOF:
+                pass
+
+    def test_stream_lexer_error_position(self):
+        input_text = '@i\n@j\n  $'
+        lexer = StreamLexer(io.BytesIO(input_text.encode()), 2)
+        with pytest.raises(LexerNextTokenException, match='invalid character at 8: \\$'):
+            while lexer.next_token().type != TokenType.EOF:
+                pass
+
+    @pytest.mark.parametrize('skipped', [
+        '// comment line\n' * 100,
+        '//' + 'x' * 1000 + '\n',
+        ' \t\r\n' * 300,
+    ])
+    def test_stream_lexer_keeps_window_of_skipped_run(self, skipped: str):
+        chunk_size = 16
+        lexer = StreamLexer(io.BytesIO(f'@i\n{skipped}D=M'.encode()), chunk_size)
+        results = []
+        window = 0
+        while (token := lexer.next_token()).type != TokenType.EOF:
+            results.append(token)
+            window = max(window, len(lexer._input_text))
+
+        assert results == [
+            Token(TokenType.AT, '@'),
+            Token(TokenType.VAR, 'i'),
+            Token(TokenType.NEWLINE, ''),
+            Token(TokenType.REG_ONE, 'D'),
+            Token(TokenType.EQUAL, '='),
+            Token(TokenType.REG_ONE, 'M'),
+        ]
+        # whitespaces and comments are not kept until the next token is read
+        assert window <= 2 * chunk_size
+
+    @pytest.mark.parametrize('lexer_class', _lexer_classes())
+    def test_token_is_compact(self, lexer_class):
+        def tokens(input_text: str) -> list[Token]:
+            lexer = lexer_class(input_text)
+            return [lexer.next_token() for _ in range(8)]
+
+        first = tokens('AM=M+D;JMP\n@R1')
+        second = tokens('AM=M+D;JMP\n@R1')
+
+        assert not hasattr(first[0], '__dict__')
+        # tokens with fixed text are shared
+        assert all(a is b for a, b in zip(first, second))
+        assert tokens('@i')[1] is not tokens('@i')[1]
+
+    @pytest.mark.parametrize('input_text', ['@i\nM=1\n@i\nM=1', b'@i\nM=1\n@i\nM=1'])
+    def test_regex_lexer_shares_tokens(self, input_text):
+        lexer = RegexLexer(input_text)
+        tokens = [lexer.next_token() for _ in range(13)]
+        assert tokens[:6] == tokens[7:]
+        assert all(a is b for a, b in zip(tokens[:6], tokens[7:]))
+
+    @pytest.mark.parametrize('input_type', [str, bytes])
+    @pytest.mark.parametrize('input_text,expected', _lexer_success_test_cases())
+    def test_regex_lexer_spans(self, input_type, input_text: str, expected: list[Token]):
+        source = input_text if input_type is str else input_text.encode()
+        spans = RegexLexer(source).spans()
+        results = []
+        while (span := next(spans))[0] != 'EOF':
+            results.append(span)
+
+        assert len(results) == len(expected)
+        for (kind, start, end), token in zip(results, expected):
+            assert kind in ('OPERATOR', 'LETTERS') or TokenType[kind] == token.type
+            assert source[start:end] == (token.text if input_type is str else token.text.encode())
+        # EOF is repeated
+        assert next(spans)[0] == 'EOF'
+
+    @pytest.mark.parametrize('input_text,expected', _lexer_success_test_cases())
+    def test_tokenize(self, input_text: str, expected: list[Token]):
+        tokens = tokenize(input_text)
+        assert [tokens.token(i) for i in range(len(tokens))] == expected + [Token(TokenType.EOF, '')]
+
+    @pytest.mark.parametrize('input_text,expected_exception', _lexer_fail_test_cases())
+    def test_tokenize_fail(self, input_text: str, expected_exception):
+        with pytest.raises(expected_exception):
+            tokenize(input_text)
+
+    @pytest.mark.parametrize('input_type', [bytes, bytearray, memoryview])
+    @pytest.mark.parametrize('input_text,expected', _lexer_success_test_cases())
+    def test_regex_lexer_bytes_success(self, input_type, input_text: str, expected: list[Token]):
+        lexer = RegexLexer(input_type(input_text.encode()))
+        results = []
+        while (token := lexer.next_token()).type != TokenType.EOF:
+            results.append(token)
+
+        assert results == expected
+        assert all(isinstance(token.text, str) for token in results)
+
+    @pytest.mark.parametrize('input_type', [bytes, memoryview])
+    @pytest.mark.parametrize('input_text,expected_exception', _lexer_fail_test_cases())
+    def test_regex_lexer_bytes_fail(self, input_type, input_text: str, expected_exception):
+        with pytest.raises(expected_exception):
+            lexer = RegexLexer(input_type(input_text.encode()))
+            while lexer.next_token().type != TokenType.EOF:
+                pass
+
+    @pytest.mark.parametrize('input_type', [bytes, bytearray, memoryview])
+    @pytest.mark.parametrize('input_text,expected', _lexer_success_test_cases())
+    def test_generated_lexer_bytes_success(self, input_type, input_text: str, expected: list[Token]):
+        lexer = GeneratedLexer(input_type(input_text.encode()))
+        results = []
+        while (token := lexer.next_token()).type != TokenType.EOF:
+            results.append(token)
+
+        assert results == expected
+
+    @pytest.mark.parametrize('input_type', [bytes, bytearray, memoryview])
+    @pytest.mark.parametrize('input_bytes', [b'@i\xa0\nD=M', b'@i\n\x85D=M', b'@\xe9'])
+    def test_generated_lexer_bytes_fail(self, input_type, input_bytes: bytes):
+        # bytes from 0x80 are rejected like RegexLexer, not read as latin-1 whitespaces or letters
+        for lexer_class in (RegexLexer, GeneratedLexer):
+            with pytest.raises(LexerNextTokenException, match='invalid character'):
+                lexer = lexer_class(input_type(input_bytes))
+                while lexer.next_token().type != TokenType.EOF:
+                    pass
+
+    @pytest.mark.parametrize('input_type', [bytes, bytearray, memoryview])
+    def test_generated_lexer_bytes_in_comment(self, input_type):
+        # comments match any byte, as in RegexLexer
+        input_bytes = '@i // \u00e9\xa0\nD=M'.encode()
+        results = []
+        for lexer in (GeneratedLexer(input_type(input_bytes)), RegexLexer(input_type(input_bytes))):
+            tokens = []
+            while (token := lexer.next_token()).type != TokenType.EOF:
+                tokens.append(token)
+            results.append(tokens)
+        assert results[0] == results[1]
+        assert [token.text for token in results[0]] == ['@', 'i', '', 'D', '=', 'M']
+
+    @pytest.mark.parametrize('input_text,message', [
+        ('@123abc', 'INT_ERROR at 1'),
+        ('abcdef@', 'LETTERS_ERROR at 0'),
+        ('@i\n  /x', 'COMMENT_ERROR at 2'),
+        ('@i\n#', 'invalid character at 3: #'),
+    ])
+    def test_generated_lexer_error_position(self, input_text: str, message: str):
+        lexer = GeneratedLexer(input_text)
+        with pytest.raises(LexerNextTokenException, match=message):
+            while lexer.next_token().type != TokenType.EOF:
+                pass
+
+    def test_tokenize_bytes(self):
+        tokens = tokenize(memoryview(b'@i\nM=D+1'))
+        assert [tokens.text(i) for i in range(len(tokens))] == ['@', 'i', '', 'M', '=', 'D', '+', '1', '']
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from .emulator import Emulator
+from .test_compiler import _c
+from .test_emulator import _MAX, _MULT, _random_words
+
+np = pytest.importorskip('numpy')
+
+from .lockstep import LockstepEmulator  # noqa: E402
+
+
+class TestLockstepEmulator:
+    @staticmethod
+    def _assert_same(lockstep: LockstepEmulator, emulators: list[Emulator], addresses: range):
+        for i, emulator in enumerate(emulators):
+            assert (lockstep.a[i], lockstep.d[i], lockstep.pc[i], lockstep.halted[i], lockstep.cycles[i]) == \
+                   (emulator.a, emulator.d, emulator.pc, emulator.halted, emulator.cycles)
+            assert lockstep.ram[addresses, i].tolist() == emulator.ram[addresses.start:addresses.stop].tolist()
+
+    @staticmethod
+    def _programs_test_cases() -> list[tuple]:
+        return [
+            (_MAX, 2),
+            (_MULT, 2),
+            ('@2\nD=A\n@3\nD=D+A\n@0\nM=D', 0),
+            # pointers differ by instances
+            ('@R0\nA=M\nM=-1\n@R1\nA=M\nD=M\n@R2\nM=D', 3),
+        ]
+
+    @pytest.mark.parametrize('source, inputs', _programs_test_cases())
+    def test_same_as_emulator(self, source, inputs):
+        rng = random.Random(0)
+        count = 40
+        lockstep = LockstepEmulator.from_assembly(source, count)
+        emulators = []
+        for i in range(count):
+            emulator = Emulator.from_assembly(source)
+            for address in range(inputs):
+                lockstep.ram[address, i] = rng.randrange(-200, 200)
+                emulator.write(address, int(lockstep.ram[address, i]))
+            emulators.append(emulator)
+            emulator.run()
+        lockstep.run()
+        self._assert_same(lockstep, emulators, range(20))
+
+    @pytest.mark.parametrize('seed', range(10))
+    def test_random_programs(self, seed):
+        rng = random.Random(seed)
+        words = _random_words(rng, 30)
+        count = 16
+        lockstep = LockstepEmulator(words, count)
+        emulators = [Emulator(words) for _ in range(count)]
+        for i, emulator in enumerate(emulators):
+            for address in range(40):
+                lockstep.ram[address, i] = rng.randrange(-1 << 15, 1 << 15)
+                emulator.write(address, int(lockstep.ram[address, i]))
+        for max_cycles in (1, 7, 300):
+            lockstep.run(max_cycles)
+            for emulator in emulators:
+                emulator.run(max_cycles)
+            self._assert_same(lockstep, emulators, range(40))
+
+    def test_divergent_branches(self):
+        # instances jump by the sign of R0 and meet again at END
+        words = [0, _c('M', 'D'), 8, _c('D', '', 'JLT'), 1, _c('1', 'M'), 10, _c('0', '', 'JMP'),
+                 1, _c('-1', 'M'), 2, _c('1', 'M')]
+        lockstep = LockstepEmulator(words, 4)
+        lockstep.ram[0] = [-3, 5, -1, 0]
+        steps = lockstep.run()
+        assert lockstep.ram[1].tolist() == [-1, 1, -1, 1]
+        assert lockstep.ram[2].tolist() == [1, 1, 1, 1]
+        assert lockstep.cycles.tolist() == [8, 10, 8, 10]
+        # 4 shared steps, 2 + 4 steps of each branch and 2 shared steps
+        assert steps == 12
+
+    def test_constant_comp(self):
+        lockstep = LockstepEmulator.from_assembly('@7\nM=1\nD=-1\n@8\nM=0', 3)
+        lockstep.ram[8] = 5
+        lockstep.run()
+        assert lockstep.ram[7].tolist() == [1, 1, 1]
+        assert lockstep.ram[8].tolist() == [0, 0, 0]
+        assert lockstep.d.tolist() == [-1, -1, -1]
@@ -1,7 +1,10 @@
+import re
+
 import pytest
 
-from .lexer import Lexer
-from .parser import Parser, MismatchException
+from .generated_parser import GeneratedParser
+from .lexer import Lexer, tokenize
+from .parser import Parser, MismatchException, TokenBufferParser
 
 
 class TestParser:
@@ -154,3 +157,73 @@ class TestParser:
         lexer = Lexer(input_text)
         parser = Parser(lexer)
         parser.parse()
+
+    @pytest.mark.parametrize('input_text', _c_instruction_success_test_cases())
+    def test_token_buffer_c_instruction_success(self, input_text):
+        parser = TokenBufferParser(tokenize(input_text))
+        assert parser._c_instruction() == Parser(Lexer(input_text))._c_instruction()
+
+    @pytest.mark.parametrize('input_text', _c_instruction_fail_test_cases())
+    def test_token_buffer_c_instruction_fail(self, input_text):
+        parser = TokenBufferParser(tokenize(input_text))
+        with pytest.raises(MismatchException):
+            parser._c_instruction()
+
+    @pytest.mark.parametrize('input_text', _parse_success_test_cases())
+    def test_token_buffer_parse(self, input_text):
+        assert TokenBufferParser(tokenize(input_text)).parse() == Parser(Lexer(input_text)).parse()
+
+    @pytest.mark.parametrize('input_text', _a_instruction_success_test_cases())
+    def test_generated_a_instruction_success(self, input_text):
+        assert GeneratedParser(Lexer(input_text))._a_instruction() == Parser(Lexer(input_text))._a_instruction()
+
+    @pytest.mark.parametrize('input_text', _a_instruction_fail_test_cases())
+    def test_generated_a_instruction_fail(self, input_text):
+        with pytest.raises(MismatchException):
+            GeneratedParser(Lexer(input_text))._a_instruction()
+
+    @pytest.mark.parametrize('input_text', _c_instruction_success_test_cases())
+    def test_generated_c_instruction_success(self, input_text):
+        assert GeneratedParser(Lexer(input_text))._c_instruction() == Parser(Lexer(input_text))._c_instruction()
+
+    @pytest.mark.parametrize('input_text', _c_instruction_fail_test_cases())
+    def test_generated_c_instruction_fail(self, input_text):
+        with pytest.raises(MismatchException):
+            GeneratedParser(Lexer(input_text))._c_instruction()
+
+    @pytest.mark.parametrize('input_text', _l_instruction_success_test_cases())
+    def test_generated_l_instruction_success(self, input_text):
+        assert GeneratedParser(Lexer(input_text))._l_instruction() == Parser(Lexer(input_text))._l_instruction()
+
+    @pytest.mark.parametrize('input_text', _l_instruction_fail_test_cases())
+    def test_generated_l_instruction_fail(self, input_text):
+        with pytest.raises(MismatchException):
+            GeneratedParser(Lexer(input_text))._l_instruction()
+
+    @pytest.mark.parametrize('input_text', _l_instruction_fail_test_cases())
+    def test_generated_mismatch_message(self, input_text):
+        with pytest.raises(MismatchException) as expected:
+            Parser(Lexer(input_text))._l_instruction()
+        with pytest.raises(MismatchException, match=re.escape(str(expected.value))):
+            GeneratedParser(Lexer(input_text))._l_instruction()
+
+    @pytest.mark.parametrize('input_text', _parse_success_test_cases() + ['', '@1', 'D;JMP\n', '(A1)\n@A1'])
+    def test_generated_parse(self, input_text):
+        assert GeneratedParser(Lexer(input_text)).parse() == Parser(Lexer(input_text)).parse()
+
+    @pytest.mark.parametrize('input_text', [
+        '@1 @2', '(a))', 'D=A;JMP', ')', 'x17', '@\n', '@=', 'x=1', '1=D', 'AM', 'AM=', 'D=2', 'D;', 'D+2;JMP',
+        '-x;JMP', '!1;JMP', 'D&;JMP', '(LOOP)\nD=M\n;JMP',
+    ])
+    def test_generated_parse_fail_with_same_error(self, input_text):
+        with pytest.raises(MismatchException) as expected:
+            Parser(Lexer(input_text)).parse()
+        with pytest.raises(MismatchException, match=re.escape(str(expected.value))):
+            GeneratedParser(Lexer(input_text)).parse()
+
+    def test_generated_instructions_lazily(self):
+        instructions = GeneratedParser(Lexer('@1\n@2\n@')).instructions()
+        assert next(instructions) == Parser(Lexer('@1'))._a_instruction()
+        assert next(instructions) == Parser(Lexer('@2'))._a_instruction()
+        with pytest.raises(MismatchException):
+            next(instructions)
@@ -0,0 +1,172 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from .regex import MAX_CODE_POINT, NFA, CharSet
+
+DEAD = 0
+NO_RULE = -1
+
+
+@dataclass
+class DFA:
+    """
+    Minimized DFA over character classes.
+
+    transitions[state][char_class] is the next state, and state 0 is the dead state without way out.
+    accepts[state] is the index of the rule accepted in the state, or -1.
+    classes are (first code point, class) of consecutive code point ranges, sorted and starting from 0,
+    so a code point is in the class of the last range starting at or before it.
+    """
+    transitions: list[list[int]]
+    accepts: list[int]
+    start: int
+    classes: list[tuple[int, int]]
+
+    @property
+    def class_count(self) -> int:
+        return len(self.transitions[0])
+
+    def class_of(self, code_point: int) -> int:
+        i = bisect_left(self.classes, (code_point + 1, -1)) - 1
+        return self.classes[i][1]
+
+    def match(self, text: str, pos: int = 0) -> tuple[int, int]:
+        """
+        Longest match at pos.
+        :return: index of the rule and end of the match, or -1 and pos when nothing matches
+        """
+        state = self.start
+        rule, end = NO_RULE, pos
+        for i in range(pos, len(text)):
+            state = self.transitions[state][self.class_of(ord(text[i]))]
+            if state == DEAD:
+                break
+            if self.accepts[state] != NO_RULE:
+                rule, end = self.accepts[state], i + 1
+        return rule, end
+
+
+def build_dfa(nfa: NFA) -> DFA:
+    """
+    Subset construction over elementary ranges, the ranges between boundaries of all character sets in nfa,
+    then minimization, then ranges with the same transitions in every state are merged into character classes.
+    When an input is accepted by several rules, the rule with the smallest index wins.
+    """
+    boundaries = _boundaries(nfa)
+    edges = [
+        [(_range_indexes(chars, boundaries), target) for chars, target in state_edges]
+        for state_edges in nfa.edges
+    ]
+
+    closures: dict[frozenset[int], int] = {frozenset(): DEAD}
+    subsets: list[frozenset[int]] = [frozenset()]
+    transitions: list[list[int]] = [[DEAD] * len(boundaries)]
+    accepts = [NO_RULE]
+
+    def state_of(subset: frozenset[int]) -> int:
+        if (state := closures.get(subset)) is None:
+            state = closures[subset] = len(subsets)
+            subsets.append(subset)
+            transitions.append([DEAD] * len(boundaries))
+            rules = [nfa.accepts[nfa_state] for nfa_state in subset if nfa_state in nfa.accepts]
+            accepts.append(min(rules, default=NO_RULE))
+        return state
+
+    start = state_of(_closure(nfa, {nfa.start}))
+    state = start
+    while state < len(subsets):
+        targets_by_range: dict[int, set[int]] = {}
+        for nfa_state in subsets[state]:
+            for indexes, target in edges[nfa_state]:
+                for i in indexes:
+                    targets_by_range.setdefault(i, set()).add(target)
+        closures_by_targets: dict[frozenset[int], int] = {}
+        for i, targets in targets_by_range.items():
+            targets = frozenset(targets)
+            if (target_state := closures_by_targets.get(targets)) is None:
+                target_state = closures_by_targets[targets] = state_of(_closure(nfa, targets))
+            transitions[state][i] = target_state
+        state += 1
+
+    transitions, accepts, start = _minimize(transitions, accepts, start)
+    return _merge_ranges(transitions, accepts, start, boundaries)
+
+
+def _boundaries(nfa: NFA) -> list[int]:
+    """
+    :return: sorted first code points of elementary ranges
+    """
+    boundaries = {0}
+    for state_edges in nfa.edges:
+        for chars, _ in state_edges:
+            for low, high in chars:
+                boundaries.add(low)
+                if high < MAX_CODE_POINT:
+                    boundaries.add(high + 1)
+    return sorted(boundaries)
+
+
+def _range_indexes(chars: CharSet, boundaries: list[int]) -> list[int]:
+    indexes = []
+    for low, high in chars:
+        indexes.extend(range(bisect_left(boundaries, low), bisect_left(boundaries, high + 1)))
+    return indexes
+
+
+def _closure(nfa: NFA, states) -> frozenset[int]:
+    closure = set(states)
+    stack = list(states)
+    while stack:
+        for target in nfa.epsilons[stack.pop()]:
+            if target not in closure:
+                closure.add(target)
+                stack.append(target)
+    return frozenset(closure)
+
+
+def _minimize(transitions: list[list[int]], accepts: list[int], start: int) -> tuple[list[list[int]], list[int], int]:
+    """
+    Moore's partition refinement: states start grouped by accepted rule,
+    and groups are split by the groups of their next states until nothing changes.
+    The dead state stays state 0.
+    """
+    groups = _renumber([(accept, state == DEAD) for state, accept in enumerate(accepts)])
+    while True:
+        signatures = [
+            (groups[state],) + tuple(groups[target] for target in row)
+            for state, row in enumerate(transitions)
+        ]
+        refined = _renumber(signatures)
+        if max(refined) == max(groups):
+            break
+        groups = refined
+
+    group_count = max(groups) + 1
+    minimized: list[list[int]] = [[]] * group_count
+    minimized_accepts = [NO_RULE] * group_count
+    for state, group in enumerate(groups):
+        minimized[group] = [groups[target] for target in transitions[state]]
+        minimized_accepts[group] = accepts[state]
+    return minimized, minimized_accepts, groups[start]
+
+
+def _renumber(keys: list) -> list[int]:
+    """
+    :return: group numbers of keys in the order of first appearance, so the dead state 0 is in group 0
+    """
+    numbers = {}
+    return [numbers.setdefault(key, len(numbers)) for key in keys]
+
+
+def _merge_ranges(transitions: list[list[int]], accepts: list[int], start: int, boundaries: list[int]) -> DFA:
+    columns = [tuple(row[i] for row in transitions) for i in range(len(boundaries))]
+    class_by_column: dict[tuple[int, ...], int] = {}
+    classes = []
+    for boundary, column in zip(boundaries, columns):
+        char_class = class_by_column.setdefault(column, len(class_by_column))
+        if not classes or classes[-1][1] != char_class:
+            classes.append((boundary, char_class))
+
+    class_columns = list(class_by_column)
+    class_transitions = [[column[state] for column in class_columns] for state in range(len(transitions))]
+    return DFA(class_transitions, accepts, start, classes)
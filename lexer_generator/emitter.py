@@ -0,0 +1,233 @@
+from .dfa import DFA, NO_RULE, build_dfa
+from .regex import NFA
+from .spec import LexerSpec, LexerSpecException
+
+LINE_WIDTH = 120
+
+
+class LexerEmitter:
+    """
+    Emit Python source of a table-driven lexer class for a DFA of a spec.
+
+    The scanning loop only indexes a transition table by a state plus the class of an input character:
+    bytes inputs are scanned with bytes as classes, where states are multiplied by 256,
+    and str inputs are scanned in place with classes looked up by characters,
+    where states are multiplied by the number of classes.
+    Texts are sliced from the input only for returned tokens and errors.
+    The longest match wins, and the first rule wins among rules matching the longest input,
+    so keywords listed before a general name rule are recognized by the DFA itself.
+    bytes, bytearray and memoryview inputs are read as ASCII, where bytes from 0x80 only match negated sets,
+    as they do in bytes regexes.
+    """
+    def __init__(self, spec: LexerSpec, dfa: DFA, source_name: str):
+        self._spec = spec
+        self._dfa = dfa
+        self._source_name = source_name
+        self._token_type = spec.options.get('token_type', 'TokenType')
+        self._token_factory = spec.options.get('token_factory', 'Token')
+        self._exception = spec.options.get('exception', 'Exception')
+        self._lines: list[str] = []
+        self._indent = 0
+
+    def emit(self) -> str:
+        self._line(f'# Generated by lexer_generator from {self._source_name}. Do not edit.')
+        self._line('from bisect import bisect_right')
+        if self._spec.header:
+            self._line('')
+        for line in self._spec.header.splitlines():
+            self._line(line)
+        self._line('')
+        self._line('')
+        self._emit_tables()
+        self._line('')
+        self._line('')
+        self._emit_class_of()
+        self._line('')
+        self._line('')
+        self._emit_byte_tables()
+        self._line('')
+        self._line('')
+        self._line(f'class {self._spec.options.get("class", "Lexer")}:')
+        self._indent += 1
+        self._emit_init()
+        if self._spec.members:
+            self._line('')
+            for line in self._spec.members.splitlines():
+                self._line(line)
+        self._line('')
+        self._emit_text()
+        self._line('')
+        self._emit_next_token()
+        return '\n'.join(self._lines) + '\n'
+
+    def _emit_tables(self):
+        dfa = self._dfa
+        class_count = dfa.class_count
+        self._line(f'_CLASS_COUNT = {class_count}')
+        self._line('# character classes of code points from each boundary to the next one')
+        self._tuple('_BOUNDARIES', [boundary for boundary, _ in dfa.classes])
+        self._tuple('_BOUNDARY_CLASSES', [char_class for _, char_class in dfa.classes])
+        self._line('# next states of state and class at state + class, where states are multiplied by _CLASS_COUNT')
+        self._line('# and the dead state is 0')
+        self._tuple('_TRANSITIONS', [target * class_count for row in dfa.transitions for target in row])
+        self._line(f'_START = {dfa.start * class_count}')
+        self._line('# accepted rules of states, -1 for no rule')
+        self._tuple('_STATE_ACCEPTS', dfa.accepts)
+        self._line('_ACCEPTS = tuple(rule for rule in _STATE_ACCEPTS for _ in range(_CLASS_COUNT))')
+
+        rule_types = [
+            'None' if rule.action in ('skip', 'error') else f'{self._token_type}.{rule.name}'
+            for rule in self._spec.rules
+        ]
+        self._line('# token types of rules, None for dropped rules')
+        self._tuple('_RULE_TYPES', rule_types, str)
+        if (errors := self._rules_of('error')):
+            self._line(f'_ERROR_NAMES = {{{", ".join(f"{i}: {name!r}" for i, name in errors)}}}')
+        if (separators := self._rules_of('separator')):
+            self._line(f'_SEPARATOR_RULES = frozenset({{{", ".join(str(i) for i, _ in separators)}}})')
+
+    def _emit_class_of(self):
+        self._line('def _class_of(code_point: int) -> int:')
+        self._line('    return _BOUNDARY_CLASSES[bisect_right(_BOUNDARIES, code_point) - 1]')
+
+
+    def _emit_byte_tables(self):
+        self._line('# classes of ASCII characters of str inputs')
+        self._line('_STR_CLASSES = {chr(code_point): _class_of(code_point) for code_point in range(128)}')
+        self._line('# tables of bytes, where states are multiplied by 256')
+        self._line('# bytes from 0x80 are not latin-1 characters: like bytes regexes, only negated sets e.g. [^\\n] match them,')
+        self._line('# so they are in the class of the last code point, which is dead for rules without negated sets')
+        self._line('_BYTE_TRANSITIONS = tuple(')
+        self._line('    _TRANSITIONS[state + _class_of(byte if byte < 0x80 else 0x10FFFF)] // _CLASS_COUNT << 8')
+        self._line('    for state in range(0, len(_TRANSITIONS), _CLASS_COUNT) for byte in range(256)')
+        self._line(')')
+        self._line('_BYTE_ACCEPTS = tuple(rule for rule in _STATE_ACCEPTS for _ in range(256))')
+        self._line('_BYTE_START = _START // _CLASS_COUNT << 8')
+
+    def _emit_init(self):
+        self._line('def __init__(self, input_text):')
+        self._indent += 1
+        self._line('if isinstance(input_text, str):')
+        self._line('    self._input_text = input_text')
+        self._line('    classes = _STR_CLASSES')
+        self._line('    if not input_text.isascii():')
+        self._line('        classes = dict(classes)')
+        self._line('        classes.update((char, _class_of(ord(char))) for char in set(input_text).difference(classes))')
+        self._line('    self._tables = _TRANSITIONS, _ACCEPTS, _START, classes')
+        self._line('else:')
+        self._line('    if not isinstance(input_text, (bytes, bytearray)):')
+        self._line("        input_text = memoryview(input_text).cast('B')")
+        self._line('    self._input_text = None')
+        self._line('    self._tables = _BYTE_TRANSITIONS, _BYTE_ACCEPTS, _BYTE_START, None')
+        self._line('self._data = input_text')
+        self._line('self._p = 0')
+        self._indent -= 1
+
+    def _emit_text(self):
+        self._line('def _text(self, start: int, end: int) -> str:')
+        self._indent += 1
+        self._line('if self._input_text is None:')
+        self._line("    return str(self._data[start:end], 'latin-1')")
+        self._line('return self._input_text[start:end]')
+        self._indent -= 1
+
+    def _emit_next_token(self):
+        self._line('def next_token(self):')
+        self._indent += 1
+        self._line('transitions, accepts, start_state, classes = self._tables')
+        self._line('input_text = self._input_text')
+        self._line('data = self._data')
+        self._line('n = len(data)')
+        self._line('start = self._p')
+        self._line('while start < n:')
+        self._indent += 1
+        self._line('state = start_state')
+        self._line('rule = -1')
+        self._line('end = i = start')
+        # the loop is written per input type, so that bytes are not looked up as classes
+        self._line('if classes is None:')
+        self._emit_scan('data[i]')
+        self._line('else:')
+        self._emit_scan('classes[data[i]]')
+        self._line('if rule < 0:')
+        self._line(f"    raise {self._exception}(f'invalid character at {{start}}: {{self._text(start, start + 1)}}')")
+        self._line('')
+        self._line('token_type = _RULE_TYPES[rule]')
+        errors = self._rules_of('error')
+        if errors or self._rules_of('skip'):
+            self._line('if token_type is None:')
+            if errors:
+                self._line('    if rule in _ERROR_NAMES:')
+                self._line(f"        raise {self._exception}(f'{{_ERROR_NAMES[rule]}} at {{start}}: "
+                           f"{{self._text(start, end)!r}}')")
+            self._line('    start = end')
+            self._line('    continue')
+        if self._rules_of('separator'):
+            self._line('# separators are only between tokens')
+            self._line('if rule in _SEPARATOR_RULES and (self._p == 0 or end == n):')
+            self._line('    start = end')
+            self._line('    continue')
+        self._line('self._p = end')
+        self._line('if input_text is None:')
+        self._line(f"    return {self._token_factory}(token_type, str(data[start:end], 'latin-1'))")
+        self._line(f'return {self._token_factory}(token_type, input_text[start:end])')
+        self._indent -= 1
+        self._line('self._p = start')
+        self._line(f"return {self._token_factory}({self._token_type}.EOF, '')")
+        self._indent -= 1
+
+    def _emit_scan(self, char_class: str):
+        self._indent += 1
+        self._line('while i < n:')
+        self._line(f'    state = transitions[state + {char_class}]')
+        self._line('    if not state:')
+        self._line('        break')
+        self._line('    i += 1')
+        self._line('    if (accepted := accepts[state]) >= 0:')
+        self._line('        rule = accepted')
+        self._line('        end = i')
+        self._indent -= 1
+
+    def _rules_of(self, action: str) -> list[tuple[int, str]]:
+        return [(i, rule.name) for i, rule in enumerate(self._spec.rules) if rule.action == action]
+
+    def _tuple(self, name: str, values: list, format_value=repr):
+        items = [format_value(value) for value in values]
+        if len(name) + sum(len(item) + 2 for item in items) + 6 <= LINE_WIDTH:
+            self._line(f'{name} = ({", ".join(items)}{"," if len(items) == 1 else ""})')
+            return
+
+        self._line(f'{name} = (')
+        line = ''
+        for item in items:
+            if line and len(line) + len(item) + 6 > LINE_WIDTH:
+                self._line(f'    {line.rstrip()}')
+                line = ''
+            line += f'{item}, '
+        self._line(f'    {line.rstrip()}')
+        self._line(')')
+
+    def _line(self, text: str):
+        self._lines.append('    ' * self._indent + text if text else '')
+
+
+def build_lexer_dfa(spec: LexerSpec) -> DFA:
+    """
+    :return: DFA of all rules of spec, after checking every rule can be matched by non empty input
+    """
+    nfa = NFA()
+    for i, rule in enumerate(spec.rules):
+        nfa.add_rule(rule.regex, i)
+    dfa = build_dfa(nfa)
+
+    if dfa.accepts[dfa.start] != NO_RULE:
+        raise LexerSpecException(f'rule {spec.rules[dfa.accepts[dfa.start]].name} matches empty input')
+    accepted = set(dfa.accepts)
+    for i, rule in enumerate(spec.rules):
+        if i not in accepted:
+            raise LexerSpecException(f'rule {rule.name} is never matched, because former rules match its input')
+    return dfa
+
+
+def generate_lexer(spec: LexerSpec, source_name: str) -> str:
+    return LexerEmitter(spec, build_lexer_dfa(spec), source_name).emit()
@@ -0,0 +1,37 @@
+import argparse
+import os
+import sys
+from typing import Optional
+
+from .emitter import generate_lexer
+from .spec import LexerSpecException, parse_spec
+
+
+def generate_file(spec_path: str, output_path: Optional[str] = None) -> str:
+    """
+    :return: generated source, which is also written to output_path if given
+    """
+    with open(spec_path) as file:
+        spec = parse_spec(file.read())
+    source = generate_lexer(spec, os.path.basename(spec_path))
+    if output_path is not None:
+        with open(output_path, 'w') as file:
+            file.write(source)
+    return source
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(prog='lexer_generator', description='generate a DFA lexer from a token spec file')
+    arg_parser.add_argument('path', metavar='SPEC')
+    arg_parser.add_argument('-o', '--output', help='generated Python module (default: stdout)')
+    args = arg_parser.parse_args(argv)
+
+    try:
+        source = generate_file(args.path, args.output)
+    except (OSError, LexerSpecException) as e:
+        print(f'{args.path}: {e}', file=sys.stderr)
+        return 1
+
+    if args.output is None:
+        sys.stdout.write(source)
+    return 0
@@ -0,0 +1,282 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Union
+
+
+MAX_CODE_POINT = 0x10FFFF
+
+# sorted, disjoint and not adjacent inclusive intervals of code points
+CharSet = tuple[tuple[int, int], ...]
+
+
+class RegexException(Exception):
+    pass
+
+
+def char_set(intervals) -> CharSet:
+    merged = []
+    for low, high in sorted(intervals):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return tuple((low, high) for low, high in merged)
+
+
+def negate(chars: CharSet) -> CharSet:
+    intervals = []
+    low = 0
+    for start, end in chars:
+        if start > low:
+            intervals.append((low, start - 1))
+        low = end + 1
+    if low <= MAX_CODE_POINT:
+        intervals.append((low, MAX_CODE_POINT))
+    return tuple(intervals)
+
+
+@lru_cache
+def escape_set(letter: str) -> CharSet:
+    """
+    \\d, \\s and \\w with the same unicode meaning as in re patterns of str
+    """
+    predicate = {
+        'd': str.isdecimal,
+        's': str.isspace,
+        'w': lambda char: char.isalnum() or char == '_',
+    }[letter]
+    return char_set((code_point, code_point) for code_point in range(MAX_CODE_POINT + 1) if predicate(chr(code_point)))
+
+
+_ESCAPE_CHARS = {'n': '\n', 'r': '\r', 't': '\t', 'f': '\f', 'v': '\v', '0': '\0'}
+
+
+@dataclass
+class Chars:
+    chars: CharSet
+
+
+@dataclass
+class Sequence:
+    items: list['Node']
+
+
+@dataclass
+class Alternation:
+    items: list['Node']
+
+
+@dataclass
+class Repeat:
+    item: 'Node'
+    min: int
+    max: Optional[int]  # None for no limit
+
+
+Node = Union[Chars, Sequence, Alternation, Repeat]
+
+
+class RegexParser:
+    """
+    alternation: sequence ('|' sequence)*
+    sequence: (atom ('*' | '+' | '?')?)*
+    atom: STRING | '[' '^'? (char ('-' char)? | class_escape)+ ']' | '(' alternation ')' | '.' | escape
+
+    Strings are quoted with ' and matched literally; whitespaces between atoms are ignored.
+    Escapes are \\d, \\s, \\w, \\D, \\S, \\W, \\n, \\r, \\t, \\f, \\v, \\0 and \\ followed by any other character for itself.
+    '.' is any character except newline characters \\r and \\n.
+    Parsing stops at ';' or '->' out of atoms, so that a rule can be followed by its options.
+    """
+    def __init__(self, source: str, pos: int = 0):
+        self._source = source
+        self._p = pos
+
+    @property
+    def pos(self) -> int:
+        return self._p
+
+    def parse(self) -> Node:
+        node = self._alternation()
+        self._skip_whitespaces()
+        return node
+
+    def _alternation(self) -> Node:
+        items = [self._sequence()]
+        while self._skip_whitespaces() == '|':
+            self._p += 1
+            items.append(self._sequence())
+        return items[0] if len(items) == 1 else Alternation(items)
+
+    def _sequence(self) -> Node:
+        items = []
+        while self._skip_whitespaces() not in ('', '|', ')', ';') and not self._source.startswith('->', self._p):
+            item = self._atom()
+            if (quantifier := self._current()) in ('*', '+', '?'):
+                self._p += 1
+                item = Repeat(item, 1 if quantifier == '+' else 0, 1 if quantifier == '?' else None)
+            items.append(item)
+        if not items:
+            raise RegexException(f'empty alternative at {self._p}')
+        return items[0] if len(items) == 1 else Sequence(items)
+
+    def _atom(self) -> Node:
+        char = self._current()
+        if char == "'":
+            return self._string()
+        elif char == '[':
+            return self._set()
+        elif char == '(':
+            self._p += 1
+            node = self._alternation()
+            if self._skip_whitespaces() != ')':
+                raise RegexException(f'expecting ) at {self._p}')
+            self._p += 1
+            return node
+        elif char == '.':
+            self._p += 1
+            return Chars(negate(char_set([(ord('\n'), ord('\n')), (ord('\r'), ord('\r'))])))
+        elif char == '\\':
+            return Chars(self._escape())
+        raise RegexException(f'unexpected {char!r} at {self._p}')
+
+    def _string(self) -> Node:
+        self._p += 1
+        items = []
+        while (char := self._current()) != "'":
+            if char == '':
+                raise RegexException('unterminated string')
+            elif char == '\\':
+                items.append(Chars(self._escape(False)))
+            else:
+                items.append(Chars(((ord(char), ord(char)),)))
+                self._p += 1
+        self._p += 1
+        if not items:
+            raise RegexException(f'empty string at {self._p}')
+        return items[0] if len(items) == 1 else Sequence(items)
+
+    def _set(self) -> Node:
+        self._p += 1
+        negated = self._current() == '^'
+        if negated:
+            self._p += 1
+
+        intervals = []
+        while (char := self._current()) != ']':
+            if char == '':
+                raise RegexException('unterminated set')
+            if char == '\\':
+                chars = self._escape()
+            else:
+                self._p += 1
+                chars = ((ord(char), ord(char)),)
+
+            if self._current() == '-' and self._source[self._p + 1:self._p + 2] not in ('', ']'):
+                self._p += 1
+                high = self._escape(False) if self._current() == '\\' else self._consume_char()
+                if len(chars) != 1 or chars[0][0] != chars[0][1] or len(high) != 1 or high[0][0] != high[0][1]:
+                    raise RegexException(f'invalid range at {self._p}')
+                if high[0][0] < chars[0][0]:
+                    raise RegexException(f'reversed range at {self._p}')
+                chars = ((chars[0][0], high[0][0]),)
+            intervals.extend(chars)
+        self._p += 1
+
+        chars = char_set(intervals)
+        return Chars(negate(chars) if negated else chars)
+
+    def _escape(self, allow_classes: bool = True) -> CharSet:
+        letter = self._source[self._p + 1:self._p + 2]
+        if letter == '':
+            raise RegexException('unterminated escape')
+        self._p += 2
+        if allow_classes and letter in 'dsw':
+            return escape_set(letter)
+        elif allow_classes and letter in 'DSW':
+            return negate(escape_set(letter.lower()))
+        char = _ESCAPE_CHARS.get(letter, letter)
+        return (ord(char), ord(char)),
+
+    def _consume_char(self) -> CharSet:
+        char = self._current()
+        self._p += 1
+        return (ord(char), ord(char)),
+
+    def _current(self) -> str:
+        return self._source[self._p:self._p + 1]
+
+    def _skip_whitespaces(self) -> str:
+        while (char := self._current()) and char.isspace():
+            self._p += 1
+        return self._current()
+
+
+class NFA:
+    """
+    Thompson NFA: states are indexes, with epsilon transitions and character set transitions.
+    accepts maps accepting states to the index of the rule they accept.
+    """
+    def __init__(self):
+        self.epsilons: list[list[int]] = []
+        self.edges: list[list[tuple[CharSet, int]]] = []
+        self.accepts: dict[int, int] = {}
+        self.start = self.new_state()
+
+    def new_state(self) -> int:
+        self.epsilons.append([])
+        self.edges.append([])
+        return len(self.epsilons) - 1
+
+    def add_rule(self, node: Node, rule: int):
+        start, end = self._build(node)
+        self.epsilons[self.start].append(start)
+        self.accepts[end] = rule
+
+    def _build(self, node: Node) -> tuple[int, int]:
+        """
+        :return: start and end states of a fragment for node
+        """
+        if isinstance(node, Chars):
+            start, end = self.new_state(), self.new_state()
+            self.edges[start].append((node.chars, end))
+            return start, end
+        elif isinstance(node, Sequence):
+            start, end = self._build(node.items[0])
+            for item in node.items[1:]:
+                item_start, item_end = self._build(item)
+                self.epsilons[end].append(item_start)
+                end = item_end
+            return start, end
+        elif isinstance(node, Alternation):
+            start, end = self.new_state(), self.new_state()
+            for item in node.items:
+                item_start, item_end = self._build(item)
+                self.epsilons[start].append(item_start)
+                self.epsilons[item_end].append(end)
+            return start, end
+
+        start = end = self.new_state()
+        for _ in range(node.min):
+            item_start, item_end = self._build(node.item)
+            self.epsilons[end].append(item_start)
+            end = item_end
+        if node.max is None:
+            item_start, item_end = self._build(node.item)
+            self.epsilons[end].append(item_start)
+            self.epsilons[item_end].append(end)
+        else:
+            for _ in range(node.max - node.min):
+                optional_end = self.new_state()
+                item_start, item_end = self._build(node.item)
+                self.epsilons[end].extend((item_start, optional_end))
+                self.epsilons[item_end].append(optional_end)
+                end = optional_end
+        return start, end
+
+
+def parse_regex(source: str) -> Node:
+    parser = RegexParser(source)
+    node = parser.parse()
+    if parser.pos != len(source):
+        raise RegexException(f'unexpected {source[parser.pos]!r} at {parser.pos}')
+    return node
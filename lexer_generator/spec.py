@@ -0,0 +1,135 @@
+import re
+import textwrap
+from dataclasses import dataclass, field
+
+from parser_generator.grammar import GrammarException, code_end
+
+from .regex import Node, RegexException, RegexParser
+
+
+class LexerSpecException(Exception):
+    pass
+
+
+# a token rule without action is a token of its name
+ACTIONS = (
+    'skip',  # matched input is dropped
+    'error',  # matched input raises the exception
+    'separator',  # a token between tokens, dropped at the start and the end of input
+)
+
+
+@dataclass
+class TokenRule:
+    name: str
+    regex: Node
+    action: str = ''
+
+
+@dataclass
+class LexerSpec:
+    """
+    options: class, token_type, token_factory and exception
+    Rules are in order of priority: when several rules match the longest input, the first one wins.
+    """
+    rules: list[TokenRule]
+    options: dict[str, str] = field(default_factory=dict)
+    header: str = ''
+    members: str = ''
+
+
+OPTIONS = ('class', 'token_type', 'token_factory', 'exception')
+CODE_OPTIONS = ('header', 'members')
+
+_SKIP_PATTERN = re.compile(r'(?:\s|//[^\n]*)*')
+_DIRECTIVE_PATTERN = re.compile(r'@([a-z_]+)[ \t]*')
+_NAME_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_COLON_PATTERN = re.compile(r'\s*:')
+_ACTION_PATTERN = re.compile(r'->\s*([a-z]+)\s*')
+
+
+class LexerSpecParser:
+    """
+    spec: directive* rule*
+    directive: '@' NAME (NAME | code)
+    rule: NAME ':' regex ('->' ACTION)? ';'
+
+    regex is parsed by RegexParser. Token names start with an upper case letter.
+    """
+    def __init__(self, source: str):
+        self._source = source
+        self._p = 0
+
+    def parse(self) -> LexerSpec:
+        spec = LexerSpec([])
+        self._skip()
+        while self._source.startswith('@', self._p):
+            self._directive(spec)
+            self._skip()
+
+        names = set()
+        while self._p < len(self._source):
+            rule = self._rule()
+            if rule.name in names:
+                raise LexerSpecException(f'line {self._line()}: rule {rule.name} is defined twice')
+            names.add(rule.name)
+            spec.rules.append(rule)
+            self._skip()
+
+        if not spec.rules:
+            raise LexerSpecException('spec has no rules')
+        return spec
+
+    def _directive(self, spec: LexerSpec):
+        match = _DIRECTIVE_PATTERN.match(self._source, self._p)
+        name = match.group(1) if match is not None else ''
+        if name in CODE_OPTIONS and self._source.startswith('{', match.end()):
+            try:
+                end = code_end(self._source, match.end(), self._line())
+            except GrammarException as e:
+                raise LexerSpecException(str(e))
+            setattr(spec, name, textwrap.dedent(self._source[match.end() + 1:end - 1]).strip('\n'))
+            self._p = end
+        elif name in OPTIONS:
+            if (value := _NAME_PATTERN.match(self._source, match.end())) is None:
+                raise LexerSpecException(f'line {self._line()}: expecting value of @{name}')
+            spec.options[name] = value.group()
+            self._p = value.end()
+        else:
+            raise LexerSpecException(f'line {self._line()}: unknown directive @{name}')
+
+    def _rule(self) -> TokenRule:
+        if (name := _NAME_PATTERN.match(self._source, self._p)) is None:
+            raise LexerSpecException(f'line {self._line()}: expecting rule name; found {self._source[self._p]!r}')
+        if not name.group()[0].isupper():
+            raise LexerSpecException(f'line {self._line()}: rule name {name.group()} should start with an upper case letter')
+        if (colon := _COLON_PATTERN.match(self._source, name.end())) is None:
+            raise LexerSpecException(f'line {self._line()}: expecting : after {name.group()}')
+
+        regex_parser = RegexParser(self._source, colon.end())
+        try:
+            regex = regex_parser.parse()
+        except RegexException as e:
+            raise LexerSpecException(f'line {self._line()}: rule {name.group()}: {e}')
+        self._p = regex_parser.pos
+
+        action = ''
+        if (match := _ACTION_PATTERN.match(self._source, self._p)) is not None:
+            action = match.group(1)
+            if action not in ACTIONS:
+                raise LexerSpecException(f'line {self._line()}: unknown action {action} of {name.group()}')
+            self._p = match.end()
+        if not self._source.startswith(';', self._p):
+            raise LexerSpecException(f'line {self._line()}: expecting ; after rule {name.group()}')
+        self._p += 1
+        return TokenRule(name.group(), regex, action)
+
+    def _skip(self):
+        self._p = _SKIP_PATTERN.match(self._source, self._p).end()
+
+    def _line(self) -> int:
+        return self._source.count('\n', 0, self._p) + 1
+
+
+def parse_spec(source: str) -> LexerSpec:
+    return LexerSpecParser(source).parse()
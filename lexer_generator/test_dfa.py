@@ -0,0 +1,43 @@
+import pytest
+
+from .dfa import NO_RULE, build_dfa
+from .regex import NFA, parse_regex
+
+
+def _dfa(*sources: str):
+    nfa = NFA()
+    for i, source in enumerate(sources):
+        nfa.add_rule(parse_regex(source), i)
+    return build_dfa(nfa)
+
+
+class TestDFA:
+    @pytest.mark.parametrize('sources, text, expected', [
+        (["'if'", "[a-z]+"], 'if', (0, 2)),
+        (["'if'", "[a-z]+"], 'ifs', (1, 3)),
+        (["'if'", "[a-z]+"], 'i', (1, 1)),
+        (["[a-z]+", "'if'"], 'if', (0, 2)),
+        # longest match remembers the last accepting state
+        (["'a'", "'abc'"], 'abd', (0, 1)),
+        (["'a'+ 'b'"], 'aaa', (NO_RULE, 0)),
+        (["\\d+"], '١٢x', (0, 2)),
+        (["'a'? 'b'"], 'b', (0, 1)),
+    ])
+    def test_match(self, sources, text, expected):
+        assert _dfa(*sources).match(text) == expected
+
+    def test_minimized(self):
+        # a|b|c and one state after it, besides the dead state and the start state
+        dfa = _dfa("'a' | 'b' | 'c'")
+        assert len(dfa.transitions) == 3
+
+        # keywords sharing prefixes share states
+        assert len(_dfa("'ab' | 'cb'").transitions) == 4
+
+    def test_classes(self):
+        dfa = _dfa("[a-z]+", "[0-9]")
+        # letters, digits and everything else
+        assert dfa.class_count == 3
+        assert dfa.class_of(ord('a')) == dfa.class_of(ord('z'))
+        assert dfa.class_of(ord('0')) != dfa.class_of(ord('a'))
+        assert dfa.class_of(0) == dfa.class_of(0x10FFFF)
@@ -0,0 +1,99 @@
+import pytest
+
+from core.lexer import Token, TokenType
+from .emitter import generate_lexer
+from .spec import LexerSpecException, parse_spec
+
+
+LIST_SPEC = '''
+@class ListLexer
+@exception ValueError
+@header {
+    from core.lexer import Token, TokenType
+}
+
+LBRACK: '[' ;
+RBRACK: ']' ;
+EQUAL: 'eq' ;
+VAR: [a-z]+ ;
+// a run of commas separates tokens
+COMMA: ','+ -> separator ;
+WHITESPACE: \\s+ -> skip ;
+NUMBER_ERROR: \\d+ -> error ;
+'''
+
+
+def _lexer_class(source: str):
+    namespace = {}
+    exec(compile(generate_lexer(parse_spec(source), 'test.lexer'), 'generated', 'exec'), namespace)
+    return namespace[parse_spec(source).options['class']]
+
+
+def _tokens(lexer) -> list[Token]:
+    results = []
+    while (token := lexer.next_token()).type != TokenType.EOF:
+        results.append(token)
+    return results
+
+
+class TestLexerEmitter:
+    @pytest.mark.parametrize('input_text, expected', [
+        ('[a b]', [Token(TokenType.LBRACK, '['), Token(TokenType.VAR, 'a'), Token(TokenType.VAR, 'b'),
+                   Token(TokenType.RBRACK, ']')]),
+        # keyword and longest match
+        ('eq eqs', [Token(TokenType.EQUAL, 'eq'), Token(TokenType.VAR, 'eqs')]),
+        # separators are dropped at the start and the end
+        (',a,, ,b,', [Token(TokenType.VAR, 'a'), Token(TokenType.COMMA, ',,'), Token(TokenType.COMMA, ','),
+                      Token(TokenType.VAR, 'b')]),
+        ('  　', []),
+        # \xa0 and \x85 are whitespaces of str
+        ('a\xa0b\x85', [Token(TokenType.VAR, 'a'), Token(TokenType.VAR, 'b')]),
+    ])
+    def test_next_token(self, input_text, expected):
+        assert _tokens(_lexer_class(LIST_SPEC)(input_text)) == expected
+
+    @pytest.mark.parametrize('input_text', ['[a, b]', '[a, \u00e9]'])
+    def test_str_is_scanned_in_place(self, input_text):
+        lexer = _lexer_class(LIST_SPEC)(input_text)
+        assert lexer._data is input_text
+
+    @pytest.mark.parametrize('input_type', [bytes, bytearray, memoryview])
+    def test_next_token_bytes(self, input_type):
+        tokens = _tokens(_lexer_class(LIST_SPEC)(input_type(b'[ab\t,c]')))
+        assert tokens == [Token(TokenType.LBRACK, '['), Token(TokenType.VAR, 'ab'), Token(TokenType.COMMA, ','),
+                          Token(TokenType.VAR, 'c'), Token(TokenType.RBRACK, ']')]
+
+    @pytest.mark.parametrize('input_text, message', [
+        ('[a 12]', "NUMBER_ERROR at 3: '12'"),
+        ('[a é]', 'invalid character at 3: é'),
+        ('[A]', 'invalid character at 1: A'),
+    ])
+    def test_next_token_fail(self, input_text, message):
+        lexer = _lexer_class(LIST_SPEC)(input_text)
+        with pytest.raises(ValueError, match=message):
+            _tokens(lexer)
+
+    @pytest.mark.parametrize('input_type', [bytes, bytearray, memoryview])
+    @pytest.mark.parametrize('input_bytes, message', [
+        (b'[a 12]', "NUMBER_ERROR at 3: '12'"),
+        (b'[a \xe9]', 'invalid character at 3: \xe9'),
+        # bytes are not read as latin-1, whose \xa0 and \x85 are whitespaces
+        (b'[a\xa0b]', 'invalid character at 2: \xa0'),
+        (b'[a\x85b]', 'invalid character at 2: \x85'),
+    ])
+    def test_next_token_bytes_fail(self, input_type, input_bytes, message):
+        lexer = _lexer_class(LIST_SPEC)(input_type(input_bytes))
+        with pytest.raises(ValueError, match=message):
+            _tokens(lexer)
+
+    def test_eof_is_repeated(self):
+        lexer = _lexer_class(LIST_SPEC)('a ')
+        assert [lexer.next_token().type for _ in range(3)] == [TokenType.VAR, TokenType.EOF, TokenType.EOF]
+
+    @pytest.mark.parametrize('source, message', [
+        ("A: 'a'* ;", 'rule A matches empty input'),
+        ("A: [a-z]+ ;\nB: 'if' ;", 'rule B is never matched'),
+    ])
+    def test_generate_fail(self, source, message):
+        with pytest.raises(LexerSpecException, match=message):
+            generate_lexer(parse_spec(source), 'test.lexer')
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from .generator import generate_file, main
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestGenerator:
+    @pytest.mark.parametrize('spec_path, generated_path', [
+        ('core/list.lexer', 'core/generated_lexer.py'),
+        ('hack_assembly/hack.lexer', 'hack_assembly/generated_lexer.py'),
+    ])
+    def test_generated_lexer_is_up_to_date(self, spec_path, generated_path):
+        with open(os.path.join(ROOT, generated_path)) as file:
+            assert generate_file(os.path.join(ROOT, spec_path)) == file.read()
+
+    def test_main(self, tmp_path, capsys):
+        spec_path = tmp_path / 'a.lexer'
+        spec_path.write_text("A: 'a' ;")
+        output_path = tmp_path / 'a.py'
+
+        assert main([str(spec_path), '-o', str(output_path)]) == 0
+        assert output_path.read_text().startswith('# Generated by lexer_generator from a.lexer.')
+        assert main([str(spec_path)]) == 0
+        assert capsys.readouterr().out == output_path.read_text()
+
+    def test_main_fail(self, tmp_path, capsys):
+        spec_path = tmp_path / 'a.lexer'
+        spec_path.write_text("A: 'a'* ;")
+        assert main([str(spec_path)]) == 1
+        assert 'matches empty input' in capsys.readouterr().err
+        assert main([str(tmp_path / 'missing.lexer')]) == 1
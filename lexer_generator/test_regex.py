@@ -0,0 +1,55 @@
+import pytest
+
+from .regex import MAX_CODE_POINT, Alternation, Chars, Repeat, RegexException, Sequence
+from .regex import char_set, escape_set, negate, parse_regex
+
+
+def _chars(text: str) -> Chars:
+    return Chars(char_set((ord(char), ord(char)) for char in text))
+
+
+class TestCharSet:
+    @pytest.mark.parametrize('intervals, expected', [
+        ([(3, 5), (1, 2)], ((1, 5),)),
+        ([(1, 2), (4, 5)], ((1, 2), (4, 5))),
+        ([(1, 5), (2, 3)], ((1, 5),)),
+        ([], ()),
+    ])
+    def test_char_set(self, intervals, expected):
+        assert char_set(intervals) == expected
+
+    @pytest.mark.parametrize('chars, expected', [
+        (((1, 5),), ((0, 0), (6, MAX_CODE_POINT))),
+        (((0, 5),), ((6, MAX_CODE_POINT),)),
+        ((), ((0, MAX_CODE_POINT),)),
+    ])
+    def test_negate(self, chars, expected):
+        assert negate(chars) == expected
+        assert negate(negate(chars)) == chars
+
+    def test_escape_set(self):
+        digits = escape_set('d')
+        assert (ord('0'), ord('9')) in digits
+        # unicode digits as in re
+        assert any(low <= ord('٠') <= high for low, high in digits)
+
+
+class TestRegexParser:
+    @pytest.mark.parametrize('source, expected', [
+        ("'a'", _chars('a')),
+        ("'ab'", Sequence([_chars('a'), _chars('b')])),
+        ("'a' | 'b'", Alternation([_chars('a'), _chars('b')])),
+        ("[a-c]+", Repeat(_chars('abc'), 1, None)),
+        ("[^\\r\\n]*", Repeat(Chars(negate(char_set([(10, 10), (13, 13)]))), 0, None)),
+        ("('a' 'b')?", Repeat(Sequence([_chars('a'), _chars('b')]), 0, 1)),
+        ("[-a]", _chars('-a')),
+        ("'\\''", _chars("'")),
+        ("\\@", _chars('@')),
+    ])
+    def test_parse(self, source, expected):
+        assert parse_regex(source) == expected
+
+    @pytest.mark.parametrize('source', ["''", "'a", "[a", "('a'", "[c-a]", "'a' |", "*"])
+    def test_parse_fail(self, source):
+        with pytest.raises(RegexException):
+            parse_regex(source)
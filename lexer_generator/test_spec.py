@@ -0,0 +1,39 @@
+import pytest
+
+from .regex import Chars
+from .spec import LexerSpecException, TokenRule, parse_spec
+
+
+class TestLexerSpecParser:
+    def test_parse(self):
+        spec = parse_spec('''
+            // comment
+            @class MyLexer
+            @token_factory make_token
+            @header {
+                from tokens import TokenType, make_token
+            }
+
+            SEMICOLON: ';' ;
+            WHITESPACE: [ \\t]+ -> skip ;
+        ''')
+
+        assert spec.options == {'class': 'MyLexer', 'token_factory': 'make_token'}
+        assert spec.header == 'from tokens import TokenType, make_token'
+        assert [(rule.name, rule.action) for rule in spec.rules] == [('SEMICOLON', ''), ('WHITESPACE', 'skip')]
+        assert spec.rules[0] == TokenRule('SEMICOLON', Chars(((ord(';'), ord(';')),)))
+
+    @pytest.mark.parametrize('source, message', [
+        ('', 'no rules'),
+        ('@foo bar\nA: \'a\' ;', 'unknown directive @foo'),
+        ('a: \'a\' ;', 'upper case'),
+        ('A \'a\' ;', 'expecting :'),
+        ('A: \'a\'', 'expecting ;'),
+        ('A: \'a\' -> ignore ;', 'unknown action ignore'),
+        ('A: \'a\' ;\nA: \'b\' ;', 'line 2: rule A is defined twice'),
+        ('A: [a ;', 'rule A: unterminated set'),
+        ('@header { "}', 'unterminated string'),
+    ])
+    def test_parse_fail(self, source, message):
+        with pytest.raises(LexerSpecException, match=message):
+            parse_spec(source)
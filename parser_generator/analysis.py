@@ -0,0 +1,215 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from .grammar import Action, Block, Element, Grammar, GrammarException, NonTerminal, Terminal
+
+# (token type name, token text or None for any text)
+Symbol = tuple[str, Optional[str]]
+# up to k symbols; shorter when the input may end, i.e. no more symbols are known
+Lookahead = tuple[Symbol, ...]
+
+DEFAULT_K = 2
+
+
+@dataclass
+class Decision:
+    """
+    Lookahead sets of a block: one per alternative, and exit_set for '?', '*' and '+' blocks.
+    k is the smallest lookahead depth where the sets do not overlap, and the sets are truncated to k.
+    """
+    rule: str
+    alternative_sets: list[set[Lookahead]]
+    exit_set: Optional[set[Lookahead]]
+    k: int
+
+
+def concat(prefixes: set[Lookahead], suffixes: set[Lookahead], k: int) -> set[Lookahead]:
+    """
+    :return: k truncated concatenations of all prefixes and suffixes
+    """
+    result = set()
+    for prefix in prefixes:
+        if len(prefix) >= k:
+            result.add(prefix)
+        else:
+            for suffix in suffixes:
+                result.add((prefix + suffix)[:k])
+    return result
+
+
+def symbols_overlap(a: Symbol, b: Symbol) -> bool:
+    return a[0] == b[0] and (a[1] is None or b[1] is None or a[1] == b[1])
+
+
+def lookaheads_overlap(a: Lookahead, b: Lookahead) -> bool:
+    """
+    Lookaheads overlap when they can match the same input, so a shorter lookahead overlaps its continuations.
+    """
+    return all(symbols_overlap(x, y) for x, y in zip(a, b))
+
+
+class LLAnalyzer:
+    """
+    Strong LL(k) analysis: FIRST_k and FOLLOW_k sets of rules by fixed point iteration,
+    then lookahead sets of every decision i.e. a block with several alternatives or a '?', '*' or '+' suffix.
+    A decision is given the smallest k, up to the maximum k, where its lookahead sets are disjoint.
+    Rules not referred by other rules are entry rules, and may be followed by any input.
+    A left recursive rule is reported as a conflict of its alternatives.
+    """
+    def __init__(self, grammar: Grammar, k: Optional[int] = None):
+        self._grammar = grammar
+        self._k = k if k is not None else int(grammar.options.get('k', DEFAULT_K))
+        if self._k < 1:
+            raise GrammarException('k should be larger than 0')
+        self.first: dict[str, set[Lookahead]] = {name: set() for name in grammar.rules}
+        self.follow: dict[str, set[Lookahead]] = {name: set() for name in grammar.rules}
+        self.decisions: dict[Block, Decision] = {}
+
+    def analyze(self) -> dict[Block, Decision]:
+        self._compute_first()
+        self._compute_follow()
+        for name, rule in self._grammar.rules.items():
+            self._walk_block(name, rule.block, self.follow[name], True)
+        return self.decisions
+
+    def first_of_elements(self, elements: list[Element]) -> set[Lookahead]:
+        result = {()}
+        for element in elements:
+            if all(len(lookahead) >= self._k for lookahead in result):
+                break
+            result = concat(result, self.first_of(element), self._k)
+        return result
+
+    def first_of(self, element: Element) -> set[Lookahead]:
+        if isinstance(element, Terminal):
+            return {((element.name, element.text),)}
+        elif isinstance(element, NonTerminal):
+            return self.first[element.name]
+        elif isinstance(element, Action):
+            return {()}
+
+        first = set()
+        for alternative in element.alternatives:
+            first |= self.first_of_elements(alternative.elements)
+        if element.suffix == '?':
+            first.add(())
+        elif element.suffix == '*':
+            first = self._closure(first)
+        elif element.suffix == '+':
+            first = concat(first, self._closure(first), self._k)
+        return first
+
+    def _closure(self, first: set[Lookahead]) -> set[Lookahead]:
+        result = {()}
+        while (expanded := {()} | concat(first, result, self._k)) != result:
+            result = expanded
+        return result
+
+    def _compute_first(self):
+        changed = True
+        while changed:
+            changed = False
+            for name, rule in self._grammar.rules.items():
+                if (first := self.first_of(rule.block)) != self.first[name]:
+                    self.first[name] = first
+                    changed = True
+
+        for name, first in self.first.items():
+            if not first:
+                raise GrammarException(f'rule {name} never ends')
+
+    def _compute_follow(self):
+        referred_by_others = set()
+        for name, rule in self._grammar.rules.items():
+            referred = set()
+            self._collect_references(rule.block, referred)
+            referred.discard(name)
+            referred_by_others |= referred
+        for name in self._grammar.rules:
+            if name not in referred_by_others:
+                self.follow[name] = {()}
+
+        changed = True
+        while changed:
+            changed = False
+            for name, rule in self._grammar.rules.items():
+                changed |= self._walk_block(name, rule.block, self.follow[name], False)
+
+    def _collect_references(self, block: Block, referred: set[str]):
+        for alternative in block.alternatives:
+            for element in alternative.elements:
+                if isinstance(element, NonTerminal):
+                    referred.add(element.name)
+                elif isinstance(element, Block):
+                    self._collect_references(element, referred)
+
+    def _walk_block(self, rule: str, block: Block, follow: set[Lookahead], decide: bool) -> bool:
+        """
+        Propagate follow, the lookahead after the block, to rules referred in the block,
+        and make the decision of the block when decide is True.
+        :return: True if any FOLLOW set is changed
+        """
+        if block.suffix in ('*', '+'):
+            # an iteration may be followed by more iterations
+            after_alternative = concat(self._closure(self.first_of(Block(block.alternatives))), follow, self._k)
+        else:
+            after_alternative = follow
+
+        changed = False
+        for alternative in block.alternatives:
+            changed |= self._walk_elements(rule, alternative.elements, after_alternative, decide)
+
+        if decide and (len(block.alternatives) > 1 or block.suffix):
+            alternative_sets = [
+                concat(self.first_of_elements(alternative.elements), after_alternative, self._k)
+                for alternative in block.alternatives
+            ]
+            exit_set = follow if block.suffix else None
+            self.decisions[block] = self._decide(rule, alternative_sets, exit_set)
+        return changed
+
+    def _walk_elements(self, rule: str, elements: list[Element], follow: set[Lookahead], decide: bool) -> bool:
+        changed = False
+        for element in reversed(elements):
+            if isinstance(element, NonTerminal):
+                if not follow <= self.follow[element.name]:
+                    self.follow[element.name] |= follow
+                    changed = True
+            elif isinstance(element, Block):
+                changed |= self._walk_block(rule, element, follow, decide)
+            follow = concat(self.first_of(element), follow, self._k)
+        return changed
+
+    def _decide(self, rule: str, alternative_sets: list[set[Lookahead]],
+                exit_set: Optional[set[Lookahead]]) -> Decision:
+        sets = alternative_sets + ([exit_set] if exit_set is not None else [])
+        conflict = None
+        for k in range(1, self._k + 1):
+            truncated = [{lookahead[:k] for lookahead in lookaheads} for lookaheads in sets]
+            if (conflict := self._find_conflict(truncated)) is None:
+                return Decision(
+                    rule,
+                    truncated[:len(alternative_sets)],
+                    truncated[-1] if exit_set is not None else None,
+                    k,
+                )
+
+        i, j, lookahead = conflict
+        alternatives = f'alternatives {i + 1} and {j + 1}' if j < len(alternative_sets) else f'alternative {i + 1} and exit'
+        raise GrammarException(f'rule {rule}: {alternatives} are not LL({self._k}), both may start with {_format(lookahead)}')
+
+    @staticmethod
+    def _find_conflict(sets: list[set[Lookahead]]) -> Optional[tuple[int, int, Lookahead]]:
+        for i in range(len(sets)):
+            for j in range(i + 1, len(sets)):
+                for a in sets[i]:
+                    for b in sets[j]:
+                        if lookaheads_overlap(a, b):
+                            return i, j, a
+        return None
+
+
+def _format(lookahead: Lookahead) -> str:
+    if not lookahead:
+        return 'end of input'
+    return ' '.join(name if text is None else f'{name}={text!r}' for name, text in lookahead)
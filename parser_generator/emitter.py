@@ -0,0 +1,384 @@
+import re
+from collections import defaultdict
+from typing import Optional
+
+from .analysis import Decision, LLAnalyzer, Lookahead, Symbol, lookaheads_overlap
+from .grammar import Action, Alternative, Block, Element, Grammar, GrammarException, NonTerminal, Rule, Terminal
+
+# token type tests with more names than this use a frozenset
+MAX_INLINE_TYPE_TESTS = 3
+_MISMATCH_MEMBER = re.compile(r'^def _mismatch\(', re.MULTILINE)
+
+
+class ParserEmitter:
+    """
+    Emit Python source of a recursive descent parser class for an analyzed grammar.
+
+    Every rule becomes a method named after the rule with a leading underscore.
+    Lookahead tokens are kept in attributes _t0 ~ _t(k-1), where k is the largest k of decisions,
+    so matching and consuming a token is inlined as attribute reads, identity tests of token types
+    and attribute shifts, instead of method calls.
+    Alternatives are tested in order by the shortest prefixes of their lookaheads that tell them from later ones,
+    and the last alternative of a block without suffix is not tested, and fails in its first match.
+    Mismatches are raised by _mismatch(expected), which members of the grammar may define to word the message.
+    """
+    def __init__(self, grammar: Grammar, decisions: dict[Block, Decision], source_name: str):
+        self._grammar = grammar
+        self._decisions = decisions
+        self._source_name = source_name
+        self._token_type = grammar.options.get('token_type', 'TokenType')
+        self._exception = grammar.options.get('exception', 'Exception')
+        self._k = max((decision.k for decision in decisions.values()), default=1)
+        self._token_names: set[str] = set()
+        self._type_sets: dict[tuple[str, ...], str] = {}
+        self._lines: list[str] = []
+        self._indent = 0
+        self._uses_text = False
+
+    def emit(self) -> str:
+        rule_lines = self._emit_rules()
+
+        self._lines = []
+        self._indent = 0
+        self._line(f'# Generated by parser_generator from {self._source_name}. Do not edit.')
+        for line in self._grammar.header.splitlines():
+            self._line(line)
+        self._line('')
+        self._line('')
+        for name in sorted(self._token_names):
+            self._line(f'_{name} = {self._token_type}.{name}')
+        for names, set_name in self._type_sets.items():
+            self._line(f'{set_name} = frozenset({{{", ".join(f"_{name}" for name in names)}}})')
+        self._line('')
+        self._line('')
+        self._line(f'class {self._grammar.options.get("class", "Parser")}:')
+        self._indent += 1
+        self._emit_runtime()
+        if self._grammar.members:
+            self._line('')
+            for line in self._grammar.members.splitlines():
+                self._line(line)
+        self._lines.extend(rule_lines)
+        return '\n'.join(self._lines) + '\n'
+
+    def _emit_runtime(self):
+        self._line('def __init__(self, lexer):')
+        self._indent += 1
+        self._line('self._lexer = lexer')
+        self._line('self._next_token = lexer.next_token')
+        for i in range(self._k):
+            self._line(f'self._t{i} = self._next_token()')
+        self._indent -= 1
+        if not _MISMATCH_MEMBER.search(self._grammar.members):
+            self._line('')
+            self._line('def _mismatch(self, expected: str):')
+            self._line(f'    raise {self._exception}(f\'expecting {{expected}}; found {{self._t0.type}}\')')
+
+    def _emit_rules(self) -> list[str]:
+        self._lines = []
+        self._indent = 1
+        for rule in self._grammar.rules.values():
+            self._emit_rule(rule)
+        return self._lines
+
+    def _emit_rule(self, rule: Rule):
+        self._line('')
+        self._line(f'def _{rule.name}(self):')
+        self._indent += 1
+        self._line('"""')
+        self._line(f'{rule.name}: {format_block(rule.block)}')
+        self._line(':return:')
+        self._line('"""')
+        self._uses_text = _uses_text(rule.block)
+        if self._uses_text:
+            self._line('_texts = []')
+        self._emit_block(rule.block)
+        self._indent -= 1
+
+    def _emit_block(self, block: Block):
+        if block.label is not None:
+            self._emit_set_match(block)
+            return
+
+        decision = self._decisions.get(block)
+        if decision is None:
+            if (predicate := _predicate(block.alternatives[0])) is not None:
+                raise GrammarException(f'predicate {{{predicate}}}? of an alternative which is not chosen')
+            self._emit_alternative(block.alternatives[0], None)
+            return
+
+        exit_test = _exit_test(block, decision)
+        if block.suffix == '':
+            self._emit_branches(block, _alternative_tests(block, decision, False))
+        elif block.suffix == '?':
+            tests = _alternative_tests(block, decision, exit_test is None)
+            if exit_test is None:
+                self._emit_branches(block, tests)
+            else:
+                self._emit_types(tests + [exit_test])
+                self._line(f'if not ({self._condition(exit_test)}):')
+                self._indent += 1
+                self._emit_branches(block, tests, False)
+                self._indent -= 1
+        elif block.suffix == '*':
+            self._line('while True:')
+            self._indent += 1
+            tests = _alternative_tests(block, decision, exit_test is None)
+            if exit_test is None:
+                self._emit_branches(block, tests)
+                self._line('else:')
+                self._line('    break')
+            else:
+                self._emit_types(tests + [exit_test])
+                self._line(f'if {self._condition(exit_test)}:')
+                self._line('    break')
+                self._emit_branches(block, tests, False)
+            self._indent -= 1
+        else:
+            self._line('while True:')
+            self._indent += 1
+            self._emit_branches(block, _alternative_tests(block, decision, False))
+            if exit_test is None:
+                exit_test = _prefixes(set().union(*decision.alternative_sets), decision.exit_set)
+                self._emit_types([exit_test])
+                self._line(f'if not ({self._condition(exit_test)}):')
+            else:
+                self._emit_types([exit_test])
+                self._line(f'if {self._condition(exit_test)}:')
+            self._line('    break')
+            self._indent -= 1
+
+    def _emit_branches(self, block: Block, tests: list[Optional[set[Lookahead]]], types: bool = True):
+        """
+        if/elif chain of alternatives, where an alternative without test is else.
+        """
+        if len(block.alternatives) == 1 and tests[0] is None:
+            self._emit_alternative(block.alternatives[0], None)
+            return
+
+        if types:
+            self._emit_types(tests)
+        for i, (alternative, lookaheads) in enumerate(zip(block.alternatives, tests)):
+            if lookaheads is None:
+                self._line('else:')
+                checked = None
+            elif (predicate := _predicate(alternative)) is not None:
+                self._line(f'{"if" if i == 0 else "elif"} {predicate}:')
+                checked = None
+            else:
+                self._line(f'{"if" if i == 0 else "elif"} {self._condition(lookaheads)}:')
+                checked = _checked_symbol(lookaheads)
+            self._indent += 1
+            self._emit_alternative(alternative, checked)
+            self._indent -= 1
+
+    def _emit_types(self, tests: list[Optional[set[Lookahead]]]):
+        depth = max((len(lookahead) for lookaheads in tests if lookaheads for lookahead in lookaheads), default=0)
+        for i in range(depth):
+            self._line(f'_type{i} = self._t{i}.type')
+
+    def _emit_alternative(self, alternative: Alternative, checked: Optional[Symbol]):
+        start = len(self._lines)
+        for element in alternative.elements:
+            if isinstance(element, Terminal):
+                self._emit_match(element, (element.name, element.text) == checked)
+            elif isinstance(element, NonTerminal):
+                call = f'self._{element.name}()'
+                self._line(call if element.label is None else f'{element.label} = {call}')
+            elif isinstance(element, Action):
+                if element.predicate:
+                    # tested by the decision
+                    continue
+                for line in element.code.replace('$text', "''.join(_texts)").splitlines():
+                    self._line(line)
+            else:
+                self._emit_block(element)
+            checked = None
+        if len(self._lines) == start:
+            self._line('pass')
+
+    def _emit_match(self, terminal: Terminal, checked: bool):
+        self._token_names.add(terminal.name)
+        if not checked:
+            test = f'self._t0.type is not _{terminal.name}'
+            if terminal.text is not None:
+                test += f' or self._t0.text != {terminal.text!r}'
+            self._line(f'if {test}:')
+            self._line(f'    self._mismatch({self._describe((terminal.name, terminal.text))!r})')
+        if terminal.label is not None:
+            self._line(f'{terminal.label} = self._t0')
+        self._emit_consume()
+
+    def _emit_set_match(self, block: Block):
+        symbols = {(element.name, element.text) for element in _terminals(block)}
+        self._line('_type0 = self._t0.type')
+        self._line(f'if not ({self._condition({(symbol,) for symbol in symbols})}):')
+        expected = ' or '.join(self._describe(symbol) for symbol in _terminal_order(block))
+        self._line(f'    self._mismatch({expected!r})')
+        self._line(f'{block.label} = self._t0')
+        self._emit_consume()
+
+    def _emit_consume(self):
+        if self._uses_text:
+            self._line('_texts.append(self._t0.text)')
+        for i in range(self._k - 1):
+            self._line(f'self._t{i} = self._t{i + 1}')
+        self._line(f'self._t{self._k - 1} = self._next_token()')
+
+    def _condition(self, lookaheads: set[Lookahead], depth: int = 0) -> str:
+        if () in lookaheads:
+            return 'True'
+
+        rests_by_symbol: dict[Symbol, set[Lookahead]] = defaultdict(set)
+        for lookahead in lookaheads:
+            rests_by_symbol[lookahead[0]].add(lookahead[1:])
+
+        # symbols with any text and nothing to test after them are tested together
+        any_names = sorted(name for (name, text), rests in rests_by_symbol.items() if text is None and () in rests)
+        tests = [self._type_test(any_names, depth)] if any_names else []
+        for (name, text), rests in sorted(rests_by_symbol.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+            if text is None and () in rests:
+                continue
+            self._token_names.add(name)
+            test = f'_type{depth} is _{name}'
+            if text is not None:
+                test += f' and self._t{depth}.text == {text!r}'
+            if () not in rests:
+                rest_test = self._condition(rests, depth + 1)
+                test += f' and ({rest_test})' if ' or ' in rest_test else f' and {rest_test}'
+            tests.append(test)
+
+        if len(tests) == 1:
+            return tests[0]
+        return ' or '.join(f'({test})' if ' and ' in test else test for test in tests)
+
+    def _type_test(self, names: list[str], depth: int) -> str:
+        self._token_names.update(names)
+        if len(names) <= MAX_INLINE_TYPE_TESTS:
+            return ' or '.join(f'_type{depth} is _{name}' for name in names)
+        if (set_name := self._type_sets.get(tuple(names))) is None:
+            set_name = self._type_sets[tuple(names)] = f'_TYPES_{len(self._type_sets)}'
+        return f'_type{depth} in {set_name}'
+
+    def _describe(self, symbol: Symbol) -> str:
+        name, text = symbol
+        description = f'{self._token_type}.{name}'
+        return description if text is None else f'{description}={text!r}'
+
+    def _line(self, text: str):
+        self._lines.append('    ' * self._indent + text if text else '')
+
+
+def format_block(block: Block) -> str:
+    """
+    :return: grammar text of a block without actions
+    """
+    return ' | '.join(format_elements(alternative.elements) for alternative in block.alternatives)
+
+
+def format_elements(elements: list[Element]) -> str:
+    texts = []
+    for element in elements:
+        if isinstance(element, Action):
+            continue
+        label = '' if element.label is None else f'{element.label}='
+        if isinstance(element, Terminal):
+            texts.append(label + element.name + ('' if element.text is None else f'={element.text!r}'))
+        elif isinstance(element, NonTerminal):
+            texts.append(label + element.name)
+        elif (len(element.alternatives) == 1 and len(element.alternatives[0].elements) == 1
+              and not isinstance(element.alternatives[0].elements[0], (Block, Action))):
+            texts.append(label + format_elements(element.alternatives[0].elements) + element.suffix)
+        else:
+            texts.append(f'{label}({format_block(element)}){element.suffix}')
+    return ' '.join(texts)
+
+
+def _uses_text(block: Block) -> bool:
+    for alternative in block.alternatives:
+        for element in alternative.elements:
+            if isinstance(element, Action) and '$text' in element.code:
+                return True
+            elif isinstance(element, Block) and _uses_text(element):
+                return True
+    return False
+
+
+def _exit_test(block: Block, decision: Decision) -> Optional[set[Lookahead]]:
+    """
+    The exit of a block is tested instead of its alternatives when it is one lookahead, e.g. a closing bracket,
+    and the alternatives have more, so that the block is entered on unexpected tokens
+    and they are reported by the alternatives, as hand-written parsers do.
+    :return: lookaheads tested for the exit before the alternatives, None if the exit is not tested
+    """
+    if decision.exit_set is None or len(decision.exit_set) != 1:
+        return None
+    alternative_lookaheads = set().union(*decision.alternative_sets)
+    if len(alternative_lookaheads) <= 1:
+        return None
+    return _prefixes(decision.exit_set, alternative_lookaheads)
+
+
+def _alternative_tests(block: Block, decision: Decision, exits: bool) -> list[Optional[set[Lookahead]]]:
+    """
+    Alternatives are tested in order by the shortest prefixes of their lookaheads which do not overlap
+    lookaheads of later alternatives, and of the exit if exits, like the if/elif chain of a hand-written parser.
+    :return: lookaheads tested for each alternative, None for the last one if it is else,
+             and no lookaheads for an alternative with a predicate
+    """
+    sets = decision.alternative_sets
+    tests: list[Optional[set[Lookahead]]] = []
+    for i, lookaheads in enumerate(sets):
+        later = set().union(*sets[i + 1:])
+        if exits:
+            later |= decision.exit_set
+        elif i == len(sets) - 1:
+            tests.append(None)
+            break
+        # a predicate is tested instead of lookaheads
+        tests.append(set() if _predicate(block.alternatives[i]) is not None else _prefixes(lookaheads, later))
+    return tests
+
+
+def _prefixes(lookaheads: set[Lookahead], others: set[Lookahead]) -> set[Lookahead]:
+    """
+    :return: shortest prefixes of lookaheads which do not overlap others
+    """
+    result = set()
+    for lookahead in lookaheads:
+        k = next(
+            (k for k in range(1, len(lookahead)) if not any(lookaheads_overlap(lookahead[:k], other) for other in others)),
+            len(lookahead),
+        )
+        result.add(lookahead[:k])
+    return result
+
+
+def _predicate(alternative: Alternative) -> Optional[str]:
+    """
+    :return: code of the predicate at the start of alternative, None if it has no predicate
+    """
+    if alternative.elements and isinstance(first := alternative.elements[0], Action) and first.predicate:
+        return first.code
+    return None
+
+
+def _checked_symbol(lookaheads: set[Lookahead]) -> Optional[Symbol]:
+    """
+    :return: symbol of the first token when the condition of lookaheads already tested it
+    """
+    symbols = {lookahead[0] if lookahead else None for lookahead in lookaheads}
+    return symbols.pop() if len(symbols) == 1 else None
+
+
+def _terminals(block: Block) -> list[Terminal]:
+    return [alternative.elements[0] for alternative in block.alternatives]
+
+
+def _terminal_order(block: Block) -> list[Symbol]:
+    return [(terminal.name, terminal.text) for terminal in _terminals(block)]
+
+
+def generate_parser(grammar: Grammar, source_name: str, k: Optional[int] = None) -> str:
+    decisions = LLAnalyzer(grammar, k).analyze()
+    return ParserEmitter(grammar, decisions, source_name).emit()
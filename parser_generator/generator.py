@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+from typing import Optional
+
+from .emitter import generate_parser
+from .grammar import GrammarException, parse_grammar
+
+
+def generate_file(grammar_path: str, output_path: Optional[str] = None, k: Optional[int] = None) -> str:
+    """
+    :return: generated source, which is also written to output_path if given
+    """
+    with open(grammar_path) as file:
+        grammar = parse_grammar(file.read())
+    source = generate_parser(grammar, os.path.basename(grammar_path), k)
+    if output_path is not None:
+        with open(output_path, 'w') as file:
+            file.write(source)
+    return source
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(prog='parser_generator', description='generate a LL(k) parser from a grammar file')
+    arg_parser.add_argument('path', metavar='GRAMMAR')
+    arg_parser.add_argument('-o', '--output', help='generated Python module (default: stdout)')
+    arg_parser.add_argument('-k', type=int, help='maximum lookahead depth (default: @k of the grammar or 2)')
+    args = arg_parser.parse_args(argv)
+
+    try:
+        source = generate_file(args.path, args.output, args.k)
+    except (OSError, GrammarException) as e:
+        print(f'{args.path}: {e}', file=sys.stderr)
+        return 1
+
+    if args.output is None:
+        sys.stdout.write(source)
+    return 0
@@ -0,0 +1,302 @@
+import re
+import textwrap
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+
+class GrammarException(Exception):
+    pass
+
+
+@dataclass
+class Terminal:
+    """
+    Token type name, optionally constrained to a token text e.g. INT='1'
+    """
+    name: str
+    text: Optional[str] = None
+    label: Optional[str] = None
+
+
+@dataclass
+class NonTerminal:
+    name: str
+    label: Optional[str] = None
+
+
+@dataclass
+class Action:
+    """
+    Python statements run when parsing reaches them.
+    $text is the text of tokens matched by the rule so far.
+    A predicate e.g. {self._t1.type is TokenType.EQUAL}? is a Python expression at the start of an alternative,
+    which is tested to choose the alternative instead of its lookahead.
+    """
+    code: str
+    predicate: bool = False
+
+
+@dataclass(eq=False)
+class Block:
+    """
+    Alternatives of a rule or of a parenthesized subrule, with suffix '', '?', '*' or '+'.
+    Blocks are compared by identity, as they are keys of lookahead decisions.
+    A label is only allowed on a block of single terminals, and refers to the matched token.
+    """
+    alternatives: list['Alternative']
+    suffix: str = ''
+    label: Optional[str] = None
+
+
+@dataclass
+class Alternative:
+    elements: list[Union[Terminal, NonTerminal, Action, Block]]
+
+
+Element = Union[Terminal, NonTerminal, Action, Block]
+
+
+@dataclass
+class Rule:
+    name: str
+    block: Block
+
+
+@dataclass
+class Grammar:
+    """
+    options: class, token_type, exception and k (maximum lookahead depth)
+    """
+    rules: dict[str, Rule]
+    options: dict[str, str] = field(default_factory=dict)
+    header: str = ''
+    members: str = ''
+
+
+OPTIONS = ('class', 'token_type', 'exception', 'k')
+CODE_OPTIONS = ('header', 'members')
+
+_TOKEN_PATTERN = re.compile(r'''
+    (?P<SKIP>(?:\s|//[^\n]*)+)
+  | (?P<DIRECTIVE>@[a-z_]+)
+  | (?P<NAME>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<STRING>'(?:[^'\\\n]|\\.)*')
+  | (?P<INT>\d+)
+  | (?P<CODE>\{)
+  | (?P<PUNCTUATION>[:;|()?*+=])
+''', re.VERBOSE)
+
+
+@dataclass
+class _Token:
+    kind: str
+    text: str
+    line: int
+
+
+def _tokenize(source: str) -> list[_Token]:
+    tokens = []
+    pos = 0
+    line = 1
+    while pos < len(source):
+        if (match := _TOKEN_PATTERN.match(source, pos)) is None:
+            raise GrammarException(f'line {line}: unexpected character {source[pos]!r}')
+        kind = match.lastgroup
+        if kind == 'CODE':
+            end = code_end(source, pos, line)
+            tokens.append(_Token(kind, source[pos + 1:end - 1], line))
+        else:
+            end = match.end()
+            if kind != 'SKIP':
+                tokens.append(_Token(kind, match.group(), line))
+        line += source.count('\n', pos, end)
+        pos = end
+    tokens.append(_Token('EOF', '', line))
+    return tokens
+
+
+def code_end(source: str, start: int, line: int) -> int:
+    """
+    :return: position after the brace which closes the brace at start, skipping braces in Python strings
+    """
+    depth = 0
+    pos = start
+    while pos < len(source):
+        char = source[pos]
+        if char in '\'"':
+            if source.startswith(char * 3, pos):
+                pattern = rf'{char * 3}(?:[^\\]|\\.)*?{char * 3}'
+            else:
+                pattern = rf'{char}(?:[^{char}\\\n]|\\.)*{char}'
+            if (match := re.compile(pattern, re.DOTALL).match(source, pos)) is None:
+                raise GrammarException(f'line {line}: unterminated string in code')
+            pos = match.end()
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    raise GrammarException(f'line {line}: unterminated code block')
+
+
+class GrammarParser:
+    """
+    grammar: directive* rule*
+    directive: '@' NAME (NAME | INT | code)
+    rule: NAME ':' alternatives ';'
+    alternatives: alternative ('|' alternative)*
+    alternative: element*
+    element: (NAME '=')? atom ('?' | '*' | '+')?
+    atom: TOKEN_NAME ('=' STRING)? | rule_name | '(' alternatives ')' | code
+
+    Token type names start with an upper case letter and rule names with a lower case letter.
+    """
+    def __init__(self, source: str):
+        self._tokens = _tokenize(source)
+        self._p = 0
+
+    def parse(self) -> Grammar:
+        grammar = Grammar({})
+        while self._lookahead(0).kind == 'DIRECTIVE':
+            self._directive(grammar)
+        while self._lookahead(0).kind != 'EOF':
+            rule = self._rule()
+            if rule.name in grammar.rules:
+                raise GrammarException(f'rule {rule.name} is defined twice')
+            grammar.rules[rule.name] = rule
+
+        if not grammar.rules:
+            raise GrammarException('grammar has no rules')
+        for rule in grammar.rules.values():
+            self._check_references(grammar, rule.name, rule.block)
+        return grammar
+
+    def _directive(self, grammar: Grammar):
+        token = self._match('DIRECTIVE')
+        name = token.text[1:]
+        if name in CODE_OPTIONS:
+            code = textwrap.dedent(self._match('CODE').text).strip('\n')
+            setattr(grammar, name, code)
+        elif name in OPTIONS:
+            value = self._lookahead(0)
+            if value.kind not in ('NAME', 'INT'):
+                raise GrammarException(f'line {value.line}: expecting value of @{name}; found {value.text!r}')
+            self._p += 1
+            grammar.options[name] = value.text
+        else:
+            raise GrammarException(f'line {token.line}: unknown directive @{name}')
+
+    def _rule(self) -> Rule:
+        name = self._match('NAME')
+        if not name.text[0].islower():
+            raise GrammarException(f'line {name.line}: rule name {name.text} should start with a lower case letter')
+        self._match('PUNCTUATION', ':')
+        block = self._alternatives()
+        self._match('PUNCTUATION', ';')
+        return Rule(name.text, block)
+
+    def _alternatives(self) -> Block:
+        alternatives = [self._alternative()]
+        while self._is_punctuation('|'):
+            self._p += 1
+            alternatives.append(self._alternative())
+        return Block(alternatives)
+
+    def _alternative(self) -> Alternative:
+        elements = []
+        while self._lookahead(0).kind in ('NAME', 'CODE') or self._is_punctuation('('):
+            line = self._lookahead(0).line
+            element = self._element()
+            if isinstance(element, Action) and element.predicate and elements:
+                raise GrammarException(f'line {line}: predicate should be at the start of an alternative')
+            elements.append(element)
+        return Alternative(elements)
+
+    def _element(self) -> Element:
+        label = None
+        if (self._lookahead(0).kind == 'NAME' and self._is_punctuation('=', 1)
+                and self._lookahead(2).kind != 'STRING'):
+            label = self._match('NAME').text
+            self._p += 1
+
+        element = self._atom()
+        if isinstance(element, Action) and self._is_punctuation('?'):
+            self._p += 1
+            element.predicate = True
+        elif self._is_punctuation('?') or self._is_punctuation('*') or self._is_punctuation('+'):
+            if not isinstance(element, Block):
+                element = Block([Alternative([element])])
+            element.suffix = self._match('PUNCTUATION').text
+
+        if label is not None:
+            self._set_label(element, label)
+        return element
+
+    def _atom(self) -> Element:
+        token = self._lookahead(0)
+        if token.kind == 'CODE':
+            self._p += 1
+            return Action(textwrap.dedent(token.text).strip())
+        elif token.kind == 'NAME' and token.text[0].isupper():
+            self._p += 1
+            if self._is_punctuation('=') and self._lookahead(1).kind == 'STRING':
+                self._p += 1
+                return Terminal(token.text, _string_value(self._match('STRING').text))
+            return Terminal(token.text)
+        elif token.kind == 'NAME':
+            self._p += 1
+            return NonTerminal(token.text)
+
+        self._match('PUNCTUATION', '(')
+        block = self._alternatives()
+        self._match('PUNCTUATION', ')')
+        return block
+
+    def _set_label(self, element: Element, label: str):
+        if isinstance(element, Block):
+            if element.suffix or not _is_terminal_set(element):
+                raise GrammarException(f'label {label} is only allowed on a block of single tokens')
+        elif isinstance(element, Action):
+            raise GrammarException(f'label {label} on action')
+        element.label = label
+
+    def _check_references(self, grammar: Grammar, rule_name: str, block: Block):
+        for alternative in block.alternatives:
+            for element in alternative.elements:
+                if isinstance(element, NonTerminal) and element.name not in grammar.rules:
+                    raise GrammarException(f'rule {element.name} referred in {rule_name} is not defined')
+                elif isinstance(element, Block):
+                    self._check_references(grammar, rule_name, element)
+
+    def _match(self, kind: str, text: Optional[str] = None) -> _Token:
+        token = self._lookahead(0)
+        if token.kind != kind or (text is not None and token.text != text):
+            raise GrammarException(f'line {token.line}: expecting {text or kind}; found {token.text or token.kind!r}')
+        self._p += 1
+        return token
+
+    def _lookahead(self, i: int) -> _Token:
+        return self._tokens[min(self._p + i, len(self._tokens) - 1)]
+
+    def _is_punctuation(self, text: str, i: int = 0) -> bool:
+        token = self._lookahead(i)
+        return token.kind == 'PUNCTUATION' and token.text == text
+
+
+def _string_value(literal: str) -> str:
+    return re.sub(r'\\(.)', r'\1', literal[1:-1])
+
+
+def _is_terminal_set(block: Block) -> bool:
+    return all(
+        len(alternative.elements) == 1 and isinstance(alternative.elements[0], Terminal)
+        and alternative.elements[0].label is None
+        for alternative in block.alternatives
+    )
+
+
+def parse_grammar(source: str) -> Grammar:
+    return GrammarParser(source).parse()
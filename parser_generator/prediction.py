@@ -0,0 +1,284 @@
+from enum import Enum
+from typing import Callable, Optional
+
+from .grammar import Action, Block, Grammar, GrammarException, NonTerminal, Terminal
+
+NO_ALTERNATIVE = -1
+
+# state of configurations which reached the end of a rule nothing is known to follow
+_FINAL = -1
+_EMPTY_STACK = 0
+
+# (ATN state, alternative, interned stack of ATN states to return to)
+_Config = tuple[int, int, int]
+
+
+class _DFAState:
+    __slots__ = ('configs', 'edges', 'prediction', 'final_alternative')
+
+    def __init__(self, configs: frozenset[_Config], prediction: Optional[int], final_alternative: Optional[int]):
+        self.configs = configs
+        # token type -> next state, filled as inputs are seen
+        self.edges: dict[Enum, '_DFAState'] = {}
+        # alternative when it is decided in this state
+        self.prediction = prediction
+        # alternative which may end here, when no more input matches
+        self.final_alternative = final_alternative
+
+
+class AdaptivePredictor:
+    """
+    Adaptive LL(*) prediction of rule alternatives, like ALL(*) of ANTLR 4 without full context retry.
+
+    Rules are turned into an ATN: a state machine of token types, rule calls and epsilon transitions.
+    Prediction simulates all alternatives of a rule over lookahead tokens, with the stack of rule calls
+    made while looking ahead, only until one alternative remains, so the lookahead is as deep as needed
+    e.g. to the token after a nested list. Simulated states are cached as a DFA per rule whose edges are
+    token types, so a prediction already seen is a walk of dict lookups.
+    Prediction starts without knowing the caller of the rule, so the end of the rule is followed by
+    whatever follows its calls anywhere. When several alternatives match the same input,
+    the first one is predicted.
+    """
+    def __init__(self, grammar: Grammar, token_type: type[Enum]):
+        # per ATN state: (token type, next state) and (None, next state) for epsilon
+        self._transitions: list[list[tuple[Optional[Enum], int]]] = []
+        # per ATN state: (start of called rule, state after the call)
+        self._calls: list[list[tuple[int, int]]] = []
+        self._start_rules: dict[int, str] = {}
+        self._stop_rules: dict[int, str] = {}
+        self._rule_starts: dict[str, int] = {}
+        self._rule_stops: dict[str, int] = {}
+        # states after calls of each rule, where a rule ends when its caller is unknown
+        self._follow_states: dict[str, list[int]] = {name: [] for name in grammar.rules}
+        self._alternative_starts: dict[str, list[int]] = {}
+        self._token_type = token_type
+
+        # interned stacks: id -> (state to return to, id of the rest); 0 is the empty stack
+        self._stacks: list[Optional[tuple[int, int]]] = [None]
+        self._stack_ids: dict[tuple[int, int], int] = {}
+
+        for name in grammar.rules:
+            self._rule_starts[name] = self._new_state()
+            self._rule_stops[name] = self._new_state()
+            self._start_rules[self._rule_starts[name]] = name
+            self._stop_rules[self._rule_stops[name]] = name
+        for name, rule in grammar.rules.items():
+            starts = self._alternative_starts[name] = []
+            for alternative in rule.block.alternatives:
+                start, end = self._build_elements(alternative.elements)
+                self._transitions[self._rule_starts[name]].append((None, start))
+                self._transitions[end].append((None, self._rule_stops[name]))
+                starts.append(start)
+
+        self._check_left_recursion()
+
+        self._dfas: dict[str, _DFAState] = {}
+        self._dfa_states: dict[frozenset[_Config], _DFAState] = {}
+        self._error_state = _DFAState(frozenset(), NO_ALTERNATIVE, None)
+
+    @property
+    def dfa_state_count(self) -> int:
+        return len(self._dfa_states)
+
+    def predict(self, rule: str, lookahead_type: Callable[[int], Enum]) -> int:
+        """
+        :param lookahead_type: token type of i-th lookahead token, called with 0, 1, 2, ... as far as needed
+        :return: index of the predicted alternative of rule, or NO_ALTERNATIVE when no alternative matches
+        """
+        if (state := self._dfas.get(rule)) is None:
+            state = self._dfas[rule] = self._start_state(rule)
+
+        i = 0
+        while state.prediction is None:
+            token_type = lookahead_type(i)
+            if (target := state.edges.get(token_type)) is None:
+                target = state.edges[token_type] = self._target(state, token_type)
+            if target is self._error_state:
+                return state.final_alternative if state.final_alternative is not None else NO_ALTERNATIVE
+            state = target
+            i += 1
+        return state.prediction
+
+    def error_index(self, rule: str, lookahead_type: Callable[[int], Enum]) -> int:
+        """
+        Walk the cached DFA again after predict() returned NO_ALTERNATIVE for the same lookahead.
+        :return: index of the lookahead token where no alternative of rule matches any more
+        """
+        state = self._dfas[rule]
+        i = 0
+        while state.prediction is None and (target := state.edges.get(lookahead_type(i))) is not self._error_state:
+            state = target
+            i += 1
+        return i
+
+    def _start_state(self, rule: str) -> _DFAState:
+        if rule not in self._alternative_starts:
+            raise GrammarException(f'rule {rule} is not defined')
+        return self._dfa_state(self._closure([
+            (start, alternative, _EMPTY_STACK) for alternative, start in enumerate(self._alternative_starts[rule])
+        ]))
+
+    def _target(self, state: _DFAState, token_type: Enum) -> _DFAState:
+        moved = []
+        for atn_state, alternative, stack in state.configs:
+            if atn_state == _FINAL:
+                continue
+            for label, target in self._transitions[atn_state]:
+                if label is token_type:
+                    moved.append((target, alternative, stack))
+        if not moved:
+            return self._error_state
+        return self._dfa_state(self._closure(moved))
+
+    def _dfa_state(self, configs: frozenset[_Config]) -> _DFAState:
+        if (state := self._dfa_states.get(configs)) is not None:
+            return state
+
+        configs_by_alternative: dict[int, set[tuple[int, int]]] = {}
+        for atn_state, alternative, stack in configs:
+            configs_by_alternative.setdefault(alternative, set()).add((atn_state, stack))
+        finals = [alternative for atn_state, alternative, _ in configs if atn_state == _FINAL]
+
+        prediction = None
+        if len(configs_by_alternative) == 1:
+            prediction = next(iter(configs_by_alternative))
+        elif all(alternative_configs == configs_by_alternative[min(configs_by_alternative)]
+                 for alternative_configs in configs_by_alternative.values()):
+            # alternatives which match the same inputs from here never split
+            prediction = min(configs_by_alternative)
+
+        state = self._dfa_states[configs] = _DFAState(configs, prediction, min(finals, default=None))
+        return state
+
+    def _closure(self, configs: list[_Config]) -> frozenset[_Config]:
+        """
+        :return: configurations reachable by epsilon transitions, rule calls and returns,
+                 which wait for a token or are final
+        """
+        closure = set()
+        visited = set()
+        stack = list(configs)
+        while stack:
+            config = stack.pop()
+            if config in visited:
+                continue
+            visited.add(config)
+            atn_state, alternative, call_stack = config
+
+            if atn_state in self._stop_rules:
+                if call_stack != _EMPTY_STACK:
+                    return_state, rest = self._stacks[call_stack]
+                    stack.append((return_state, alternative, rest))
+                elif follow_states := self._follow_states[self._stop_rules[atn_state]]:
+                    stack.extend((follow_state, alternative, _EMPTY_STACK) for follow_state in follow_states)
+                else:
+                    closure.add((_FINAL, alternative, _EMPTY_STACK))
+                continue
+
+            for start, return_state in self._calls[atn_state]:
+                stack.append((start, alternative, self._push(return_state, call_stack)))
+            for label, target in self._transitions[atn_state]:
+                if label is None:
+                    stack.append((target, alternative, call_stack))
+                else:
+                    closure.add(config)
+        return frozenset(closure)
+
+    def _push(self, return_state: int, stack: int) -> int:
+        key = (return_state, stack)
+        if (stack_id := self._stack_ids.get(key)) is None:
+            stack_id = self._stack_ids[key] = len(self._stacks)
+            self._stacks.append(key)
+        return stack_id
+
+    def _check_left_recursion(self):
+        """
+        A rule calling itself before matching any token makes the stacks of prediction grow forever.
+        """
+        nullable: set[str] = set()
+        left_calls: dict[str, set[str]] = {}
+        changed = True
+        while changed:
+            changed = False
+            for name, start in self._rule_starts.items():
+                reached, calls = self._reach_without_tokens(start, nullable)
+                left_calls[name] = calls
+                if self._rule_stops[name] in reached and name not in nullable:
+                    nullable.add(name)
+                    changed = True
+
+        for name in self._rule_starts:
+            called = set()
+            pending = list(left_calls[name])
+            while pending:
+                if (callee := pending.pop()) == name:
+                    raise GrammarException(f'rule {name} is left recursive')
+                if callee not in called:
+                    called.add(callee)
+                    pending.extend(left_calls[callee])
+
+    def _reach_without_tokens(self, start: int, nullable: set[str]) -> tuple[set[int], set[str]]:
+        """
+        :return: states reached from start without matching tokens, and rules called on the way
+        """
+        reached = {start}
+        calls = set()
+        pending = [start]
+        while pending:
+            atn_state = pending.pop()
+            targets = [target for label, target in self._transitions[atn_state] if label is None]
+            for rule_start, return_state in self._calls[atn_state]:
+                rule = self._start_rules[rule_start]
+                calls.add(rule)
+                if rule in nullable:
+                    targets.append(return_state)
+            for target in targets:
+                if target not in reached:
+                    reached.add(target)
+                    pending.append(target)
+        return reached, calls
+
+    def _new_state(self) -> int:
+        self._transitions.append([])
+        self._calls.append([])
+        return len(self._transitions) - 1
+
+    def _build_elements(self, elements: list) -> tuple[int, int]:
+        start = end = self._new_state()
+        for element in elements:
+            if isinstance(element, Terminal):
+                if element.text is not None:
+                    raise GrammarException(f'token text of {element.name} is not supported by adaptive prediction')
+                if element.name not in self._token_type.__members__:
+                    raise GrammarException(f'{element.name} is not a member of {self._token_type.__name__}')
+                target = self._new_state()
+                self._transitions[end].append((self._token_type[element.name], target))
+            elif isinstance(element, NonTerminal):
+                target = self._new_state()
+                self._calls[end].append((self._rule_starts[element.name], target))
+                self._follow_states[element.name].append(target)
+            elif isinstance(element, Action):
+                continue
+            else:
+                target = self._build_block(end, element)
+            end = target
+        return start, end
+
+    def _build_block(self, start: int, block: Block) -> int:
+        """
+        :return: state after block which starts at start
+        """
+        entry, end = self._new_state(), self._new_state()
+        for alternative in block.alternatives:
+            alternative_start, alternative_end = self._build_elements(alternative.elements)
+            self._transitions[entry].append((None, alternative_start))
+            self._transitions[alternative_end].append((None, end))
+
+        exit_ = self._new_state()
+        self._transitions[start].append((None, entry))
+        self._transitions[end].append((None, exit_))
+        if block.suffix in ('?', '*'):
+            self._transitions[start].append((None, exit_))
+        if block.suffix in ('*', '+'):
+            self._transitions[end].append((None, entry))
+        return exit_
@@ -0,0 +1,76 @@
+import pytest
+
+from .analysis import LLAnalyzer, concat, lookaheads_overlap
+from .grammar import GrammarException, parse_grammar
+
+
+LIST_GRAMMAR = '''
+    stat: list EOF ;
+    list: LBRACK elements? RBRACK ;
+    elements: element (COMMA element)* ;
+    element: VAR EQUAL VAR | VAR | list ;
+'''
+
+
+class TestLLAnalyzer:
+    def test_concat(self):
+        assert concat({(), (('A', None),)}, {(('B', None),), (('C', None), ('D', None))}, 2) == {
+            (('B', None),), (('C', None), ('D', None)), (('A', None), ('B', None)), (('A', None), ('C', None)),
+        }
+
+    @pytest.mark.parametrize('a, b, overlap', [
+        ((('A', None),), (('A', None), ('B', None)), True),
+        ((('A', None), ('C', None)), (('A', None), ('B', None)), False),
+        ((('A', '1'),), (('A', None),), True),
+        ((('A', '1'),), (('A', '0'),), False),
+        ((), (('A', None),), True),
+    ])
+    def test_lookaheads_overlap(self, a, b, overlap):
+        assert lookaheads_overlap(a, b) == overlap
+
+    def test_first_and_follow(self):
+        analyzer = LLAnalyzer(parse_grammar(LIST_GRAMMAR), 2)
+        analyzer.analyze()
+        assert analyzer.first['list'] == {(('LBRACK', None), ('RBRACK', None)), (('LBRACK', None), ('VAR', None)),
+                                          (('LBRACK', None), ('LBRACK', None))}
+        assert analyzer.follow['stat'] == {()}
+        assert analyzer.follow['list'] == {(('EOF', None),), (('COMMA', None), ('VAR', None)),
+                                           (('COMMA', None), ('LBRACK', None)), (('RBRACK', None), ('EOF', None)),
+                                           (('RBRACK', None), ('COMMA', None)), (('RBRACK', None), ('RBRACK', None))}
+        assert analyzer.follow['element'] == {(('COMMA', None), ('VAR', None)), (('COMMA', None), ('LBRACK', None)),
+                                              (('RBRACK', None), ('EOF', None)), (('RBRACK', None), ('COMMA', None)),
+                                              (('RBRACK', None), ('RBRACK', None))}
+
+    def test_decisions(self):
+        grammar = parse_grammar(LIST_GRAMMAR)
+        decisions = LLAnalyzer(grammar, 3).analyze()
+
+        elements = grammar.rules['list'].block.alternatives[0].elements[1]
+        assert decisions[elements].k == 1
+        assert decisions[elements].alternative_sets == [{(('VAR', None),), (('LBRACK', None),)}]
+        assert decisions[elements].exit_set == {(('RBRACK', None),)}
+
+        element = grammar.rules['element'].block
+        assert decisions[element].k == 2
+        assert decisions[element].exit_set is None
+        assert decisions[element].alternative_sets[0] == {(('VAR', None), ('EQUAL', None))}
+
+    @pytest.mark.parametrize('source, k', [
+        ('a: B C | B D ;', 1),
+        ('a: B* B ;', 3),
+        ('a: b | c ; b: INT ; c: INT=\'1\' ;', 2),
+        ('a: B? ;', 1),  # entry rule may be followed by anything
+        ('a: a B | C ;', 2),  # left recursion
+    ])
+    def test_not_ll_k(self, source, k):
+        with pytest.raises(GrammarException):
+            LLAnalyzer(parse_grammar(source), k).analyze()
+
+    def test_text_constraints_are_disjoint(self):
+        grammar = parse_grammar("a: (INT='0' | INT='1' | VAR) EOF ;")
+        decision = LLAnalyzer(grammar, 1).analyze()[grammar.rules['a'].block.alternatives[0].elements[0]]
+        assert decision.k == 1
+
+    def test_never_ending_rule(self):
+        with pytest.raises(GrammarException):
+            LLAnalyzer(parse_grammar('a: B a ;'), 2).analyze()
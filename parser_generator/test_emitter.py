@@ -0,0 +1,132 @@
+import pytest
+
+from core.lexer import ListLexer
+from .emitter import format_block, generate_parser
+from .grammar import GrammarException, parse_grammar
+
+
+LIST_GRAMMAR = '''
+@class ListParser
+@exception ValueError
+@header {
+    from core.lexer import TokenType
+}
+@members {
+    def parse(self):
+        return self._stat()
+}
+
+stat: items=list EOF { return items } ;
+
+list
+    : LBRACK { items = [] }
+      ( item=element { items.append(item) } (COMMA item=element { items.append(item) })* )?
+      RBRACK
+      { return items }
+    ;
+
+element
+    : name=VAR (EQUAL value=VAR { return name.text, value.text })? { return name.text }
+    | items=list { return items }
+    ;
+'''
+
+
+def _parser_class(source: str):
+    namespace = {}
+    exec(compile(generate_parser(parse_grammar(source), 'test.grammar'), 'generated', 'exec'), namespace)
+    return namespace[parse_grammar(source).options['class']]
+
+
+class TestParserEmitter:
+    @pytest.mark.parametrize('input_text, expected', [
+        ('[]', []),
+        ('[a, b=c]', ['a', ('b', 'c')]),
+        ('[a, [b, []], c]', ['a', ['b', []], 'c']),
+    ])
+    def test_parse(self, input_text, expected):
+        assert _parser_class(LIST_GRAMMAR)(ListLexer(input_text)).parse() == expected
+
+    @pytest.mark.parametrize('input_text, message', [
+        # VAR is enough to choose the alternative after VAR EQUAL, so the error is found after the element
+        ('[a', 'expecting TokenType.RBRACK; found TokenType.EOF'),
+        # the list is entered on any token but RBRACK, so the error is found in the element
+        ('[=]', 'expecting TokenType.LBRACK; found TokenType.EQUAL'),
+        ('[a, ]', 'expecting TokenType.LBRACK; found TokenType.RBRACK'),
+        ('[a b]', 'expecting TokenType.RBRACK; found TokenType.VAR'),
+        ('[a=]', 'expecting TokenType.VAR; found TokenType.RBRACK'),
+        ('[a]]', 'expecting TokenType.EOF; found TokenType.RBRACK'),
+    ])
+    def test_parse_fail(self, input_text, message):
+        with pytest.raises(ValueError, match=message):
+            _parser_class(LIST_GRAMMAR)(ListLexer(input_text)).parse()
+
+    @pytest.mark.parametrize('input_text, expected', [
+        ('y', 'y'),
+        ('y y=c', 'yy=c'),
+        ('x', 'x!'),
+        ('y x', 'yx!'),
+    ])
+    def test_parse_text_of_one_or_more(self, input_text, expected):
+        parser_class = _parser_class('''
+            @class WordsParser
+            @exception ValueError
+            @header { from core.lexer import TokenType }
+            words: (VAR='x' { _texts.append('!') } | VAR='y' (EQUAL VAR)?)+ EOF { return $text } ;
+        ''')
+        assert parser_class(ListLexer(input_text))._words() == expected
+
+    def test_parse_text_constraint_fail(self):
+        parser_class = _parser_class('''
+            @class XParser
+            @exception ValueError
+            @header { from core.lexer import TokenType }
+            x: VAR='x' EOF ;
+        ''')
+        parser_class(ListLexer('x'))._x()
+        with pytest.raises(ValueError, match="expecting TokenType.VAR='x'; found TokenType.VAR"):
+            parser_class(ListLexer('y'))._x()
+
+    def test_members_mismatch(self):
+        parser_class = _parser_class('''
+            @class XParser
+            @exception ValueError
+            @header { from core.lexer import TokenType }
+            @members {
+                def _mismatch(self, expected):
+                    raise ValueError(f'expected: {expected} but {self._t0.type}')
+            }
+            x: VAR EOF ;
+        ''')
+        with pytest.raises(ValueError, match='expected: TokenType.VAR but TokenType.LBRACK'):
+            parser_class(ListLexer('['))._x()
+
+    def test_parse_predicate(self):
+        parser_class = _parser_class('''
+            @class XParser
+            @exception ValueError
+            @header { from core.lexer import TokenType }
+            x: {self._t1.type is TokenType.EQUAL}? (VAR | LBRACK) EQUAL { return 'assign' } | VAR EOF { return 'name' } ;
+        ''')
+        assert parser_class(ListLexer('a='))._x() == 'assign'
+        assert parser_class(ListLexer('[='))._x() == 'assign'
+        assert parser_class(ListLexer('a'))._x() == 'name'
+        # the predicate chooses the first alternative without its lookahead
+        with pytest.raises(ValueError, match='expecting TokenType.LBRACK; found TokenType.RBRACK'):
+            parser_class(ListLexer(']='))._x()
+
+    def test_generate_predicate_fail(self):
+        with pytest.raises(GrammarException, match='predicate'):
+            generate_parser(parse_grammar('x: {True}? VAR ;'), 'test.grammar')
+
+    def test_generate_inlines_tests(self):
+        source = generate_parser(parse_grammar(LIST_GRAMMAR), 'list.grammar')
+        assert source.startswith('# Generated by parser_generator from list.grammar. Do not edit.\n')
+        assert '_LBRACK = TokenType.LBRACK' in source
+        # LL(1) grammar keeps only one lookahead token
+        assert '_type1' not in source
+        assert 'self._t1' not in source
+
+    def test_format_block(self):
+        grammar = parse_grammar("a: x=B (C | D='1')* e? { pass } ; e: F ;")
+        assert format_block(grammar.rules['a'].block) == "x=B (C | D='1')* e?"
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from .generator import generate_file, main
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestGenerator:
+    @pytest.mark.parametrize('grammar_path, generated_path', [
+        ('basic_parser/list.grammar', 'basic_parser/generated_parser.py'),
+        ('hack_assembly/hack.grammar', 'hack_assembly/generated_parser.py'),
+    ])
+    def test_generated_parser_is_up_to_date(self, grammar_path, generated_path):
+        with open(os.path.join(ROOT, generated_path)) as file:
+            assert generate_file(os.path.join(ROOT, grammar_path)) == file.read()
+
+    def test_main(self, tmp_path, capsys):
+        grammar_path = tmp_path / 'a.grammar'
+        grammar_path.write_text('a: B EOF ;')
+        output_path = tmp_path / 'a.py'
+
+        assert main([str(grammar_path), '-o', str(output_path)]) == 0
+        assert output_path.read_text().startswith('# Generated by parser_generator from a.grammar.')
+        assert main([str(grammar_path)]) == 0
+        assert capsys.readouterr().out == output_path.read_text()
+
+    def test_main_fail(self, tmp_path, capsys):
+        grammar_path = tmp_path / 'a.grammar'
+        grammar_path.write_text('a: B C | B D ;')
+        assert main([str(grammar_path), '-k', '1']) == 1
+        assert 'not LL(1)' in capsys.readouterr().err
+        assert main([str(tmp_path / 'missing.grammar')]) == 1
@@ -0,0 +1,77 @@
+import pytest
+
+from .grammar import Action, Block, GrammarException, NonTerminal, Terminal, parse_grammar
+
+
+class TestGrammarParser:
+    @staticmethod
+    def _parse_fail_test_cases() -> list[str]:
+        return [
+            '',
+            'a: B',  # no ';'
+            'a: b ;',  # undefined rule
+            'a: B ; a: C ;',  # defined twice
+            'A: B ;',  # upper case rule name
+            '@unknown X a: B ;',
+            '@header { x = "} a: B ;',  # unterminated string
+            '@members { def f(): a: B ;',  # unterminated code
+            'a: x=(B C) ;',  # label on a block of sequences
+            'a: x=B* ;',  # label on a loop
+            "a: B='1 ;",
+            'a: B % ;',
+            'a: B {True}? C | D ;',  # predicate after an element
+        ]
+
+    def test_parse(self):
+        grammar = parse_grammar('''
+            // comment
+            @class ListParser
+            @k 3
+            @header {
+                from x import y
+            }
+            stat: list EOF ;
+            list: LBRACK (x=VAR | INT='1' { print("}") })* RBRACK ;
+        ''')
+        assert grammar.options == {'class': 'ListParser', 'k': '3'}
+        assert grammar.header == 'from x import y'
+        assert list(grammar.rules) == ['stat', 'list']
+
+        elements = grammar.rules['list'].block.alternatives[0].elements
+        assert elements[0] == Terminal('LBRACK')
+        assert isinstance(elements[1], Block) and elements[1].suffix == '*'
+        first, second = elements[1].alternatives
+        assert first.elements == [Terminal('VAR', label='x')]
+        assert second.elements == [Terminal('INT', '1'), Action('print("}")')]
+        assert grammar.rules['stat'].block.alternatives[0].elements == [NonTerminal('list'), Terminal('EOF')]
+
+    def test_parse_labeled_token_set(self):
+        grammar = parse_grammar("a: value=(B | C='1') ;")
+        block = grammar.rules['a'].block.alternatives[0].elements[0]
+        assert block.label == 'value'
+        assert [alternative.elements for alternative in block.alternatives] == [[Terminal('B')], [Terminal('C', '1')]]
+
+    def test_parse_predicate(self):
+        grammar = parse_grammar('a: {self._t1.text == "}"}? B C | B ;')
+        first, second = grammar.rules['a'].block.alternatives
+        assert first.elements == [Action('self._t1.text == "}"', True), Terminal('B'), Terminal('C')]
+        assert second.elements == [Terminal('B')]
+
+    def test_parse_members(self):
+        grammar = parse_grammar('''
+            @members {
+                def parse(self):
+                    """
+                    {docstring}
+                    """
+                    return self._a()
+            }
+            a: B ;
+        ''')
+        assert grammar.members.splitlines()[0] == 'def parse(self):'
+        assert grammar.members.splitlines()[-1] == '    return self._a()'
+
+    @pytest.mark.parametrize('source', _parse_fail_test_cases())
+    def test_parse_fail(self, source):
+        with pytest.raises(GrammarException):
+            parse_grammar(source)
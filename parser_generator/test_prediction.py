@@ -0,0 +1,93 @@
+import pytest
+
+from core.lexer import ListLexer, TokenType
+from .grammar import GrammarException, parse_grammar
+from .prediction import NO_ALTERNATIVE, AdaptivePredictor
+
+
+STAT_GRAMMAR = '''
+    stat: list EOF | assign EOF ;
+    assign: list EQUAL list ;
+    list: LBRACK elements? RBRACK ;
+    elements: element (COMMA element)* ;
+    element: VAR EQUAL VAR | VAR | list ;
+'''
+
+
+def _lookahead_type(input_text: str):
+    lexer = ListLexer(input_text)
+    types = []
+
+    def lookahead_type(i: int) -> TokenType:
+        while len(types) <= i:
+            types.append(lexer.next_token().type)
+        return types[i]
+    return lookahead_type, types
+
+
+class TestAdaptivePredictor:
+    @pytest.mark.parametrize('rule, input_text, expected, looked_ahead', [
+        ('stat', '[a, b]', 0, 6),
+        ('stat', '[a, [b]]=[c]', 1, 8),
+        ('stat', '[[[a]]]=[]', 1, 8),
+        ('stat', '[a, b', NO_ALTERNATIVE, 5),
+        ('stat', ']', NO_ALTERNATIVE, 1),
+        # end of element is followed by whatever follows element anywhere
+        ('element', 'a=b', 0, 2),
+        ('element', 'a, b', 1, 2),
+        ('element', 'a]', 1, 2),
+        ('element', '[a]', 2, 1),
+        ('element', 'a b', NO_ALTERNATIVE, 2),
+    ])
+    def test_predict(self, rule, input_text, expected, looked_ahead):
+        predictor = AdaptivePredictor(parse_grammar(STAT_GRAMMAR), TokenType)
+        lookahead_type, types = _lookahead_type(input_text)
+        assert predictor.predict(rule, lookahead_type) == expected
+        # only looks ahead as far as needed
+        assert len(types) == looked_ahead
+
+    @pytest.mark.parametrize('rule, input_text, expected', [
+        ('stat', '[a, b', 4),
+        ('stat', ']', 0),
+        ('stat', '[a b]', 2),
+        ('element', 'a b', 1),
+    ])
+    def test_error_index(self, rule, input_text, expected):
+        predictor = AdaptivePredictor(parse_grammar(STAT_GRAMMAR), TokenType)
+        lookahead_type, _ = _lookahead_type(input_text)
+        assert predictor.predict(rule, lookahead_type) == NO_ALTERNATIVE
+        assert predictor.error_index(rule, lookahead_type) == expected
+
+    def test_predict_cached(self):
+        predictor = AdaptivePredictor(parse_grammar(STAT_GRAMMAR), TokenType)
+        assert predictor.predict('stat', _lookahead_type('[a, b]=[c]')[0]) == 1
+        state_count = predictor.dfa_state_count
+        assert predictor.predict('stat', _lookahead_type('[c, d]')[0]) == 0
+        assert predictor.predict('stat', _lookahead_type('[e, f]=[]')[0]) == 1
+        assert predictor.dfa_state_count == state_count + 1
+
+    def test_predict_final_alternative(self):
+        # a stat may end after a, so the first alternative is predicted when nothing matches after it
+        predictor = AdaptivePredictor(parse_grammar('stat: VAR | VAR COMMA VAR ;'), TokenType)
+        assert predictor.predict('stat', _lookahead_type('a')[0]) == 0
+        assert predictor.predict('stat', _lookahead_type('a, b')[0]) == 1
+        assert predictor.predict('stat', _lookahead_type('a ]')[0]) == 0
+
+    def test_predict_ambiguous(self):
+        predictor = AdaptivePredictor(parse_grammar('stat: VAR EOF | VAR EOF ;'), TokenType)
+        assert predictor.predict('stat', _lookahead_type('a')[0]) == 0
+
+    @pytest.mark.parametrize('source, message', [
+        ('a: b COMMA | VAR ; b: c ; c: a EQUAL ;', 'rule a is left recursive'),
+        ('a: b? a COMMA | VAR ; b: EQUAL ;', 'rule a is left recursive'),
+        ('a: NUMBER ;', 'NUMBER is not a member of TokenType'),
+        ("a: VAR='x' ;", 'token text of VAR is not supported'),
+    ])
+    def test_predictor_fail(self, source, message):
+        with pytest.raises(GrammarException, match=message):
+            AdaptivePredictor(parse_grammar(source), TokenType)
+
+    def test_predict_unknown_rule(self):
+        predictor = AdaptivePredictor(parse_grammar(STAT_GRAMMAR), TokenType)
+        with pytest.raises(GrammarException, match='rule expr is not defined'):
+            predictor.predict('expr', _lookahead_type('[]')[0])